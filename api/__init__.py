@@ -0,0 +1,10 @@
+"""
+HTTP/JSON API of the CRM.
+
+    python -m api --host 127.0.0.1 --port 8000
+
+A long-lived, multi-threaded server exposing the services of the
+terminal menu. Clients authenticate with POST /auth/login and send the
+returned JWT as `Authorization: Bearer <token>`. See api.routes for the
+endpoints.
+"""
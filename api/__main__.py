@@ -0,0 +1,51 @@
+"""
+Command line entry point of the HTTP API server.
+
+    python -m api [--host HOST] [--port PORT] [--quiet]
+"""
+import argparse
+from contextlib import redirect_stdout
+import os
+import sys
+
+from api.server import make_server
+from models.base import (
+    get_engine, install_pool_stats_handlers, on_engine_created,
+)
+from utils.sentry_config import init_sentry
+
+
+def check_schema_version(engine):
+    from migrations import check_schema
+    with redirect_stdout(sys.stderr):
+        check_schema(engine)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m api", description="API HTTP/JSON d'Epic Events.")
+    parser.add_argument("--host", default=os.getenv("EPIC_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int,
+                        default=int(os.getenv("EPIC_API_PORT", "8000")))
+    parser.add_argument("--quiet", action="store_true",
+                        help="ne pas journaliser chaque requête")
+    args = parser.parse_args(argv)
+
+    init_sentry()
+    install_pool_stats_handlers()
+    on_engine_created(check_schema_version)
+    # open the pool before the first request
+    get_engine()
+    server = make_server(args.host, args.port, quiet=args.quiet)
+    host, port = server.server_address[:2]
+    print(f"API Epic Events à l'écoute sur http://{host}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
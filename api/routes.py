@@ -0,0 +1,373 @@
+"""
+Endpoints of the JSON API.
+
+They call the same services as the terminal menu and cli.commands, with
+the same access rules: roles per endpoint, and reads scoped by the JWT
+payload (a commercial only finds his own clients, a support his events).
+Entities are written with the columns of utils.output_writers, like the
+commands.
+"""
+from http import HTTPStatus
+
+from api.server import ApiError, page_response, parse_datetime, route, serialize
+from models.client import Client
+from models.contrat import Contrat
+from models.evenement import Evenement
+from models.utilisateur import ROLES
+from repositories.client_repository import ClientRepository
+from repositories.utilisateur_repository import UtilisateurRepository
+from services.client_service import ClientService
+from services.contrat_service import ContratService
+from services.current_user import get_current_user
+from services.evenement_service import EvenementService
+from services.utilisateur_service import UtilisateurService
+from utils.jwt_manager import generate_token
+from utils.output_writers import (
+    CLIENT_COLUMNS, CONTRAT_COLUMNS, EVENEMENT_COLUMNS, USER_COLUMNS,
+)
+
+GESTION_ONLY = "Accès refusé. GESTION Uniquement."
+
+
+def _require(entity, message):
+    if entity is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, message)
+    return entity
+
+
+def _updates(request, **fields):
+    """
+    Read the fields present in the JSON body (name -> type).
+    """
+    updates = {}
+    for name, type in fields.items():
+        value = request.field(name, type=type)
+        if value is not None:
+            updates[name] = value
+    if not updates:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Aucune modification demandée.")
+    return updates
+
+
+def _boolean(value):
+    # JSON true/false only: bool("false") would be True
+    if not isinstance(value, bool):
+        raise ValueError(value)
+    return value
+
+
+def _deleted(entity_id):
+    return {"id": entity_id, "supprime": True}
+
+
+def _datetime_field(request, name, required=False):
+    value = request.field(name, required=required)
+    return parse_datetime(name, value) if value is not None else None
+
+
+# -----------------------
+# auth
+# -----------------------
+
+@route("POST", "/auth/login", login=False)
+def login(request, session, payload):
+    email = request.field("email", required=True)
+    password = request.field("password", required=True)
+    user = UtilisateurService(session).login(email, password)
+    if not user:
+        raise ApiError(
+            HTTPStatus.UNAUTHORIZED,
+            "Échec de l’authentification. Vérifiez votre e-mail et votre mot de passe.")
+    token = generate_token(user.id, user.email, user.role)
+    return {"token": token, "utilisateur": serialize(user, USER_COLUMNS)}
+
+
+@route("GET", "/auth/me")
+def whoami(request, session, payload):
+    return serialize(get_current_user(session, payload)._asdict(), USER_COLUMNS)
+
+
+# -----------------------
+# clients
+# -----------------------
+
+@route("GET", "/clients", model=Client)
+def clients_list(request, session, payload):
+    service = ClientService(session, payload)
+    sort = request.choice_arg("sort", ClientRepository.sort_keys, "id")
+
+    def fetch_page(page_size, after, before):
+        return service.get_clients_page(
+            page_size=page_size, after=after, before=before, sort=sort,
+            commercial_id=request.int_arg("commercial_id"), profile="list")
+
+    return page_response(request, fetch_page, CLIENT_COLUMNS, sort)
+
+
+@route("GET", "/clients/{id}", model=Client)
+def clients_show(request, session, payload):
+    client = ClientService(session, payload).get_client_by_id(
+        request.params["id"], profile="list")
+    return serialize(_require(client, "Client introuvable."), CLIENT_COLUMNS)
+
+
+@route("POST", "/clients", roles=("commercial",),
+       denied="Cette action est réservé aux utilisateurs commerciaux.")
+def clients_create(request, session, payload):
+    client = ClientService(session, payload).create_client(
+        request.field("nom_complet", required=True),
+        request.field("email", required=True),
+        request.field("telephone"),
+        request.field("entreprise"),
+        payload["id"])
+    return HTTPStatus.CREATED, serialize(client, CLIENT_COLUMNS)
+
+
+@route("PATCH", "/clients/{id}", model=Client,
+       denied="Accès non autorisé à la modification de client.")
+def clients_update(request, session, payload):
+    service = ClientService(session, payload)
+    # scoped lookup: a commercial only finds his own clients
+    client = _require(service.get_client_by_id(request.params["id"]),
+                      "Client introuvable.")
+    service.update_client(client, **_updates(
+        request, nom_complet=str, email=str, telephone=str, entreprise=str))
+    return serialize(client, CLIENT_COLUMNS)
+
+
+@route("DELETE", "/clients/{id}", roles=("gestion",),
+       denied="Seul le gestion peut supprimer un client.")
+def clients_delete(request, session, payload):
+    service = ClientService(session, payload)
+    client = _require(service.get_client_by_id(request.params["id"]),
+                      "Client non trouvé.")
+    service.delete_client(client)
+    return _deleted(request.params["id"])
+
+
+# -----------------------
+# contrats
+# -----------------------
+
+@route("GET", "/contrats", model=Contrat)
+def contrats_list(request, session, payload):
+    service = ContratService(session, payload)
+
+    def fetch_page(page_size, after, before):
+        return service.get_contrats_page(
+            page_size=page_size, after=after, before=before,
+            commercial_id=request.int_arg("commercial_id"),
+            unsigned=request.bool_arg("unsigned"),
+            unpaid=request.bool_arg("unpaid"), profile="list")
+
+    return page_response(request, fetch_page, CONTRAT_COLUMNS)
+
+
+@route("GET", "/contrats/{id}", model=Contrat)
+def contrats_show(request, session, payload):
+    contrat = ContratService(session, payload).get_contrat_by_id(
+        request.params["id"], profile="list")
+    return serialize(_require(contrat, "Contrat introuvable."), CONTRAT_COLUMNS)
+
+
+@route("POST", "/contrats", roles=("gestion", "commercial"),
+       denied="Accès interdit : seuls les utilisateurs GESTION ou "
+              "COMMERCIAL peuvent créer un contrat")
+def contrats_create(request, session, payload):
+    # a commercial only finds his own clients
+    client = _require(
+        ClientService(session, payload).get_client_by_id(
+            request.field("client_id", required=True, type=int)),
+        "Client introuvable.")
+    if payload["role"] == "gestion":
+        commercial_id = client.commercial_id
+    else:
+        commercial_id = payload["id"]
+    total = request.field("montant_total", required=True, type=float)
+    restant = request.field("montant_restant", type=float)
+
+    contrat = ContratService(session, payload).create_contrat(
+        client_id=client.id,
+        commercial_id=commercial_id,
+        montant_total=total,
+        montant_restant=restant if restant is not None else total,
+        statut=False,
+    )
+    return HTTPStatus.CREATED, serialize(contrat, CONTRAT_COLUMNS)
+
+
+@route("PATCH", "/contrats/{id}", roles=("gestion", "commercial"),
+       denied="Accès non autorisé à la modification de contrat.")
+def contrats_update(request, session, payload):
+    service = ContratService(session, payload)
+    contrat = _require(service.get_contrat_by_id(request.params["id"]),
+                       "Contrat introuvable.")
+    service.update_contrat(contrat, **_updates(
+        request, montant_total=float, montant_restant=float, statut=_boolean))
+    return serialize(contrat, CONTRAT_COLUMNS)
+
+
+@route("DELETE", "/contrats/{id}", roles=("gestion",),
+       denied="Seul le rôle GESTION peut supprimer un contrat.")
+def contrats_delete(request, session, payload):
+    service = ContratService(session, payload)
+    contrat = _require(service.get_contrat_by_id(request.params["id"]),
+                       "Contrat non trouvé.")
+    service.delete_contrat(contrat)
+    return _deleted(request.params["id"])
+
+
+# -----------------------
+# evenements
+# -----------------------
+
+@route("GET", "/evenements", model=Evenement)
+def evenements_list(request, session, payload):
+    service = EvenementService(session, payload)
+
+    def fetch_page(page_size, after, before):
+        return service.get_evenements_page(
+            page_size=page_size, after=after, before=before,
+            support_id=request.int_arg("support_id"),
+            commercial_id=request.int_arg("commercial_id"),
+            date_from=request.datetime_arg("from"),
+            date_to=request.datetime_arg("to", end_of_day=True),
+            unassigned_only=request.bool_arg("unassigned"), profile="list")
+
+    return page_response(request, fetch_page, EVENEMENT_COLUMNS)
+
+
+@route("GET", "/evenements/{id}", model=Evenement)
+def evenements_show(request, session, payload):
+    evenement = EvenementService(session, payload).get_evenement_by_id(
+        request.params["id"], profile="list")
+    return serialize(_require(evenement, "Événement introuvable."),
+                     EVENEMENT_COLUMNS)
+
+
+@route("POST", "/evenements", roles=("commercial",),
+       denied="Seuls les utilisateurs COMMERCIAL peuvent créer un événement.")
+def evenements_create(request, session, payload):
+    # the contract lookup is scoped to the commercial's own contracts
+    contrat = ContratService(session, payload).get_contrat_by_id(
+        request.field("contrat_id", required=True, type=int))
+    if not contrat or not contrat.statut:
+        raise ApiError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                       "Contrat invalide ou non signé.")
+    client = _require(contrat.client, "Client associé au contrat introuvable.")
+
+    evenement = EvenementService(session, payload).create_evenement(
+        contrat_id=contrat.id,
+        nom_client=client.nom_complet,
+        contact_client=f"{client.email} / {client.telephone}",
+        date_debut=_datetime_field(request, "date_debut", required=True),
+        date_fin=_datetime_field(request, "date_fin", required=True),
+        lieu=request.field("lieu", required=True),
+        participants=request.field("participants", required=True, type=int),
+        notes=request.field("notes"),
+        support_id=None,  # assigned later by gestion
+    )
+    return HTTPStatus.CREATED, serialize(evenement, EVENEMENT_COLUMNS)
+
+
+@route("PATCH", "/evenements/{id}", roles=("gestion", "support"),
+       denied="Seuls les rôles GESTION ou SUPPORT peuvent modifier "
+              "un événement.")
+def evenements_update(request, session, payload):
+    service = EvenementService(session, payload)
+    # a support only finds the events assigned to him
+    evenement = _require(service.get_evenement_by_id(request.params["id"]),
+                         "Événement introuvable.")
+    fields = _updates(request, date_debut=str, date_fin=str, lieu=str,
+                      participants=int, notes=str)
+    for name in ("date_debut", "date_fin"):
+        if name in fields:
+            fields[name] = parse_datetime(name, fields[name])
+    service.update_evenement(evenement, **fields)
+    return serialize(evenement, EVENEMENT_COLUMNS)
+
+
+@route("PUT", "/evenements/{id}/support", roles=("gestion",),
+       denied="Seul le rôle GESTION peut affecter un support.")
+def evenements_assign(request, session, payload):
+    service = EvenementService(session, payload)
+    evenement = _require(service.get_evenement_by_id(request.params["id"]),
+                         "Événement introuvable.")
+    support_user = _require(
+        UtilisateurService(session, payload).get_user_by_id(
+            request.field("support_id", required=True, type=int)),
+        "Utilisateur support introuvable.")
+    if support_user.role != "support":
+        raise ApiError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                       "Cet utilisateur n'est pas un collaborateur SUPPORT.")
+    service.update_evenement(evenement, support_id=support_user.id)
+    return serialize(evenement, EVENEMENT_COLUMNS)
+
+
+# -----------------------
+# users
+# -----------------------
+
+def _role_field(request, required=False):
+    role = request.field("role", required=required)
+    if role is not None and role not in ROLES:
+        raise ApiError(HTTPStatus.BAD_REQUEST,
+                       f"Rôle invalide : {role} ({', '.join(ROLES)}).")
+    return role
+
+
+@route("GET", "/users", roles=("gestion",), denied=GESTION_ONLY)
+def users_list(request, session, payload):
+    service = UtilisateurService(session, payload)
+    sort = request.choice_arg("sort", UtilisateurRepository.sort_keys, "id")
+
+    def fetch_page(page_size, after, before):
+        return service.list_users_page(
+            page_size=page_size, after=after, before=before, sort=sort,
+            role=request.arg("role"))
+
+    return page_response(request, fetch_page, USER_COLUMNS, sort)
+
+
+@route("GET", "/users/{id}", roles=("gestion",), denied=GESTION_ONLY)
+def users_show(request, session, payload):
+    user = UtilisateurService(session, payload).get_user_by_id(
+        request.params["id"])
+    return serialize(_require(user, "Utilisateur introuvable."), USER_COLUMNS)
+
+
+@route("POST", "/users", roles=("gestion",), denied=GESTION_ONLY)
+def users_create(request, session, payload):
+    role = _role_field(request, required=True)
+    password = request.field("mot_de_passe", required=True)
+    if not password:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Mot de passe vide.")
+    user = UtilisateurService(session, payload).create_user(
+        request.field("nom", required=True),
+        request.field("email", required=True), password, role)
+    return HTTPStatus.CREATED, serialize(user, USER_COLUMNS)
+
+
+@route("PATCH", "/users/{id}", roles=("gestion",),
+       denied="Seul le rôle GESTION peut modifier un utilisateur.")
+def users_update(request, session, payload):
+    service = UtilisateurService(session, payload)
+    user = _require(service.get_user_by_id(request.params["id"]),
+                    "Utilisateur introuvable.")
+    _role_field(request)
+    service.update_user(user, **_updates(
+        request, nom=str, email=str, role=str, mot_de_passe=str))
+    return serialize(user, USER_COLUMNS)
+
+
+@route("DELETE", "/users/{id}", roles=("gestion",),
+       denied="Seul le rôle GESTION peut supprimer un utilisateur.")
+def users_delete(request, session, payload):
+    service = UtilisateurService(session, payload)
+    user = _require(service.get_user_by_id(request.params["id"]),
+                    "Utilisateur introuvable.")
+    if user.id == payload["id"]:
+        raise ApiError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                       "Vous ne pouvez pas supprimer votre propre compte.")
+    service.delete_user(user)
+    return _deleted(request.params["id"])
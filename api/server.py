@@ -0,0 +1,390 @@
+"""
+HTTP server of the JSON API: routing, authentication and sessions.
+
+One ThreadingHTTPServer process serves concurrent requests. Each request
+runs in its own thread with its own SQLAlchemy session, checked out of
+the application connection pool (DB_POOL_SIZE, DB_MAX_OVERFLOW) and
+closed when the response is sent.
+"""
+import base64
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+import jwt
+from sqlalchemy.exc import IntegrityError
+
+from models.base import Session
+from policies.access_policy import AccessDenied, allows
+from services.current_user import get_current_user
+from utils.jwt_manager import verify_token
+from utils.output_writers import to_jsonable
+from utils.sentry_config import capture_exception, transaction
+from utils.sql_instrumentation import action
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Largest JSON body accepted, in bytes
+MAX_BODY = 1024 * 1024
+
+DENIED = "Accès non autorisé pour votre rôle."
+
+
+class ApiError(Exception):
+    """
+    Failure of a request: the message is returned as {"erreur": message}
+    with the HTTP status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Route:
+    """
+    An endpoint with its access rule (same rules as cli.commands).
+
+    roles restricts the endpoint to some roles, model requires read access
+    to the entity type (see policies.access_policy.allows).
+    """
+
+    def __init__(self, method, pattern, handler, login, roles, model, denied):
+        self.method = method
+        self.pattern = pattern
+        self.regex = re.compile(
+            "^" + re.sub(r"\{(\w+)\}", r"(?P<\1>\\d+)", pattern) + "$")
+        self.handler = handler
+        self.login = login
+        self.roles = roles
+        self.model = model
+        self.denied = denied
+
+
+ROUTES = []
+
+
+def route(method, pattern, login=True, roles=None, model=None, denied=DENIED):
+    """
+    Register handler(request, session, payload) for METHOD /pattern.
+
+    {name} segments of the pattern match integers and are passed in
+    request.params. The handler returns the JSON data of the response, or
+    a (status, data) tuple.
+    """
+    def decorator(handler):
+        ROUTES.append(Route(method, pattern, handler, login, roles, model,
+                            denied))
+        return handler
+    return decorator
+
+
+class Request:
+    """
+    Parsed request given to the handlers.
+    """
+
+    def __init__(self, method, path, query, body, params=None):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+        self.params = params or {}
+
+    def arg(self, name, default=None):
+        """
+        Return a query string value (the last one if repeated).
+        """
+        values = self.query.get(name)
+        return values[-1] if values else default
+
+    def int_arg(self, name, default=None):
+        value = self.arg(name)
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           f"Paramètre {name} invalide : entier attendu.")
+
+    def choice_arg(self, name, choices, default=None):
+        value = self.arg(name) or default
+        if value is not None and value not in choices:
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           f"Paramètre {name} invalide : "
+                           f"{', '.join(choices)} attendu.")
+        return value
+
+    def bool_arg(self, name):
+        return (self.arg(name) or "").lower() in ("1", "true", "yes", "oui")
+
+    def datetime_arg(self, name, end_of_day=False):
+        value = self.arg(name)
+        return parse_datetime(name, value, end_of_day) if value else None
+
+    def field(self, name, required=False, type=None):
+        """
+        Return a field of the JSON body, converted with type if given.
+        """
+        value = self.body.get(name)
+        if value is None:
+            if required:
+                raise ApiError(HTTPStatus.BAD_REQUEST,
+                               f"Champ obligatoire manquant : {name}.")
+            return None
+        if type is not None:
+            try:
+                value = type(value)
+            except (TypeError, ValueError):
+                raise ApiError(HTTPStatus.BAD_REQUEST,
+                               f"Champ {name} invalide.")
+        return value
+
+
+def parse_datetime(name, value, end_of_day=False):
+    """
+    Parse an ISO 8601 date or date-time (AAAA-MM-JJ[THH:MM[:SS]]).
+
+    With end_of_day, a date alone stands for the end of that day, for
+    the inclusive upper bounds of the filters.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ApiError(HTTPStatus.BAD_REQUEST,
+                       f"Date {name} invalide : {value!r} (ISO 8601 attendu).")
+    if end_of_day:
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return moment
+        return moment.replace(hour=23, minute=59, second=59,
+                              microsecond=999999)
+    return moment
+
+
+def encode_cursor(cursor):
+    """
+    Turn a Page cursor (tuple of sort key values) into an opaque string.
+    """
+    if cursor is None:
+        return None
+    raw = json.dumps([to_jsonable(value) for value in cursor])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(value, size=None):
+    """
+    Read a cursor produced by encode_cursor (None if value is empty),
+    made of `size` values when given.
+    """
+    if not value:
+        return None
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(value.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Curseur de pagination invalide.")
+    if (not isinstance(cursor, list) or not cursor
+            or size is not None and len(cursor) != size):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Curseur de pagination invalide.")
+    return tuple(cursor)
+
+
+def serialize(entity, columns):
+    """
+    Convert an entity to a JSON object with the given columns
+    (name -> getter, see cli.commands).
+    """
+    if isinstance(entity, dict):
+        return {key: to_jsonable(value) for key, value in entity.items()}
+    return {name: to_jsonable(get(entity)) for name, get in columns.items()}
+
+
+def page_response(request, fetch_page, columns, sort="id"):
+    """
+    Run one keyset-paginated query and build the response of a listing.
+
+    Query parameters: limit (page size, at most MAX_PAGE_SIZE), after
+    (the "next" cursor of the previous response) or before (its "prev"
+    cursor). `sort` is the sort key of the listing: its cursors hold the
+    id, preceded by the sort key value unless sorting on the id (see
+    BaseRepository._paginate).
+    """
+    limit = request.int_arg("limit", DEFAULT_PAGE_SIZE)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ApiError(HTTPStatus.BAD_REQUEST,
+                       f"limit doit être entre 1 et {MAX_PAGE_SIZE}.")
+    size = 1 if sort == "id" else 2
+    page = fetch_page(page_size=limit,
+                      after=decode_cursor(request.arg("after"), size),
+                      before=decode_cursor(request.arg("before"), size))
+    return {
+        "items": [serialize(item, columns) for item in page.items],
+        "next": encode_cursor(page.next_cursor),
+        "prev": encode_cursor(page.prev_cursor),
+    }
+
+
+def authenticate(headers):
+    """
+    Return the JWT payload of the Authorization: Bearer header.
+    """
+    header = headers.get("Authorization") or ""
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "Authentification requise.")
+    try:
+        return verify_token(token.strip())
+    except jwt.ExpiredSignatureError:
+        raise ApiError(HTTPStatus.UNAUTHORIZED,
+                       "Token expiré. Veuillez vous reconnecter.")
+    except jwt.InvalidTokenError:
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "Token invalide.")
+
+
+def dispatch(method, target, headers, body):
+    """
+    Run the route matching a request and return (status, data).
+
+    Raises ApiError for client errors; other exceptions are left to the
+    caller (500).
+    """
+    split = urlsplit(target)
+    path = split.path.rstrip("/") or "/"
+    allowed_methods = []
+    for candidate in ROUTES:
+        match = candidate.regex.match(path)
+        if not match:
+            continue
+        if candidate.method != method:
+            allowed_methods.append(candidate.method)
+            continue
+        break
+    else:
+        if allowed_methods:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Méthode non autorisée.")
+        raise ApiError(HTTPStatus.NOT_FOUND, "Ressource introuvable.")
+
+    payload = None
+    if candidate.login:
+        payload = authenticate(headers)
+        if candidate.roles and payload.get("role") not in candidate.roles:
+            raise ApiError(HTTPStatus.FORBIDDEN, candidate.denied)
+        if candidate.model and not allows(payload, candidate.model):
+            raise ApiError(HTTPStatus.FORBIDDEN, candidate.denied)
+
+    request = Request(
+        method, path, parse_qs(split.query), body,
+        {name: int(value) for name, value in match.groupdict().items()})
+    session = Session()
+    try:
+        if payload and get_current_user(session, payload) is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Utilisateur introuvable.")
+        name = f"{method} {candidate.pattern}"
+        with transaction(name, "http.server"), action(name):
+            result = candidate.handler(request, session, payload)
+    except AccessDenied:
+        raise ApiError(HTTPStatus.FORBIDDEN, candidate.denied)
+    except IntegrityError:
+        session.rollback()
+        raise ApiError(HTTPStatus.CONFLICT,
+                       "Conflit avec les données existantes (doublon ou "
+                       "référence invalide).")
+    finally:
+        session.close()
+    if isinstance(result, tuple):
+        return result
+    return HTTPStatus.OK, result
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Translate HTTP requests into dispatch() calls and JSON responses.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "EpicEventsAPI/1.0"
+    quiet = False
+
+    def _read_body(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # the end of the body is unknown: the connection cannot be reused
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           "En-tête Content-Length invalide.")
+        if length > MAX_BODY:
+            self.close_connection = True
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                           "Corps de requête trop volumineux.")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "JSON invalide.")
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Objet JSON attendu.")
+        return body
+
+    def _handle(self):
+        try:
+            status, data = dispatch(
+                self.command, self.path, self.headers, self._read_body())
+        except ApiError as e:
+            status, data = e.status, {"erreur": str(e)}
+        except Exception:
+            capture_exception()
+            self.log_error("erreur interne sur %s %s", self.command, self.path)
+            status, data = (HTTPStatus.INTERNAL_SERVER_ERROR,
+                            {"erreur": "Erreur interne du serveur."})
+        self._send(status, data)
+
+    def _send(self, status, data):
+        body = b""
+        if status != HTTPStatus.NO_CONTENT:
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    Multi-threaded HTTP server, one thread per request.
+    """
+
+    daemon_threads = True
+
+
+def make_server(host="127.0.0.1", port=8000, quiet=False):
+    """
+    Create the API server (call serve_forever() to run it).
+
+    Port 0 picks a free port, see server.server_address.
+    """
+    # registers the endpoints on ROUTES
+    import api.routes  # noqa: F401
+
+    handler = type("Handler", (ApiRequestHandler,), {"quiet": quiet})
+    return ApiServer((host, port), handler)
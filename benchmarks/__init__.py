@@ -0,0 +1,5 @@
+"""
+Performance measurements, run from the project root as scripts:
+
+    python -m benchmarks.bcrypt_cost
+"""
@@ -0,0 +1,111 @@
+"""
+Pick the bcrypt cost factor (BCRYPT_ROUNDS) for this host.
+
+    python -m benchmarks.bcrypt_cost
+    python -m benchmarks.bcrypt_cost --target-ms 250 --samples 5
+
+Each cost factor is timed on a verification (what a login pays); the
+highest cost whose median stays under the target latency is suggested.
+The time doubles with each step, so the search stops at the first cost
+over the target. --concurrency also measures the throughput of the
+hashing pool (EPIC_HASH_WORKERS) at the suggested cost.
+"""
+import argparse
+from concurrent.futures import wait
+import json
+import statistics
+import time
+
+import bcrypt
+
+from utils.security import MAX_ROUNDS, MIN_ROUNDS, submit_verify
+
+PASSWORD = b"benchmark-password"
+
+
+def time_verify(rounds, samples):
+    """
+    Return the verification times (seconds) of a hash at the given cost.
+    """
+    hashed = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds))
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.checkpw(PASSWORD, hashed)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def pick_rounds(target_ms, samples=3, start=10, stop=16):
+    """
+    Time cost factors from start upwards and pick the highest one whose
+    median verification time is under target_ms.
+
+    Returns (suggested cost or None, list of measurement dicts).
+    """
+    results = []
+    chosen = None
+    for rounds in range(max(start, MIN_ROUNDS), min(stop, MAX_ROUNDS) + 1):
+        times = time_verify(rounds, samples)
+        median_ms = statistics.median(times) * 1000
+        results.append({"rounds": rounds, "median_ms": round(median_ms, 1),
+                        "max_ms": round(max(times) * 1000, 1)})
+        if median_ms > target_ms:
+            break
+        chosen = rounds
+    return chosen, results
+
+
+def pool_throughput(rounds, concurrency):
+    """
+    Verify `concurrency` passwords at once on the hashing pool and return
+    the verifications per second.
+    """
+    hashed = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds)).decode("utf-8")
+    plain = PASSWORD.decode("utf-8")
+    start = time.perf_counter()
+    wait([submit_verify(plain, hashed) for _ in range(concurrency)])
+    return concurrency / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bcrypt_cost",
+        description="Choisir le coût bcrypt (BCRYPT_ROUNDS) pour cette machine.")
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="latence maximale d'une vérification (défaut : 250)")
+    parser.add_argument("--samples", type=int, default=3,
+                        help="mesures par coût (défaut : 3)")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="vérifications simultanées sur le pool de hachage")
+    parser.add_argument("--json", action="store_true",
+                        help="résultat au format JSON")
+    args = parser.parse_args(argv)
+
+    chosen, results = pick_rounds(
+        args.target_ms, args.samples, args.min_rounds, args.max_rounds)
+    report = {"target_ms": args.target_ms, "suggested_rounds": chosen,
+              "measures": results}
+    if args.concurrency and chosen:
+        report["pool_verifications_per_second"] = round(
+            pool_throughput(chosen, args.concurrency), 2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for row in results:
+        print(f"coût {row['rounds']:>2} : médiane {row['median_ms']:>8.1f} ms"
+              f"  max {row['max_ms']:>8.1f} ms")
+    if chosen is None:
+        print(f"Aucun coût >= {args.min_rounds} sous {args.target_ms:g} ms.")
+    else:
+        print(f"Coût conseillé : BCRYPT_ROUNDS={chosen}")
+    if "pool_verifications_per_second" in report:
+        print(f"Pool de hachage : {report['pool_verifications_per_second']} "
+              f"vérifications/s ({args.concurrency} simultanées)")
+
+
+if __name__ == "__main__":
+    main()
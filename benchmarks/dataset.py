@@ -0,0 +1,341 @@
+"""
+Deterministic synthetic dataset, from a thousand to millions of rows.
+
+    python -m benchmarks.dataset --clients 100000 --seed 42
+    python -m benchmarks.dataset --clients 2000000 --batch-size 20000 --create-schema
+
+Creates utilisateurs for the three roles, then clients, contracts and
+events with the shapes seen in production:
+
+- clients per commercial follow a Zipf-like law (a few commercials own
+  most of the portfolio);
+- about 1.6 contracts per client, two thirds signed; signed contracts
+  are fully paid, partially paid or not paid yet;
+- signed contracts get 0 to 3 events whose dates overlap, most of them
+  assigned to a support (also skewed), some still unassigned.
+
+Rows are generated as a stream and loaded with Core executemany inserts,
+batch_size rows per statement and per transaction, with explicit ids so
+that nothing has to be read back. The same seed on the same database
+state produces the same rows. Runs against DATABASE_URL (SQLite or
+MySQL), or --url.
+"""
+import argparse
+import bisect
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+import json
+import random
+import sys
+import time
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from models.client import Client
+from models.contrat import Contrat
+from models.evenement import Evenement
+from models.utilisateur import Utilisateur
+from utils.security import hash_password
+
+FIRST_NAMES = ("Alice", "Bruno", "Chloé", "David", "Emma", "Farid", "Gaëlle",
+               "Hugo", "Inès", "Julien", "Karim", "Léa", "Manon", "Nicolas",
+               "Océane", "Paul", "Quentin", "Sarah", "Thomas", "Yasmine")
+LAST_NAMES = ("Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard",
+              "Petit", "Durand", "Leroy", "Moreau", "Simon", "Laurent",
+              "Lefebvre", "Michel", "Garcia", "Roux", "Fontaine", "Chevalier")
+COMPANY_WORDS = ("Événements", "Conseil", "Industries", "Digital", "Santé",
+                 "Logistique", "Finance", "Énergie", "Média", "Voyages")
+CITIES = ("Paris", "Lyon", "Marseille", "Bordeaux", "Lille", "Nantes",
+          "Toulouse", "Nice", "Strasbourg", "Rennes")
+
+# Share of signed contracts, and how the signed ones are paid
+SIGNED_RATIO = 0.65
+PAID_RATIO = 0.45
+PARTIAL_RATIO = 0.35
+# Share of events with a support assigned
+ASSIGNED_RATIO = 0.85
+# Average number of rows (clients, contrats, evenements) per client
+ROWS_PER_CLIENT = 3.87
+
+
+class DatasetGenerator:
+    """
+    Stream of rows (dicts of column values) for every table.
+
+    Parameters
+    ----------
+    clients : int
+        Number of clients; the other tables are sized from it.
+    seed : int
+        Seed of the random generator.
+    commercials, supports, gestion : int or None
+        Number of users per role, derived from clients by default.
+    start_ids : dict or None
+        First id to use per table name (ids already used by the
+        database are skipped by load()).
+    years : int
+        Creation dates are spread over the last `years` years.
+    """
+
+    def __init__(self, clients, seed=42, commercials=None, supports=None,
+                 gestion=None, start_ids=None, years=3, today=None):
+        self.clients = clients
+        self.random = random.Random(seed)
+        self.commercials = commercials or min(500, max(3, clients // 2000))
+        self.supports = supports or min(300, max(2, clients // 5000))
+        self.gestion = gestion or max(1, self.commercials // 20)
+        self.start_ids = dict(start_ids or {})
+        self.today = today or date(2025, 1, 1)
+        self.first_day = self.today - timedelta(days=365 * years)
+        self.counts = {}
+
+    def _next_id(self, table):
+        value = self.start_ids.get(table, 1)
+        self.start_ids[table] = value + 1
+        self.counts[table] = self.counts.get(table, 0) + 1
+        return value
+
+    @staticmethod
+    def _zipf_weights(n, exponent=1.1):
+        # cumulative weights for bisect: rank k gets 1 / k**exponent
+        return list(accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+    def _pick(self, ids, cumulative):
+        point = self.random.random() * cumulative[-1]
+        return ids[bisect.bisect_right(cumulative, point)]
+
+    def _person(self):
+        return (f"{self.random.choice(FIRST_NAMES)} "
+                f"{self.random.choice(LAST_NAMES)}")
+
+    def _day(self, start, end):
+        span = max(0, (end - start).days)
+        return start + timedelta(days=self.random.randint(0, span))
+
+    def users(self, password_hash):
+        """
+        Return the rows of the utilisateurs table, per role.
+        """
+        rows = {}
+        for role, count in (("gestion", self.gestion),
+                            ("commercial", self.commercials),
+                            ("support", self.supports)):
+            rows[role] = []
+            for _ in range(count):
+                user_id = self._next_id("utilisateurs")
+                rows[role].append({
+                    "id": user_id,
+                    "nom": self._person()[:50],
+                    "email": f"{role}.{user_id}@dataset.epic",
+                    "mot_de_passe": password_hash,
+                    "role": role,
+                })
+        return rows
+
+    def rows(self, commercial_ids, support_ids):
+        """
+        Yield (table name, row) for the clients and, right after each
+        client, its contracts and their events (parents always come first).
+        """
+        rnd = self.random
+        commercial_weights = self._zipf_weights(len(commercial_ids))
+        support_weights = self._zipf_weights(len(support_ids), exponent=0.8)
+
+        for _ in range(self.clients):
+            client_id = self._next_id("clients")
+            commercial_id = self._pick(commercial_ids, commercial_weights)
+            name = self._person()
+            entreprise = (f"{rnd.choice(LAST_NAMES)} "
+                          f"{rnd.choice(COMPANY_WORDS)}")
+            created = self._day(self.first_day, self.today)
+            email = f"client.{client_id}@{entreprise.split()[0].lower()}.fr"
+            yield "clients", {
+                "id": client_id,
+                "nom_complet": name,
+                "email": email,
+                "telephone": f"0{rnd.randint(100000000, 799999999)}",
+                "entreprise": entreprise,
+                "date_creation": created,
+                "date_mise_a_jour": (self._day(created, self.today)
+                                     if rnd.random() < 0.3 else None),
+                "commercial_id": commercial_id,
+            }
+
+            # 0 to 5 contracts, 1.6 on average
+            for _ in range(rnd.choices((0, 1, 2, 3, 4, 5),
+                                       (10, 45, 25, 12, 5, 3))[0]):
+                contrat_id = self._next_id("contrats")
+                total = Decimal(round(rnd.lognormvariate(9.5, 0.8), 2)) \
+                    .quantize(Decimal("0.01"))
+                signed = rnd.random() < SIGNED_RATIO
+                if not signed:
+                    restant = total
+                else:
+                    draw = rnd.random()
+                    if draw < PAID_RATIO:
+                        restant = Decimal("0.00")
+                    elif draw < PAID_RATIO + PARTIAL_RATIO:
+                        restant = (total * Decimal(rnd.uniform(0.05, 0.95))) \
+                            .quantize(Decimal("0.01"))
+                    else:
+                        restant = total
+                contract_day = self._day(created, self.today)
+                yield "contrats", {
+                    "id": contrat_id,
+                    "client_id": client_id,
+                    # a few contracts were taken over by another commercial
+                    "commercial_id": (commercial_id if rnd.random() < 0.95
+                                      else self._pick(commercial_ids,
+                                                      commercial_weights)),
+                    "montant_total": total,
+                    "montant_restant": restant,
+                    "date_creation": contract_day,
+                    "statut": signed,
+                }
+                if not signed:
+                    continue
+
+                for _ in range(rnd.choices((0, 1, 2, 3), (20, 55, 18, 7))[0]):
+                    # events cluster in the months after the signature and
+                    # overlap each other (several per support and per day)
+                    start = datetime.combine(
+                        contract_day + timedelta(days=rnd.randint(7, 540)),
+                        datetime.min.time()) + timedelta(
+                            hours=rnd.choice((9, 10, 14, 18, 19, 20)))
+                    yield "evenements", {
+                        "id": self._next_id("evenements"),
+                        "contrat_id": contrat_id,
+                        "support_id": (self._pick(support_ids, support_weights)
+                                       if rnd.random() < ASSIGNED_RATIO
+                                       else None),
+                        "nom_client": name,
+                        "contact_client": f"{email} / 0{rnd.randint(100000000, 799999999)}",
+                        "date_debut": start,
+                        "date_fin": start + timedelta(
+                            hours=rnd.choice((2, 4, 8, 24, 48, 72))),
+                        "lieu": rnd.choice(CITIES),
+                        "participants": int(min(5000, rnd.lognormvariate(4, 1)) + 1),
+                        "notes": None if rnd.random() < 0.7 else "Généré",
+                    }
+
+
+TABLES = {
+    "utilisateurs": Utilisateur.__table__,
+    "clients": Client.__table__,
+    "contrats": Contrat.__table__,
+    "evenements": Evenement.__table__,
+}
+
+
+def next_ids(connection):
+    """
+    Return the first free id of every table.
+    """
+    return {
+        name: (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+        for name, table in TABLES.items()
+    }
+
+
+def load(engine, clients, seed=42, batch_size=10000, password="password",
+         on_batch=None, **options):
+    """
+    Generate the dataset and insert it.
+
+    Rows are buffered per table and written with one executemany per
+    table and one transaction per batch; the buffers are always flushed
+    in dependency order (clients, contrats, evenements), so foreign keys
+    hold at every commit.
+
+    Returns a summary dict (rows per table, seconds, rows per second).
+    """
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # throwaway data: do not wait for the disk on every commit
+            connection.execute(text("PRAGMA synchronous = OFF"))
+        generator = DatasetGenerator(
+            clients, seed=seed, start_ids=next_ids(connection), **options)
+
+        users = generator.users(hash_password(password))
+        connection.execute(
+            insert(TABLES["utilisateurs"]),
+            [row for role_rows in users.values() for row in role_rows])
+        connection.commit()
+
+        buffers = {"clients": [], "contrats": [], "evenements": []}
+        pending = 0
+
+        def flush():
+            for name, rows in buffers.items():
+                if rows:
+                    connection.execute(insert(TABLES[name]), rows)
+                    rows.clear()
+            connection.commit()
+            if on_batch:
+                on_batch(dict(generator.counts))
+
+        rows = generator.rows([u["id"] for u in users["commercial"]],
+                              [u["id"] for u in users["support"]])
+        for name, row in rows:
+            buffers[name].append(row)
+            pending += 1
+            if pending >= batch_size:
+                flush()
+                pending = 0
+        flush()
+
+    elapsed = time.perf_counter() - start
+    total = sum(generator.counts.values())
+    return {
+        "seed": seed,
+        "lignes": dict(generator.counts),
+        "total": total,
+        "secondes": round(elapsed, 2),
+        "lignes_par_seconde": round(total / elapsed) if elapsed else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.dataset",
+        description="Générer un jeu de données synthétique reproductible.")
+    parser.add_argument("--clients", type=int, default=1000,
+                        help="nombre de clients (défaut : 1000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--commercials", type=int)
+    parser.add_argument("--supports", type=int)
+    parser.add_argument("--gestion", type=int)
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="lignes insérées par transaction")
+    parser.add_argument("--password", default="password",
+                        help="mot de passe de tous les utilisateurs générés")
+    parser.add_argument("--url", help="URL de la base (défaut : DATABASE_URL)")
+    parser.add_argument("--create-schema", action="store_true",
+                        help="appliquer les migrations avant le chargement")
+    parser.add_argument("--progress", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from models.base import get_engine
+        engine = get_engine()
+    if args.create_schema:
+        from migrations import upgrade
+        upgrade(engine)
+
+    def progress(counts):
+        print(", ".join(f"{n}={c}" for n, c in counts.items()), file=sys.stderr)
+
+    summary = load(engine, args.clients, seed=args.seed,
+                   batch_size=args.batch_size, password=args.password,
+                   on_batch=progress if args.progress else None,
+                   commercials=args.commercials, supports=args.supports,
+                   gestion=args.gestion)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
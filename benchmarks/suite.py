@@ -0,0 +1,362 @@
+"""
+Scale benchmarks of the read paths, on generated datasets.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 10k 100k --output bench.json
+    python -m benchmarks.suite --baseline bench.json --tolerance 0.25
+
+For each size (total number of rows), a dataset is generated once with
+benchmarks.dataset into --dir (one SQLite file per size and seed) and
+reused by the next runs; --url runs against another database instead,
+with {size} in the URL replaced by the size (the database is loaded if
+it has no client yet).
+
+Every case runs once to warm up, then --repeat times. Each case records
+its latency percentiles, the number of SQL statements of one run and
+its peak Python memory (tracemalloc, measured on a separate run since
+tracing slows everything down).
+
+--baseline compares the results with a previous --output file: a case
+is reported as a regression when its p50 or its peak memory grows by
+more than --tolerance, or when it runs more queries. The exit code is 1
+if there is any regression.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import sqlalchemy
+from sqlalchemy import create_engine, event, func, select
+
+from benchmarks.dataset import ROWS_PER_CLIENT, load
+from models.base import Session, set_engine
+from models.client import Client
+from models.evenement import Evenement
+from models.utilisateur import Utilisateur
+from services.client_service import ClientService
+from services.contrat_service import ContratService
+from services.evenement_service import EvenementService
+from services.utilisateur_service import UtilisateurService
+
+DEFAULT_SIZES = ("10k", "100k", "1M")
+PASSWORD = "password"
+# Rows rendered by the table format, the size of a screen-sized listing
+TABLE_LIMIT = 500
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_size(value):
+    """
+    Parse a number of rows: 10000, 10k, 2.5M.
+    """
+    factors = {"k": 1_000, "m": 1_000_000}
+    text = value.strip().lower()
+    try:
+        if text[-1:] in factors:
+            return int(float(text[:-1]) * factors[text[-1]])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille invalide : {value!r}")
+
+
+class QueryCounter:
+    """
+    Count the SQL statements sent through an engine.
+    """
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+class Context:
+    """
+    Users picked in a dataset to run the cases with.
+
+    The commercial and the support are those with the most clients and
+    events: their listings are the slowest ones.
+    """
+
+    def __init__(self, session):
+        def busiest(column):
+            return session.execute(
+                select(column).where(column.is_not(None)).group_by(column)
+                .order_by(func.count().desc()).limit(1)).scalar()
+
+        def user(user_id=None, role=None):
+            query = select(Utilisateur)
+            query = (query.where(Utilisateur.id == user_id) if user_id
+                     else query.where(Utilisateur.role == role))
+            found = session.execute(query.limit(1)).scalar_one()
+            return {"id": found.id, "email": found.email, "role": found.role}
+
+        self.gestion = user(role="gestion")
+        self.commercial = user(busiest(Client.commercial_id))
+        self.support = user(busiest(Evenement.support_id))
+
+
+def _render(command, fmt, limit=None):
+    """
+    Return a case running a cli.commands listing and writing its output
+    in memory, as `python main.py <command> -f <fmt>` does.
+    """
+    from cli.commands import build_parser
+    from utils.output_writers import write_rows
+
+    argv = [*command.split(), "--format", fmt]
+    if limit:
+        argv += ["--limit", str(limit)]
+    args = build_parser().parse_args(argv)
+
+    def run(session, ctx):
+        result = args.handler(args, session, ctx.gestion)
+        return write_rows(result.rows(), list(result.columns), fmt,
+                          stream=io.StringIO(), title=result.title)
+    return run
+
+
+CASES = {
+    "get_all_clients": lambda session, ctx: len(
+        ClientService(session, ctx.gestion).get_all_clients(profile="list")),
+    "get_clients_by_commercial_id": lambda session, ctx: len(
+        ClientService(session, ctx.commercial).get_clients_by_commercial_id(
+            ctx.commercial["id"], profile="list")),
+    "get_contrats_by_commercial_id": lambda session, ctx: len(
+        ContratService(session, ctx.commercial).get_contrats_by_commercial_id(
+            ctx.commercial["id"], profile="list")),
+    "get_unsigned_contrats": lambda session, ctx: len(
+        ContratService(session, ctx.gestion).get_unsigned_contrats(
+            profile="list")),
+    "get_unpaid_contrats": lambda session, ctx: len(
+        ContratService(session, ctx.gestion).get_unpaid_contrats(
+            profile="list")),
+    "get_evenements_by_support_id": lambda session, ctx: len(
+        EvenementService(session, ctx.support).get_evenements_by_support_id(
+            ctx.support["id"], profile="list")),
+    "login": lambda session, ctx: int(
+        UtilisateurService(session).login(ctx.gestion["email"], PASSWORD)
+        is not None),
+    "render_clients_jsonl": _render("clients list", "jsonl"),
+    "render_contrats_jsonl": _render("contrats list", "jsonl"),
+    "render_evenements_jsonl": _render("evenements list", "jsonl"),
+    "render_clients_table": _render("clients list", "table", TABLE_LIMIT),
+    "render_contrats_table": _render("contrats list", "table", TABLE_LIMIT),
+    "render_evenements_table": _render("evenements list", "table", TABLE_LIMIT),
+}
+
+
+def percentiles(times):
+    """
+    Return the latency percentiles (ms) of a list of durations (s).
+    """
+    ms = sorted(t * 1000 for t in times)
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+        values = {f"p{p}": cuts[p - 1] for p in PERCENTILES}
+    else:
+        values = {f"p{p}": ms[0] for p in PERCENTILES}
+    values["max"] = ms[-1]
+    return {key: round(value, 2) for key, value in values.items()}
+
+
+def run_case(case, ctx, counter, repeat):
+    """
+    Run one case: a warm-up, repeat timed runs, then a traced run for
+    the peak memory. Each run gets a fresh session (empty identity map).
+    """
+    def once():
+        session = Session()
+        try:
+            return case(session, ctx)
+        finally:
+            session.close()
+
+    once()
+    times = []
+    for _ in range(repeat):
+        counter.count = 0
+        start = time.perf_counter()
+        rows = once()
+        times.append(time.perf_counter() - start)
+    queries = counter.count
+
+    tracemalloc.start()
+    try:
+        once()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "latency_ms": percentiles(times),
+        "queries": queries,
+        "peak_kib": round(peak / 1024),
+        "rows": rows,
+    }
+
+
+def prepare(url, size, seed):
+    """
+    Return an engine on a dataset of about size rows, loading it first
+    if the database has no client yet.
+    """
+    from migrations import upgrade
+
+    engine = create_engine(url)
+    upgrade(engine)
+    with engine.connect() as connection:
+        empty = connection.execute(select(func.count(Client.id))).scalar() == 0
+    if empty:
+        print(f"Génération du jeu de données ({size} lignes)...",
+              file=sys.stderr)
+        load(engine, max(1, round(size / ROWS_PER_CLIENT)), seed=seed,
+             password=PASSWORD)
+    return engine
+
+
+def run_suite(sizes, seed=42, repeat=5, cases=None, directory=".bench",
+              url=None, on_case=None):
+    """
+    Run the cases on each dataset size and return the results dict.
+    """
+    selected = {name: CASES[name] for name in (cases or CASES)}
+    results = {
+        "meta": {
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "sizes": {},
+    }
+    for size in sizes:
+        if url:
+            size_url = url.replace("{size}", str(size))
+        else:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"dataset-{size}-{seed}.db")
+            size_url = f"sqlite:///{path}"
+        engine = prepare(size_url, size, seed)
+        set_engine(engine)
+        counter = QueryCounter(engine)
+
+        session = Session()
+        try:
+            ctx = Context(session)
+        finally:
+            session.close()
+
+        entry = {"dialect": engine.dialect.name, "cases": {}}
+        for name, case in selected.items():
+            entry["cases"][name] = run_case(case, ctx, counter, repeat)
+            if on_case:
+                on_case(size, name, entry["cases"][name])
+        results["sizes"][str(size)] = entry
+        engine.dispose()
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compare results with a baseline produced by run_suite.
+
+    Returns a list of (size, case, metric, baseline value, new value,
+    regression) for the cases present in both.
+    """
+    rows = []
+    for size, entry in results["sizes"].items():
+        reference = baseline.get("sizes", {}).get(size)
+        if not reference:
+            continue
+        for name, measure in entry["cases"].items():
+            before = reference["cases"].get(name)
+            if not before:
+                continue
+            for metric, old, new, limit in (
+                ("p50_ms", before["latency_ms"]["p50"],
+                 measure["latency_ms"]["p50"], 1 + tolerance),
+                ("peak_kib", before["peak_kib"], measure["peak_kib"],
+                 1 + tolerance),
+                ("queries", before["queries"], measure["queries"], 1),
+            ):
+                regression = new > old * limit if old else new > old
+                rows.append((size, name, metric, old, new, regression))
+    return rows
+
+
+def print_results(results):
+    for size, entry in results["sizes"].items():
+        print(f"\n{size} lignes ({entry['dialect']})")
+        print(f"{'cas':32} {'p50 ms':>10} {'p95 ms':>10} {'requêtes':>9} "
+              f"{'pic KiB':>9} {'lignes':>9}")
+        for name, measure in entry["cases"].items():
+            latency = measure["latency_ms"]
+            print(f"{name:32} {latency['p50']:>10.2f} {latency['p95']:>10.2f} "
+                  f"{measure['queries']:>9} {measure['peak_kib']:>9} "
+                  f"{measure['rows']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite",
+        description="Mesurer les lectures des services à plusieurs volumes.")
+    parser.add_argument("--sizes", nargs="+", type=parse_size,
+                        default=[parse_size(s) for s in DEFAULT_SIZES],
+                        help="nombre total de lignes (défaut : 10k 100k 1M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="exécutions mesurées par cas (défaut : 5)")
+    parser.add_argument("--case", dest="cases", action="append",
+                        choices=sorted(CASES),
+                        help="ne lancer que ce cas (option répétable)")
+    parser.add_argument("--dir", default=".bench",
+                        help="dossier des bases SQLite générées")
+    parser.add_argument("--url",
+                        help="URL de base à utiliser ({size} = la taille)")
+    parser.add_argument("--output", "-o", help="écrire les résultats en JSON")
+    parser.add_argument("--baseline",
+                        help="résultats JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="hausse tolérée de p50 et de la mémoire "
+                             "(défaut : 0.25)")
+    args = parser.parse_args(argv)
+
+    def progress(size, name, measure):
+        print(f"{size} {name}: p50 {measure['latency_ms']['p50']} ms, "
+              f"{measure['queries']} requêtes", file=sys.stderr)
+
+    results = run_suite(args.sizes, seed=args.seed, repeat=args.repeat,
+                        cases=args.cases, directory=args.dir, url=args.url,
+                        on_case=progress)
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = [row for row in compare(results, baseline, args.tolerance)
+                   if row[-1]]
+    if not regressions:
+        print("\nAucune régression par rapport à la référence.")
+        return 0
+    print(f"\n{len(regressions)} régression(s) :")
+    for size, name, metric, old, new, _ in regressions:
+        print(f"  {size} {name} {metric}: {old} -> {new}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from services.utilisateur_service import UtilisateurService
 from models.base import Session
-from utils.jwt_manager import generate_token, load_token
+from utils.jwt_manager import generate_token, load_token, invalidate_token_cache
 import os
 import maskpass
 # from getpass import getpass
@@ -30,6 +30,7 @@ def run_login():
         # save token locally in .token file
         with open(".token", "w")as f:
             f.write(token)
+        invalidate_token_cache()
 
         return user  # return logged-in user
     else:
@@ -47,6 +48,7 @@ def run_logout():
     be able to use the stored JWT. If the file does not exist, a message
     is printed indicating that no session token was found.
     """
+    invalidate_token_cache()
     if os.path.exists(".token"):
         os.remove(".token")
         print("Déconnexion réussie.")
@@ -1,9 +1,12 @@
 from services.client_service import ClientService
-from services.utilisateur_service import UtilisateurService
 from models.base import Session
+from services.current_user import get_current_user
+from models.client import Client
+from policies.access_policy import allows
 from utils.jwt_manager import load_token
 from rich.table import Table
 from rich.console import Console
+from cli.pagination import PAGE_SIZE, browse, choose
 
 console = Console()
 
@@ -26,7 +29,7 @@ def run_create_client():
         print("Cette action est réservé aux utilisateurs commerciaux.")
         return
     session = Session()
-    service = ClientService(session)
+    service = ClientService(session, payload)
     print("**** Création d'un client **** ")
     nom = input("Nom complet : ")
     email = input("Email : ")
@@ -34,8 +37,7 @@ def run_create_client():
     entreprise = input("Entreprise : ")
 
     # Get current commercial user's ID
-    user_service = UtilisateurService(session)
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
 
     if user:
         client = service.create_client(nom, email, phone, entreprise, user.id)
@@ -53,10 +55,9 @@ def list_clients():
 
     This function:
         - Ensures a user is authenticated via the JWT payload.
-        - Opens a database session and resolves the current utilisateur.
         - If the user has the 'gestion' role, all clients are listed.
         - If the user has the 'commercial' role, only clients assigned to 
-          that commercial is listed.
+          that commercial is listed (scoped by the access policy).
         - For anyother role, access is denied
         - Prints a formatted list of clients or a message if none are found.
     """
@@ -64,45 +65,39 @@ def list_clients():
     if not payload:
         print("Veuillez vous connecter.")
         return
-    session = Session()
-    service = ClientService(session)
-    user_service = UtilisateurService(session)
-    user = user_service.repo.find_by_email(payload["email"])
-
-    if payload["role"] == "gestion":
-        clients = service.get_all_clients()  # lists all clients
-    elif payload["role"] == "commercial":
-        clients = service.get_clients_by_commercial_id(
-            user.id)  # lists only clients hold by them
-    else:
+    if not allows(payload, Client):
         print("Accès non autorisé pour votre role.")
-        session.close()
-        return
-    if not clients:
-        print("Aucun client trouvé.")
-        session.close()
         return
-
-    table = Table(
-        title="[bold bright_cyan] LISTE DES CLIENTS [/bold bright_cyan]")
-    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Nom complet", style="magenta")
-    table.add_column("Email", style="green")
-    table.add_column("Téléphone", style="yellow")
-    table.add_column("Entreprise", style="white")
-    table.add_column("Commercial", style="blue")
-
-    for client in clients:
-        commercial_name = client.commercial.nom if client.commercial else "Non assigné"
-        table.add_row(
-            str(client.id),
-            client.nom_complet,
-            client.email,
-            client.telephone or "",
-            client.entreprise or "",
-            commercial_name,
-        )
-    console.print(table)
+    session = Session()
+    service = ClientService(session, payload)
+
+    def fetch_page(after, before):
+        return service.get_clients_page(
+            page_size=PAGE_SIZE, after=after, before=before, profile="list")
+
+    def render(clients):
+        table = Table(
+            title="[bold bright_cyan] LISTE DES CLIENTS [/bold bright_cyan]")
+        table.add_column("ID", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Nom complet", style="magenta")
+        table.add_column("Email", style="green")
+        table.add_column("Téléphone", style="yellow")
+        table.add_column("Entreprise", style="white")
+        table.add_column("Commercial", style="blue")
+
+        for client in clients:
+            commercial_name = client.commercial.nom if client.commercial else "Non assigné"
+            table.add_row(
+                str(client.id),
+                client.nom_complet,
+                client.email,
+                client.telephone or "",
+                client.entreprise or "",
+                commercial_name,
+            )
+        console.print(table)
+
+    browse(fetch_page, render, "Aucun client trouvé.")
     session.close()
 
 
@@ -113,12 +108,12 @@ def update_client():
     This function:
       - Verifies that the current user is authenticated and has the
         'commercial' role via the JWT payload.
-      - Loads the logged-in commercial from the database and retrieves
-        only the clients assigned to that user.
-      - Displays the list of these clients and prompts for the ID of
-        the client to update.
-      - Ensures the selected client exists and belongs to the current
-        commercial before allowing any modification.
+      - Retrieves only the clients the user may see, through the
+        role-scoped ClientService.
+      - Displays these clients one page at a time and prompts for the ID
+        of the client to update.
+      - Ensures the selected client exists within that scope (so it
+        belongs to the current commercial) before allowing any modification.
       - Prompts for new values for each field (name, email, phone,
         company), allowing the user to leave fields empty to keep the
         existing values.
@@ -134,42 +129,37 @@ def update_client():
         print("Veuillez vous connecter.")
         return
 
-    session = Session()
-    user_service = UtilisateurService(session)
-    user = user_service.repo.find_by_email(payload["email"])
-    client_service = ClientService(session)
-
-    #  Gestion sees all the clients, commercial sees only theirs
-    if payload['role'] == 'gestion':
-        clients = client_service.get_all_clients()
-    elif payload['role'] == 'commercial':
-        clients = client_service.get_clients_by_commercial_id(user.id)
-    else:
+    if not allows(payload, Client):
         print("Accès non autorisé à la modification de client.")
-    # show clients to select from
-    if not clients:
-        print(" Vous n’avez aucun client.")
-        session.close()
         return
 
-    print("\n Vos clients :")
-    for client in clients:
-        print(
-            f"ID: {client.id} | Nom: {client.nom_complet} | Entreprise: {client.entreprise}")
-
-    client_id = input("Entrez l’ID du client à modifier : ")
+    session = Session()
+    client_service = ClientService(session, payload)
+
+    #  Gestion sees all the clients, commercial sees only theirs, one
+    # page at a time
+    def fetch_page(after, before):
+        return client_service.get_clients_page(
+            page_size=PAGE_SIZE, after=after, before=before)
+
+    def render(clients):
+        print("\n Vos clients :")
+        for client in clients:
+            print(
+                f"ID: {client.id} | Nom: {client.nom_complet} | Entreprise: {client.entreprise}")
+
+    client_id = choose(fetch_page, render, " Vous n’avez aucun client.",
+                       "Entrez l’ID du client à modifier")
+    if client_id is None:
+        session.close()
+        return
+    # scoped lookup: a commercial only finds his own clients
     client = client_service.get_client_by_id(client_id)
 
     if not client:
         print(" Client introuvable.")
         session.close()
         return
-   # check if commercial owns this client
-
-    if payload["role"] == "commercial" and client.commercial_id != user.id:
-        print(" Vous ne pouvez modifier que vos propres clients.")
-        session.close()
-        return
 
     # Input modifications
     print("Laissez vide pour ne pas modifier un champ.")
@@ -218,7 +208,7 @@ def delete_client():
         return
 
     session = Session()
-    service = ClientService(session)
+    service = ClientService(session, payload)
 
     client_id = input("ID du client à supprimer : ")
     client = service.get_client_by_id(client_id)
@@ -0,0 +1,879 @@
+"""
+Non-interactive command line interface.
+
+Every action of the interactive menu is also available as a subcommand
+built on the same services and access rules, for scripts and cron jobs:
+
+    python main.py contrats list --unsigned --format jsonl
+    python main.py evenements assign --id 42 --support 7
+    python -m cli users list --role support --format csv
+
+Results are written on stdout (rich table, json, jsonl or csv) and every
+message on stderr, so the output can be piped as is. The exit code tells
+the outcome: 0 success, 1 business error, 2 invalid arguments, 3 not
+logged in or access denied.
+
+The token is read from the EPIC_TOKEN environment variable when set,
+otherwise from the .token file written by `auth login`.
+"""
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime
+import os
+import sys
+import time
+
+from models.base import Session
+from models.client import Client
+from models.contrat import Contrat
+from models.evenement import Evenement
+from models.utilisateur import ROLES
+from policies.access_policy import allows
+from services.client_import_service import (
+    ClientImportService, DEFAULT_BATCH_SIZE,
+)
+from services.client_service import ClientService
+from services.contrat_service import ContratService
+from services.current_user import get_current_user
+from services.evenement_service import EvenementService
+from services.report_service import ReportService
+from services.unit_of_work import unit_of_work
+from services.user_import_service import (
+    UserImportService, DEFAULT_BATCH_SIZE as USER_BATCH_SIZE,
+)
+from services.export_service import (
+    ENTITIES, EXPORT_FORMATS, ExportService,
+    DEFAULT_BATCH_SIZE as EXPORT_BATCH_SIZE,
+)
+from services.utilisateur_service import UtilisateurService
+from utils.jwt_manager import (
+    TOKEN_FILE, decode_token, generate_token, invalidate_token_cache, load_token,
+)
+from utils.output_writers import (
+    CLIENT_COLUMNS, CONTRAT_COLUMNS, EVENEMENT_COLUMNS, FORMATS, USER_COLUMNS,
+    write_rows,
+)
+from utils.sentry_config import init_sentry, capture_exception, transaction
+from utils.sql_instrumentation import action
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_AUTH = 3
+
+# Rows fetched per query by the list commands
+BATCH_SIZE = int(os.getenv("EPIC_BATCH_SIZE", "500"))
+
+
+class CommandError(Exception):
+    """
+    Failure of a command: the message goes to stderr and exit_code is
+    returned to the shell.
+    """
+
+    def __init__(self, message, exit_code=EXIT_ERROR):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+class Result:
+    """
+    Entities returned by a command, with the columns used to write them.
+    """
+
+    def __init__(self, entities, columns, title=None):
+        self.entities = entities
+        self.columns = columns
+        self.title = title
+
+    def rows(self):
+        for entity in self.entities:
+            if isinstance(entity, dict):
+                yield entity
+            else:
+                yield {name: get(entity) for name, get in self.columns.items()}
+
+
+def _iterate(session, fetch_page, limit=None):
+    """
+    Yield the entities of a keyset-paginated listing, page after page.
+
+    The session is emptied between pages so that memory stays flat on
+    large listings (each page is fully written before the next query).
+    """
+    after = None
+    count = 0
+    while True:
+        page = fetch_page(page_size=BATCH_SIZE, after=after)
+        for item in page.items:
+            yield item
+            count += 1
+            if limit is not None and count >= limit:
+                return
+        if page.next_cursor is None:
+            return
+        after = page.next_cursor
+        session.expunge_all()
+
+
+def _require(entity, message):
+    if entity is None:
+        raise CommandError(message)
+    return entity
+
+
+def _updates(**fields):
+    updates = {k: v for k, v in fields.items() if v is not None}
+    if not updates:
+        raise CommandError("Aucune modification demandée.", EXIT_USAGE)
+    return updates
+
+
+def _read_password(args, prompt):
+    """
+    Read a password from stdin (--password-stdin) or prompt for it.
+    """
+    if getattr(args, "password_stdin", False):
+        return sys.stdin.readline().rstrip("\n")
+    import maskpass
+    return maskpass.askpass(prompt=prompt, mask="*")
+
+
+# -----------------------
+# auth
+# -----------------------
+
+def auth_login(args, session, payload):
+    service = UtilisateurService(session)
+    password = os.getenv("EPIC_PASSWORD")
+    if password is None or args.password_stdin:
+        password = _read_password(args, "Mot de passe: ")
+    user = service.login(args.email, password)
+    if not user:
+        raise CommandError(
+            "Échec de l’authentification. Vérifiez votre e-mail et votre mot de passe.",
+            EXIT_AUTH)
+
+    token = generate_token(user.id, user.email, user.role)
+    with open(TOKEN_FILE, "w") as f:
+        f.write(token)
+    invalidate_token_cache()
+
+    columns = dict(USER_COLUMNS)
+    if args.print_token:
+        columns["token"] = lambda u: token
+    return Result([user], columns)
+
+
+def auth_logout(args, session, payload):
+    invalidate_token_cache()
+    if os.path.exists(TOKEN_FILE):
+        os.remove(TOKEN_FILE)
+        print("Déconnexion réussie.", file=sys.stderr)
+    else:
+        print("Aucun token trouvé.", file=sys.stderr)
+
+
+def auth_whoami(args, session, payload):
+    return Result([get_current_user(session, payload)], USER_COLUMNS)
+
+
+# -----------------------
+# clients
+# -----------------------
+
+def clients_list(args, session, payload):
+    service = ClientService(session, payload)
+
+    def fetch_page(page_size, after):
+        return service.get_clients_page(
+            page_size=page_size, after=after, sort=args.sort,
+            commercial_id=args.commercial, profile="list")
+
+    return Result(_iterate(session, fetch_page, args.limit), CLIENT_COLUMNS,
+                  "LISTE DES CLIENTS")
+
+
+def clients_show(args, session, payload):
+    client = ClientService(session, payload).get_client_by_id(
+        args.id, profile="list")
+    return Result([_require(client, "Client introuvable.")], CLIENT_COLUMNS)
+
+
+def clients_create(args, session, payload):
+    user = get_current_user(session, payload)
+    client = ClientService(session, payload).create_client(
+        args.nom, args.email, args.telephone, args.entreprise, user.id)
+    return Result([client], CLIENT_COLUMNS)
+
+
+def clients_update(args, session, payload):
+    service = ClientService(session, payload)
+    # scoped lookup: a commercial only finds his own clients
+    client = _require(service.get_client_by_id(args.id), "Client introuvable.")
+    service.update_client(client, **_updates(
+        nom_complet=args.nom, email=args.email, telephone=args.telephone,
+        entreprise=args.entreprise))
+    return Result([client], CLIENT_COLUMNS)
+
+
+def clients_delete(args, session, payload):
+    service = ClientService(session, payload)
+    client = _require(service.get_client_by_id(args.id), "Client non trouvé.")
+    service.delete_client(client)
+    return Result([{"id": args.id, "supprime": True}], ["id", "supprime"])
+
+
+def _run_import(args, service, title, **options):
+    """
+    Run a CSV import service and report its rejected rows and summary.
+    """
+    def progress(report):
+        print(f"{report.read} lignes lues, {report.inserted} importées "
+              f"({report.rows_per_second:.0f} lignes/s)", file=sys.stderr)
+
+    try:
+        with open(args.file, newline="", encoding=args.encoding) as f:
+            report = service.import_csv(
+                f, batch_size=args.batch_size, dry_run=args.dry_run,
+                delimiter=args.delimiter,
+                on_batch=progress if args.progress else None, **options)
+    except OSError as e:
+        raise CommandError(f"Fichier illisible : {e}")
+    except ValueError as e:
+        raise CommandError(str(e), EXIT_USAGE)
+
+    if args.rejects and report.rejected:
+        fieldnames = getattr(service, "report_fieldnames", service.fieldnames)
+        with open(args.rejects, "w", newline="", encoding="utf-8") as f:
+            report.write_rejects(f, fieldnames)
+    elif report.rejected:
+        for line, reason, _ in report.rejected[:20]:
+            print(f"ligne {line} rejetée : {reason}", file=sys.stderr)
+        if len(report.rejected) > 20:
+            print(f"... {len(report.rejected) - 20} autres lignes rejetées "
+                  "(voir --rejects)", file=sys.stderr)
+
+    summary = report.summary()
+    return Result([summary], list(summary), title)
+
+
+def clients_import(args, session, payload):
+    return _run_import(args, ClientImportService(session, payload),
+                       "IMPORT DES CLIENTS")
+
+
+# -----------------------
+# contrats
+# -----------------------
+
+def contrats_list(args, session, payload):
+    service = ContratService(session, payload)
+
+    def fetch_page(page_size, after):
+        return service.get_contrats_page(
+            page_size=page_size, after=after, commercial_id=args.commercial,
+            unsigned=args.unsigned, unpaid=args.unpaid, profile="list")
+
+    return Result(_iterate(session, fetch_page, args.limit), CONTRAT_COLUMNS,
+                  "LISTE DES CONTRATS")
+
+
+def contrats_show(args, session, payload):
+    contrat = ContratService(session, payload).get_contrat_by_id(
+        args.id, profile="list")
+    return Result([_require(contrat, "Contrat introuvable.")], CONTRAT_COLUMNS)
+
+
+def contrats_create(args, session, payload):
+    contrat_service = ContratService(session, payload)
+    # a commercial only finds his own clients
+    client = _require(
+        ClientService(session, payload).get_client_by_id(args.client),
+        "Client introuvable.")
+    if payload["role"] == "gestion":
+        commercial_id = client.commercial_id
+    else:
+        commercial_id = payload["id"]
+
+    contrat = contrat_service.create_contrat(
+        client_id=client.id,
+        commercial_id=commercial_id,
+        montant_total=args.total,
+        montant_restant=args.restant if args.restant is not None else args.total,
+        statut=False,
+    )
+    return Result([contrat], CONTRAT_COLUMNS)
+
+
+def _require_all(entities, ids, message):
+    """
+    Abort unless every requested id was loaded (missing or out of scope).
+    """
+    missing = sorted(set(ids) - {entity.id for entity in entities})
+    if missing:
+        raise CommandError(f"{message} : {', '.join(map(str, missing))}")
+    return entities
+
+
+def contrats_update(args, session, payload):
+    service = ContratService(session, payload)
+    fields = _updates(montant_total=args.total, montant_restant=args.restant,
+                      statut=args.statut)
+    # one IN query for all the contracts, one transaction for all the writes
+    contrats = _require_all(service.get_contrats_by_ids(args.id), args.id,
+                            "Contrat(s) introuvable(s)")
+    with unit_of_work(session):
+        for contrat in contrats:
+            service.update_contrat(contrat, **fields)
+    # the commit expired them: reload the output in one query, not one per row
+    return Result(service.get_contrats_by_ids(args.id, profile="list"),
+                  CONTRAT_COLUMNS)
+
+
+def contrats_delete(args, session, payload):
+    service = ContratService(session, payload)
+    contrat = _require(service.get_contrat_by_id(args.id), "Contrat non trouvé.")
+    service.delete_contrat(contrat)
+    return Result([{"id": args.id, "supprime": True}], ["id", "supprime"])
+
+
+# -----------------------
+# evenements
+# -----------------------
+
+def evenements_list(args, session, payload):
+    service = EvenementService(session, payload)
+
+    def fetch_page(page_size, after):
+        return service.get_evenements_page(
+            page_size=page_size, after=after, support_id=args.support,
+            commercial_id=args.commercial, date_from=args.date_from,
+            date_to=args.date_to, unassigned_only=args.unassigned,
+            profile="list")
+
+    return Result(_iterate(session, fetch_page, args.limit), EVENEMENT_COLUMNS,
+                  "LISTE DES ÉVÉNEMENTS")
+
+
+def evenements_show(args, session, payload):
+    evenement = EvenementService(session, payload).get_evenement_by_id(
+        args.id, profile="list")
+    return Result([_require(evenement, "Événement introuvable.")],
+                  EVENEMENT_COLUMNS)
+
+
+def evenements_create(args, session, payload):
+    # the contract lookup is scoped to the commercial's own contracts
+    contrat = ContratService(session, payload).get_contrat_by_id(args.contrat)
+    if not contrat or not contrat.statut:
+        raise CommandError("Contrat invalide ou non signé.")
+    client = _require(contrat.client, "Client associé au contrat introuvable.")
+
+    evenement = EvenementService(session, payload).create_evenement(
+        contrat_id=contrat.id,
+        nom_client=client.nom_complet,
+        contact_client=f"{client.email} / {client.telephone}",
+        date_debut=args.debut,
+        date_fin=args.fin,
+        lieu=args.lieu,
+        participants=args.participants,
+        notes=args.notes,
+        support_id=None,  # assigned later by gestion
+    )
+    return Result([evenement], EVENEMENT_COLUMNS)
+
+
+def evenements_update(args, session, payload):
+    service = EvenementService(session, payload)
+    # a support only finds the events assigned to him
+    evenement = _require(service.get_evenement_by_id(args.id),
+                         "Événement introuvable.")
+    service.update_evenement(evenement, **_updates(
+        date_debut=args.debut, date_fin=args.fin, lieu=args.lieu,
+        participants=args.participants, notes=args.notes))
+    return Result([evenement], EVENEMENT_COLUMNS)
+
+
+def evenements_assign(args, session, payload):
+    service = EvenementService(session, payload)
+    evenements = _require_all(service.get_evenements_by_ids(args.id), args.id,
+                              "Événement(s) introuvable(s)")
+    support_user = _require(
+        UtilisateurService(session, payload).get_user_by_id(args.support),
+        "Utilisateur support introuvable.")
+    if support_user.role != "support":
+        raise CommandError("Cet utilisateur n'est pas un collaborateur SUPPORT.")
+    with unit_of_work(session):
+        for evenement in evenements:
+            service.update_evenement(evenement, support_id=support_user.id)
+    return Result(service.get_evenements_by_ids(args.id, profile="list"),
+                  EVENEMENT_COLUMNS)
+
+
+# -----------------------
+# users
+# -----------------------
+
+def users_list(args, session, payload):
+    service = UtilisateurService(session, payload)
+
+    def fetch_page(page_size, after):
+        return service.list_users_page(
+            page_size=page_size, after=after, role=args.role)
+
+    return Result(_iterate(session, fetch_page, args.limit), USER_COLUMNS,
+                  "LISTE DES UTILISATEURS")
+
+
+def users_show(args, session, payload):
+    user = UtilisateurService(session, payload).get_user_by_id(args.id)
+    return Result([_require(user, "Utilisateur introuvable.")], USER_COLUMNS)
+
+
+def users_create(args, session, payload):
+    password = _read_password(args, "Mot de passe: ")
+    if not password:
+        raise CommandError("Mot de passe vide.", EXIT_USAGE)
+    user = UtilisateurService(session, payload).create_user(
+        args.nom, args.email, password, args.role)
+    return Result([user], USER_COLUMNS)
+
+
+def users_import(args, session, payload):
+    return _run_import(args, UserImportService(session, payload),
+                       "IMPORT DES UTILISATEURS", workers=args.workers)
+
+
+def users_update(args, session, payload):
+    service = UtilisateurService(session, payload)
+    user = _require(service.get_user_by_id(args.id), "Utilisateur introuvable.")
+    password = None
+    if args.password_stdin:
+        password = _read_password(args, "Nouveau mot de passe: ") or None
+    service.update_user(user, **_updates(
+        nom=args.nom, email=args.email, role=args.role, mot_de_passe=password))
+    return Result([user], USER_COLUMNS)
+
+
+def users_delete(args, session, payload):
+    service = UtilisateurService(session, payload)
+    user = _require(service.get_user_by_id(args.id), "Utilisateur introuvable.")
+    if user.id == payload["id"]:
+        raise CommandError("Vous ne pouvez pas supprimer votre propre compte.")
+    service.delete_user(user)
+    return Result([{"id": args.id, "supprime": True}], ["id", "supprime"])
+
+
+# -----------------------
+# reports
+# -----------------------
+
+def reports_totals(args, session, payload):
+    try:
+        report = ReportService(session, payload).commercial_report(
+            breakdown=args.by, date_from=args.date_from, date_to=args.date_to,
+            commercial_id=args.commercial)
+    except ValueError as e:
+        raise CommandError(str(e), EXIT_USAGE)
+
+    columns = ["commercial_id", "commercial"]
+    if args.by == "month":
+        columns.append("mois")
+    elif args.by == "entreprise":
+        columns.append("entreprise")
+    columns += ["contrats", "signes", "non_signes", "taux_signature",
+                "montant_total", "montant_restant", "evenements",
+                "evenements_par_contrat"]
+    return Result(report, columns, "TOTAUX PAR COMMERCIAL")
+
+
+# -----------------------
+# export
+# -----------------------
+
+def export(args, session, payload):
+    model, _ = ENTITIES[args.entity]
+    if not allows(payload, model):
+        raise CommandError("Accès non autorisé pour votre rôle.", EXIT_AUTH)
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+    start = time.perf_counter()
+    try:
+        count = ExportService(session, payload).export(
+            args.entity, args.format, output=args.output, columns=columns,
+            date_from=args.date_from, date_to=args.date_to,
+            batch_size=args.batch_size)
+    except ValueError as e:
+        raise CommandError(str(e), EXIT_USAGE)
+    except BrokenPipeError:
+        raise
+    except OSError as e:
+        raise CommandError(f"Écriture impossible : {e}")
+    print(f"{count} lignes exportées en {time.perf_counter() - start:.2f} s.",
+          file=sys.stderr)
+
+
+# -----------------------
+# Parser
+# -----------------------
+
+def _datetime(value):
+    """
+    argparse type for dates: AAAA-MM-JJ or AAAA-MM-JJ HH:MM.
+    """
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(
+        f"date invalide : {value!r} (AAAA-MM-JJ ou AAAA-MM-JJ HH:MM)")
+
+
+def _end_datetime(value):
+    """
+    argparse type for inclusive upper bounds: a date alone (AAAA-MM-JJ)
+    stands for the end of that day, not its midnight.
+    """
+    moment = _datetime(value)
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return moment
+    return moment.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+
+def _date(value):
+    """
+    argparse type for calendar dates: AAAA-MM-JJ.
+    """
+    return _datetime(value).date()
+
+
+def _command(group, name, handler, help, login=True, roles=None, model=None,
+             denied="Accès non autorisé pour votre rôle."):
+    """
+    Declare a subcommand with its access rule.
+
+    roles restricts the command to some roles, model requires read access
+    to the entity type (see policies.access_policy.allows).
+    """
+    parser = group.add_parser(name, help=help, parents=[_common])
+    parser.set_defaults(handler=handler, login=login, roles=roles,
+                        model=model, denied=denied)
+    return parser
+
+
+def _list_options(parser):
+    parser.add_argument("--limit", type=int,
+                        help="nombre maximum de lignes")
+
+
+_common = argparse.ArgumentParser(add_help=False)
+_common.add_argument(
+    "--format", "-f", choices=FORMATS,
+    default=os.getenv("EPIC_OUTPUT_FORMAT", "table"),
+    help="format de sortie (défaut : table, ou EPIC_OUTPUT_FORMAT)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="epic", description="Epic Events CRM - commandes non interactives")
+    groups = parser.add_subparsers(dest="group", metavar="GROUPE", required=True)
+
+    # auth
+    auth = groups.add_parser("auth", help="connexion").add_subparsers(
+        dest="action", metavar="ACTION", required=True)
+    p = _command(auth, "login", auth_login, "se connecter", login=False)
+    p.add_argument("--email", required=True)
+    p.add_argument("--password-stdin", action="store_true",
+                   help="lire le mot de passe sur l'entrée standard "
+                        "(sinon EPIC_PASSWORD ou saisie masquée)")
+    p.add_argument("--print-token", action="store_true",
+                   help="ajouter le jeton à la sortie (pour EPIC_TOKEN)")
+    _command(auth, "logout", auth_logout, "se déconnecter", login=False)
+    _command(auth, "whoami", auth_whoami, "utilisateur connecté")
+
+    # clients
+    clients = groups.add_parser("clients", help="clients").add_subparsers(
+        dest="action", metavar="ACTION", required=True)
+    p = _command(clients, "list", clients_list, "lister les clients",
+                 model=Client)
+    p.add_argument("--commercial", type=int, help="ID du commercial")
+    p.add_argument("--sort", choices=("id", "nom_complet"), default="id")
+    _list_options(p)
+    p = _command(clients, "show", clients_show, "afficher un client",
+                 model=Client)
+    p.add_argument("--id", type=int, required=True)
+    p = _command(clients, "create", clients_create, "créer un client",
+                 roles=("commercial",),
+                 denied="Cette action est réservé aux utilisateurs commerciaux.")
+    p.add_argument("--nom", required=True)
+    p.add_argument("--email", required=True)
+    p.add_argument("--telephone")
+    p.add_argument("--entreprise")
+    p = _command(clients, "update", clients_update, "modifier un client",
+                 model=Client,
+                 denied="Accès non autorisé à la modification de client.")
+    p.add_argument("--id", type=int, required=True)
+    p.add_argument("--nom")
+    p.add_argument("--email")
+    p.add_argument("--telephone")
+    p.add_argument("--entreprise")
+    p = _command(clients, "import", clients_import,
+                 "importer des clients depuis un fichier CSV",
+                 roles=("gestion", "commercial"),
+                 denied="Seuls les rôles GESTION ou COMMERCIAL peuvent "
+                        "importer des clients.")
+    p.add_argument("file", help="fichier CSV (nom_complet, email, telephone, "
+                                "entreprise, commercial_id ou commercial_email)")
+    p.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                   help="lignes insérées par transaction")
+    p.add_argument("--dry-run", action="store_true",
+                   help="valider le fichier sans rien écrire")
+    p.add_argument("--rejects", help="écrire les lignes rejetées dans ce CSV")
+    p.add_argument("--delimiter", default=",")
+    p.add_argument("--encoding", default="utf-8-sig")
+    p.add_argument("--progress", action="store_true",
+                   help="afficher l'avancement après chaque lot")
+    p = _command(clients, "delete", clients_delete, "supprimer un client",
+                 roles=("gestion",),
+                 denied="Seul le gestion peut supprimer un client.")
+    p.add_argument("--id", type=int, required=True)
+
+    # contrats
+    contrats = groups.add_parser("contrats", help="contrats").add_subparsers(
+        dest="action", metavar="ACTION", required=True)
+    p = _command(contrats, "list", contrats_list, "lister les contrats",
+                 model=Contrat)
+    p.add_argument("--unsigned", action="store_true",
+                   help="contrats non signés")
+    p.add_argument("--unpaid", action="store_true",
+                   help="contrats non entièrement payés")
+    p.add_argument("--commercial", type=int, help="ID du commercial")
+    _list_options(p)
+    p = _command(contrats, "show", contrats_show, "afficher un contrat",
+                 model=Contrat)
+    p.add_argument("--id", type=int, required=True)
+    p = _command(contrats, "create", contrats_create, "créer un contrat",
+                 roles=("gestion", "commercial"),
+                 denied="Accès interdit : seuls les utilisateurs GESTION ou "
+                        "COMMERCIAL peuvent créer un contrat")
+    p.add_argument("--client", type=int, required=True, help="ID du client")
+    p.add_argument("--total", type=float, required=True)
+    p.add_argument("--restant", type=float,
+                   help="montant restant (défaut : le total)")
+    p = _command(contrats, "update", contrats_update, "modifier des contrats",
+                 roles=("gestion", "commercial"),
+                 denied="Accès non autorisé à la modification de contrat.")
+    p.add_argument("--id", type=int, nargs="+", required=True,
+                   help="ID du ou des contrats")
+    p.add_argument("--total", type=float)
+    p.add_argument("--restant", type=float)
+    statut = p.add_mutually_exclusive_group()
+    statut.add_argument("--signed", dest="statut", action="store_const",
+                        const=True)
+    statut.add_argument("--unsigned", dest="statut", action="store_const",
+                        const=False)
+    p = _command(contrats, "delete", contrats_delete, "supprimer un contrat",
+                 roles=("gestion",),
+                 denied="Seul le rôle GESTION peut supprimer un contrat.")
+    p.add_argument("--id", type=int, required=True)
+
+    # evenements
+    evenements = groups.add_parser(
+        "evenements", help="événements").add_subparsers(
+        dest="action", metavar="ACTION", required=True)
+    p = _command(evenements, "list", evenements_list, "lister les événements",
+                 model=Evenement)
+    p.add_argument("--from", dest="date_from", type=_datetime,
+                   help="début au plus tôt (AAAA-MM-JJ [HH:MM])")
+    p.add_argument("--to", dest="date_to", type=_end_datetime,
+                   help="début au plus tard (AAAA-MM-JJ [HH:MM], une date "
+                        "seule inclut toute la journée)")
+    p.add_argument("--unassigned", action="store_true",
+                   help="événements sans support")
+    p.add_argument("--support", type=int, help="ID du support")
+    p.add_argument("--commercial", type=int, help="ID du commercial")
+    _list_options(p)
+    p = _command(evenements, "show", evenements_show, "afficher un événement",
+                 model=Evenement)
+    p.add_argument("--id", type=int, required=True)
+    p = _command(evenements, "create", evenements_create,
+                 "créer un événement", roles=("commercial",),
+                 denied="Seuls les utilisateurs COMMERCIAL peuvent créer "
+                        "un événement.")
+    p.add_argument("--contrat", type=int, required=True,
+                   help="ID du contrat signé")
+    p.add_argument("--debut", type=_datetime, required=True)
+    p.add_argument("--fin", type=_datetime, required=True)
+    p.add_argument("--lieu", required=True)
+    p.add_argument("--participants", type=int, required=True)
+    p.add_argument("--notes")
+    p = _command(evenements, "update", evenements_update,
+                 "modifier un événement", roles=("gestion", "support"),
+                 denied="Seuls les rôles GESTION ou SUPPORT peuvent modifier "
+                        "un événement.")
+    p.add_argument("--id", type=int, required=True)
+    p.add_argument("--debut", type=_datetime)
+    p.add_argument("--fin", type=_datetime)
+    p.add_argument("--lieu")
+    p.add_argument("--participants", type=int)
+    p.add_argument("--notes")
+    p = _command(evenements, "assign", evenements_assign,
+                 "affecter un support", roles=("gestion",),
+                 denied="Seul le rôle GESTION peut affecter un support.")
+    p.add_argument("--id", type=int, nargs="+", required=True,
+                   help="ID du ou des événements")
+    p.add_argument("--support", type=int, required=True,
+                   help="ID du collaborateur support")
+
+    # users
+    users = groups.add_parser("users", help="utilisateurs").add_subparsers(
+        dest="action", metavar="ACTION", required=True)
+    gestion_only = "Accès refusé. GESTION Uniquement."
+    p = _command(users, "list", users_list, "lister les utilisateurs",
+                 roles=("gestion",), denied=gestion_only)
+    p.add_argument("--role", choices=ROLES)
+    _list_options(p)
+    p = _command(users, "show", users_show, "afficher un utilisateur",
+                 roles=("gestion",), denied=gestion_only)
+    p.add_argument("--id", type=int, required=True)
+    p = _command(users, "create", users_create, "créer un utilisateur",
+                 roles=("gestion",), denied=gestion_only)
+    p.add_argument("--nom", required=True)
+    p.add_argument("--email", required=True)
+    p.add_argument("--role", choices=ROLES, required=True)
+    p.add_argument("--password-stdin", action="store_true",
+                   help="lire le mot de passe sur l'entrée standard")
+    p = _command(users, "import", users_import,
+                 "créer des utilisateurs depuis un fichier CSV",
+                 roles=("gestion",), denied=gestion_only)
+    p.add_argument("file", help="fichier CSV (nom, email, role, mot_de_passe)")
+    p.add_argument("--batch-size", type=int, default=USER_BATCH_SIZE,
+                   help="utilisateurs hachés et insérés par transaction")
+    p.add_argument("--workers", type=int,
+                   help="processus de hachage (défaut : un par cœur)")
+    p.add_argument("--dry-run", action="store_true",
+                   help="valider le fichier sans rien écrire")
+    p.add_argument("--rejects", help="écrire les lignes rejetées dans ce CSV "
+                                     "(sans les mots de passe)")
+    p.add_argument("--delimiter", default=",")
+    p.add_argument("--encoding", default="utf-8-sig")
+    p.add_argument("--progress", action="store_true",
+                   help="afficher l'avancement après chaque lot")
+    p = _command(users, "update", users_update, "modifier un utilisateur",
+                 roles=("gestion",),
+                 denied="Seul le rôle GESTION peut modifier un utilisateur.")
+    p.add_argument("--id", type=int, required=True)
+    p.add_argument("--nom")
+    p.add_argument("--email")
+    p.add_argument("--role", choices=ROLES)
+    p.add_argument("--password-stdin", action="store_true",
+                   help="lire le nouveau mot de passe sur l'entrée standard")
+    p = _command(users, "delete", users_delete, "supprimer un utilisateur",
+                 roles=("gestion",),
+                 denied="Seul le rôle GESTION peut supprimer un utilisateur.")
+    p.add_argument("--id", type=int, required=True)
+
+    # reports
+    reports = groups.add_parser("reports", help="rapports").add_subparsers(
+        dest="action", metavar="ACTION", required=True)
+    p = _command(reports, "totals", reports_totals,
+                 "chiffre d'affaires, restant dû et signatures par commercial",
+                 model=Contrat)
+    p.add_argument("--by", choices=("month", "entreprise"),
+                   help="ventiler par mois de création ou par entreprise")
+    p.add_argument("--from", dest="date_from", type=_date,
+                   help="contrats créés à partir du (AAAA-MM-JJ)")
+    p.add_argument("--to", dest="date_to", type=_date,
+                   help="contrats créés jusqu'au (AAAA-MM-JJ)")
+    p.add_argument("--commercial", type=int, help="ID du commercial")
+
+    # export
+    p = groups.add_parser(
+        "export", help="exporter des données (csv, jsonl, parquet)")
+    p.set_defaults(handler=export, login=True, roles=None, model=None,
+                   denied=None)
+    p.add_argument("entity", choices=list(ENTITIES))
+    p.add_argument("--format", "-f", choices=EXPORT_FORMATS, default="csv")
+    p.add_argument("--output", "-o",
+                   help="fichier de sortie (défaut : sortie standard, "
+                        "obligatoire pour parquet)")
+    p.add_argument("--columns",
+                   help="colonnes à exporter, séparées par des virgules")
+    p.add_argument("--from", dest="date_from", type=_datetime,
+                   help="date de création (de début pour les événements) "
+                        "au plus tôt")
+    p.add_argument("--to", dest="date_to", type=_end_datetime,
+                   help="date de création (de début pour les événements) "
+                        "au plus tard, une date seule incluant toute la "
+                        "journée")
+    p.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE,
+                   help="lignes lues par aller-retour avec la base")
+
+    return parser
+
+
+# -----------------------
+# Execution
+# -----------------------
+
+def _load_payload():
+    """
+    Decode EPIC_TOKEN, or the .token file, keeping stdout clean.
+    """
+    token = os.getenv("EPIC_TOKEN")
+    with redirect_stdout(sys.stderr):
+        return decode_token(token) if token else load_token()
+
+
+def execute(args, stream=None):
+    """
+    Run the command selected by parsed arguments and write its result.
+
+    Raises CommandError when the command fails.
+    """
+    payload = None
+    if args.login:
+        payload = _load_payload()
+        if not payload:
+            raise CommandError("Veuillez vous connecter.", EXIT_AUTH)
+        if args.roles and payload["role"] not in args.roles:
+            raise CommandError(args.denied, EXIT_AUTH)
+        if args.model and not allows(payload, args.model):
+            raise CommandError(args.denied, EXIT_AUTH)
+
+    session = Session()
+    try:
+        if payload and get_current_user(session, payload) is None:
+            raise CommandError("Utilisateur introuvable.", EXIT_AUTH)
+        # listings are lazy: their queries run while the rows are written
+        name = args.handler.__name__
+        with transaction(name, "cli.command"), action(name):
+            result = args.handler(args, session, payload)
+            if result is not None:
+                write_rows(result.rows(), list(result.columns), args.format,
+                           stream=stream, title=result.title)
+    finally:
+        session.close()
+
+
+def main(argv=None):
+    """
+    Entry point of the non-interactive interface; returns the exit code.
+    """
+    args = build_parser().parse_args(argv)
+    init_sentry()
+    try:
+        execute(args)
+    except CommandError as e:
+        print(e, file=sys.stderr)
+        return e.exit_code
+    except BrokenPipeError:
+        # output piped into `head` and the like
+        return EXIT_OK
+    except Exception:
+        capture_exception()
+        raise
+    return EXIT_OK
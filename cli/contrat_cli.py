@@ -2,11 +2,14 @@
 
 from services.contrat_service import ContratService
 from services.client_service import ClientService
-from services.utilisateur_service import UtilisateurService
 from models.base import Session
+from services.current_user import get_current_user
+from models.contrat import Contrat
+from policies.access_policy import allows
 from utils.jwt_manager import load_token
 from rich.table import Table
 from rich.console import Console
+from cli.pagination import PAGE_SIZE, browse, choose
 console = Console()
 
 # -----------------------
@@ -38,12 +41,11 @@ def run_create_contrat():
         return
 
     session = Session()
-    contrat_service = ContratService(session)
-    client_service = ClientService(session)
-    user_service = UtilisateurService(session)
+    contrat_service = ContratService(session, payload)
+    client_service = ClientService(session, payload)
 
-    # Récuprer l'utilisateur connecté à partir de l'email dans le token
-    user = user_service.repo.find_by_email(payload["email"])
+    # Récupérer l'utilisateur connecté à partir de l'id dans le token
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
@@ -56,18 +58,14 @@ def run_create_contrat():
         print("ID client invalide.")
         session.close()
         return
+    # Règles d'accès (appliquées par la recherche filtrée par rôle) :
+    # - Si 'commercial' : il ne peut créer un contrat que pour SES clients
+    # - Si 'gestion' : peut créer un contrat pour n'importe quel client
     client = client_service.get_client_by_id(client_id)
     if not client:
         print("Client introuvable.")
         session.close()
         return
-    # Règles d'accès :
-    # - Si 'commercial' : il ne peut créer un contrat que pour SES clients
-    # - Si 'gestion' : peut créer un contrat pour n'importe quel client
-    if payload["role"] == "commercial" and client.commercial_id != user.id:
-        print("Accès interdit : ce client n'est pas le vôtre.")
-        session.close()
-        return
 
     if payload["role"] == "gestion":
         commercial_id = client.commercial_id  # contrat lié au commercial du client
@@ -134,60 +132,56 @@ def run_list_contrats():
         print("Veuillez vous connecter.")
         return
 
+    if not allows(payload, Contrat):
+        print("Accès non autorisé pour votre rôle.")
+        return
+
     session = Session()
-    contrat_service = ContratService(session)
-    user_service = UtilisateurService(session)
+    contrat_service = ContratService(session, payload)
 
     # Retrieve the logged-in user from the database
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
         return
 
-    role = payload["role"]
-
-    if role == "gestion":
-        contrats = contrat_service.get_all_contrats()
-    elif role == "commercial":
-        contrats = contrat_service.get_contrats_by_commercial_id(user.id)
-    else:
-        print("Accès non autorisé pour votre rôle.")
-        session.close()
-        return
-
-    if not contrats:
-        print("Aucun contrat trouvé.")
-        session.close()
-        return
-
-    table = Table(
-        title="[bold bright_cyan]LISTE DES CONTRATS[/bold bright_cyan]")
-    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Client", style="magenta")
-    table.add_column("Commercial", style="blue")
-    table.add_column("Total (€)", justify="right", style="green")
-    table.add_column("Restant (€)", justify="right", style="yellow")
-    table.add_column("Date", style="white")
-    table.add_column("Statut", style="bright_white")
-
-    for c in contrats:
-        client_name = c.client.nom_complet if c.client else "Inconnu"
-        commercial_name = c.commercial.nom if c.commercial else "Inconnu"
-        statut_label = "Signé" if c.statut else "Non signé"
-        date_str = c.date_creation.strftime(
-            "%Y-%m-%d") if c.date_creation else "N/A"
-
-        table.add_row(
-            str(c.id),
-            client_name,
-            commercial_name,
-            f"{float(c.montant_total):.2f}",
-            f"{float(c.montant_restant):.2f}",
-            date_str,
-            statut_label,
-        )
-    console.print(table)
+    # The service is scoped to the role: all contracts for 'gestion',
+    # own contracts for 'commercial'
+    def fetch_page(after, before):
+        return contrat_service.get_contrats_page(
+            page_size=PAGE_SIZE, after=after, before=before, profile="list")
+
+    def render(contrats):
+        table = Table(
+            title="[bold bright_cyan]LISTE DES CONTRATS[/bold bright_cyan]")
+        table.add_column("ID", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Client", style="magenta")
+        table.add_column("Commercial", style="blue")
+        table.add_column("Total (€)", justify="right", style="green")
+        table.add_column("Restant (€)", justify="right", style="yellow")
+        table.add_column("Date", style="white")
+        table.add_column("Statut", style="bright_white")
+
+        for c in contrats:
+            client_name = c.client.nom_complet if c.client else "Inconnu"
+            commercial_name = c.commercial.nom if c.commercial else "Inconnu"
+            statut_label = "Signé" if c.statut else "Non signé"
+            date_str = c.date_creation.strftime(
+                "%Y-%m-%d") if c.date_creation else "N/A"
+
+            table.add_row(
+                str(c.id),
+                client_name,
+                commercial_name,
+                f"{float(c.montant_total):.2f}",
+                f"{float(c.montant_restant):.2f}",
+                date_str,
+                statut_label,
+            )
+        console.print(table)
+
+    browse(fetch_page, render, "Aucun contrat trouvé.")
     session.close()
 
 
@@ -199,7 +193,7 @@ def run_update_contrat():
       - Verifies that the current user is authenticated.
       - Allows 'gestion' to modify any contract.
       - Allows 'commercial' to modify only contracts linked to their own clients.
-      - Lists the relevant contracts for selection.
+      - Lists the relevant contracts for selection, one page at a time.
       - Prompts the user for new values (total, remaining, statut),
         leaving fields empty to keep current values.
       - Applies the updates via ContratService.
@@ -220,39 +214,37 @@ def run_update_contrat():
         return
 
     session = Session()
-    contrat_service = ContratService(session)
-    user_service = UtilisateurService(session)
+    contrat_service = ContratService(session, payload)
 
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
         return
 
-    role = payload["role"]
-
-    # Determine which contracts the user can see
-    if role == "gestion":
-        contrats = contrat_service.get_all_contrats()
-    else:  # commercial
-        contrats = contrat_service.get_contrats_by_commercial_id(user.id)
-
-    if not contrats:
-        print("Aucun contrat disponible pour modification.")
+    # Contracts the user can see: all for 'gestion', own for 'commercial',
+    # one page at a time
+    def fetch_page(after, before):
+        return contrat_service.get_contrats_page(
+            page_size=PAGE_SIZE, after=after, before=before, profile="list")
+
+    def render(contrats):
+        print("\n Vos contrats :")
+        for c in contrats:
+            client_name = c.client.nom_complet if c.client else "Inconnu"
+            statut_label = "Signé" if c.statut else "Non signé"
+            print(
+                f"ID: {c.id} | Client: {client_name} | Total: {float(c.montant_total):.2f}€ | "
+                f"Restant: {float(c.montant_restant):.2f}€ | Statut: {statut_label}"
+            )
+
+    contrat_id_input = choose(
+        fetch_page, render, "Aucun contrat disponible pour modification.",
+        "Entrez l’ID du contrat à modifier")
+    if contrat_id_input is None:
         session.close()
         return
 
-    print("\n Vos contrats :")
-    for c in contrats:
-        client_name = c.client.nom_complet if c.client else "Inconnu"
-        statut_label = "Signé" if c.statut else "Non signé"
-        print(
-            f"ID: {c.id} | Client: {client_name} | Total: {float(c.montant_total):.2f}€ | "
-            f"Restant: {float(c.montant_restant):.2f}€ | Statut: {statut_label}"
-        )
-
-    contrat_id_input = input("Entrez l’ID du contrat à modifier : ")
-
     try:
         contrat_id = int(contrat_id_input)
     except ValueError:
@@ -260,18 +252,13 @@ def run_update_contrat():
         session.close()
         return
 
+    # Security: the scoped lookup only finds a commercial's own contracts
     contrat = contrat_service.get_contrat_by_id(contrat_id)
     if not contrat:
         print("Contrat introuvable.")
         session.close()
         return
 
-    # Security: commercial can only modify their own contracts
-    if role == "commercial" and contrat.commercial_id != user.id:
-        print("Vous ne pouvez modifier que vos propres contrats.")
-        session.close()
-        return
-
     print("Laissez vide pour ne pas modifier un champ.")
     new_total_input = input(
         f"Nouveau montant total ({float(contrat.montant_total):.2f}) : ")
@@ -338,7 +325,7 @@ def run_delete_contrat():
         return
 
     session = Session()
-    contrat_service = ContratService(session)
+    contrat_service = ContratService(session, payload)
 
     contrat_id_input = input("ID du contrat à supprimer : ")
     try:
@@ -348,7 +335,7 @@ def run_delete_contrat():
         session.close()
         return
 
-    contrat = contrat_service.get_contrat_by_id(contrat_id)
+    contrat = contrat_service.get_contrat_by_id(contrat_id, profile="detail")
     if not contrat:
         print("Contrat non trouvé.")
         session.close()
@@ -381,51 +368,44 @@ def run_list_contrats_non_signes():
         print("Veuillez vous connecter.")
         return
 
+    if not allows(payload, Contrat):
+        print("Accès non autorisé pour votre rôle.")
+        return
+
     session = Session()
-    contrat_service = ContratService(session)
-    user_service = UtilisateurService(session)
+    contrat_service = ContratService(session, payload)
 
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
         return
 
-    role = payload["role"]
-
-    if role == "gestion":
-        contrats = contrat_service.get_unsigned_contrats()
-    elif role == "commercial":
-        tous = contrat_service.get_contrats_by_commercial_id(user.id)
-        contrats = [c for c in tous if not c.statut]
-    else:
-        print("Accès non autorisé pour votre rôle.")
-        session.close()
-        return
-
-    if not contrats:
-        print("Aucun contrat non signé trouvé.")
-        session.close()
-        return
-
-    print(" **** CONTRATS NON SIGNÉS ****")
-    print(
-        f"{'ID':<4} | {'Client':<25} | {'Commercial':<15} | "
-        f"{'Total (€)':<10} | {'Restant (€)':<12} | {'Date':<12}"
-    )
-    print("-" * 100)
+    def fetch_page(after, before):
+        return contrat_service.get_contrats_page(
+            page_size=PAGE_SIZE, after=after, before=before,
+            unsigned=True, profile="list")
 
-    for c in contrats:
-        client_name = c.client.nom_complet if c.client else "Inconnu"
-        commercial_name = c.commercial.nom if c.commercial else "Inconnu"
-        date_str = c.date_creation.strftime(
-            "%Y-%m-%d") if c.date_creation else "N/A"
+    def render(contrats):
+        print(" **** CONTRATS NON SIGNÉS ****")
         print(
-            f"{c.id:<4} | {client_name:<25} | {commercial_name:<15} | "
-            f"{float(c.montant_total):<10.2f} | {float(c.montant_restant):<12.2f} | "
-            f"{date_str:<12}"
+            f"{'ID':<4} | {'Client':<25} | {'Commercial':<15} | "
+            f"{'Total (€)':<10} | {'Restant (€)':<12} | {'Date':<12}"
         )
-
+        print("-" * 100)
+
+        for c in contrats:
+            client_name = c.client.nom_complet if c.client else "Inconnu"
+            commercial_name = c.commercial.nom if c.commercial else "Inconnu"
+            date_str = c.date_creation.strftime(
+                "%Y-%m-%d") if c.date_creation else "N/A"
+            print(
+                f"{c.id:<4} | {client_name:<25} | {commercial_name:<15} | "
+                f"{float(c.montant_total):<10.2f} | {float(c.montant_restant):<12.2f} | "
+                f"{date_str:<12}"
+            )
+
+    browse(fetch_page, render, "Aucun contrat non signé trouvé.")
     session.close()
 
 
@@ -442,50 +422,43 @@ def run_list_contrats_non_payes():
         print("Veuillez vous connecter.")
         return
 
+    if not allows(payload, Contrat):
+        print("Accès non autorisé pour votre rôle.")
+        return
+
     session = Session()
-    contrat_service = ContratService(session)
-    user_service = UtilisateurService(session)
+    contrat_service = ContratService(session, payload)
 
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
         return
 
-    role = payload["role"]
-
-    if role == "gestion":
-        contrats = contrat_service.get_unpaid_contrats()
-    elif role == "commercial":
-        tous = contrat_service.get_contrats_by_commercial_id(user.id)
-        contrats = [c for c in tous if c.montant_restant > 0]
-    else:
-        print("Accès non autorisé pour votre rôle.")
-        session.close()
-        return
-
-    if not contrats:
-        print("Aucun contrat non payé trouvé.")
-        session.close()
-        return
+    def fetch_page(after, before):
+        return contrat_service.get_contrats_page(
+            page_size=PAGE_SIZE, after=after, before=before,
+            unpaid=True, profile="list")
 
-    print(" **** CONTRATS NON ENTIÈREMENT PAYÉS ****")
-    print(
-        f"{'ID':<4} | {'Client':<25} | {'Commercial':<15} | "
-        f"{'Total (€)':<10} | {'Restant (€)':<12} | {'Date':<12} | {'Statut':<8}"
-    )
-    print("-" * 110)
-
-    for c in contrats:
-        client_name = c.client.nom_complet if c.client else "Inconnu"
-        commercial_name = c.commercial.nom if c.commercial else "Inconnu"
-        date_str = c.date_creation.strftime(
-            "%Y-%m-%d") if c.date_creation else "N/A"
-        statut_label = "Signé" if c.statut else "Non signé"
+    def render(contrats):
+        print(" **** CONTRATS NON ENTIÈREMENT PAYÉS ****")
         print(
-            f"{c.id:<4} | {client_name:<25} | {commercial_name:<15} | "
-            f"{float(c.montant_total):<10.2f} | {float(c.montant_restant):<12.2f} | "
-            f"{date_str:<12} | {statut_label:<8}"
+            f"{'ID':<4} | {'Client':<25} | {'Commercial':<15} | "
+            f"{'Total (€)':<10} | {'Restant (€)':<12} | {'Date':<12} | {'Statut':<8}"
         )
-
+        print("-" * 110)
+
+        for c in contrats:
+            client_name = c.client.nom_complet if c.client else "Inconnu"
+            commercial_name = c.commercial.nom if c.commercial else "Inconnu"
+            date_str = c.date_creation.strftime(
+                "%Y-%m-%d") if c.date_creation else "N/A"
+            statut_label = "Signé" if c.statut else "Non signé"
+            print(
+                f"{c.id:<4} | {client_name:<25} | {commercial_name:<15} | "
+                f"{float(c.montant_total):<10.2f} | {float(c.montant_restant):<12.2f} | "
+                f"{date_str:<12} | {statut_label:<8}"
+            )
+
+    browse(fetch_page, render, "Aucun contrat non payé trouvé.")
     session.close()
@@ -6,7 +6,11 @@ from services.evenement_service import EvenementService
 from services.contrat_service import ContratService
 from services.utilisateur_service import UtilisateurService
 from models.base import Session
+from services.current_user import get_current_user
+from models.evenement import Evenement
+from policies.access_policy import allows
 from utils.jwt_manager import load_token
+from cli.pagination import PAGE_SIZE, browse, choose
 
 console = Console()
 
@@ -29,19 +33,17 @@ def run_create_evenement():
         print("Seuls les utilisateurs COMMERCIAL peuvent créer un événement.")
         return
     session = Session()
-    evenement_service = EvenementService(session)
-    contrat_service = ContratService(session)
-    user_service = UtilisateurService(session)
+    evenement_service = EvenementService(session, payload)
+    contrat_service = ContratService(session, payload)
 
     # Retrieve the logged-in user
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
         return
-    # Load contracts for this commercial and keep only signed ones
-    contrats = contrat_service.get_contrats_by_commercial_id(user.id)
-    contrats_signes = [c for c in contrats if c.statut]
+    # Signed contracts of this commercial (the service is scoped to him)
+    contrats_signes = contrat_service.get_signed_contrats(profile="list")
 
     if not contrats_signes:
         print("Vous n'avez aucun contrat signé. Impossible de créer un événement.")
@@ -144,98 +146,87 @@ def run_list_evenements():
     if not payload:
         print("Veuillez vous connecter.")
         return
+    if not allows(payload, Evenement):
+        print("Rôle non autorisé.")
+        return
 
     session = Session()
-    evenement_service = EvenementService(session)
-    user_service = UtilisateurService(session)
+    evenement_service = EvenementService(session, payload)
 
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
         return
 
-    role = payload["role"]
-
-    if role == "gestion":
-        evenements = evenement_service.get_all_evenements()
-    elif role == "commercial":
-        # Load all events and filter by contracts belonging to this commercial
-        tous = evenement_service.get_all_evenements()
-        evenements = [
-            e for e in tous
-            if e.contrat and e.contrat.commercial_id == user.id
-        ]
-    elif role == "support":
-        evenements = evenement_service.get_evenements_by_support_id(user.id)
-    else:
-        print("Rôle non autorisé.")
-        session.close()
-        return
-
-    if not evenements:
-        print("Aucun événement trouvé.")
-        session.close()
-        return
-
-    table = Table(
-        title="[bold bright_cyan ] LISTE DES EVENEMENTS [/bold bright_cyan]")
-
-    table.add_column("Event ID", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Contract ID", justify="right", style="green")
-    table.add_column("Client name", style="magenta")
-    table.add_column("Client contact", style="yellow")
-    table.add_column("Event date start", style="white")
-    table.add_column("Event date end", style="white")
-    table.add_column("Support contact", style="blue")
-    table.add_column("Location", style="white")
-    table.add_column("Attendees", justify="right", style="bright_white")
-    table.add_column("Notes", style="bright_black")
-
-    for e in evenements:
-        # Client name: use nom_client if set, otherwise via relation
-        client_name = (
-            e.nom_client
-            or (e.contrat.client.nom_complet if e.contrat and e.contrat.client else "Inconnu")
-        )
-        # Client contact: use contact_client if set, otherwise try from client entity
-        if e.contact_client:
-            client_contact = e.contact_client
-        elif e.contrat and e.contrat.client:
-            cl = e.contrat.client
-            client_contact = f"{cl.email or ''} / {cl.telephone or ''}"
-        else:
-            client_contact = ""
-
-        support_name = e.support.nom if e.support else "Non assigné"
-        debut_str = e.date_debut.strftime(
-            "%Y-%m-%d %H:%M") if e.date_debut else "N/A"
-        fin_str = e.date_fin.strftime(
-            "%Y-%m-%d %H:%M") if e.date_fin else "N/A"
-        contrat_id_str = str(e.contrat_id) if e.contrat_id else "N/A"
-        participants_str = str(
-            e.participants) if e.participants is not None else ""
-
-        # Notes potentially longues → on tronque pour l'affichage
-        if e.notes and len(e.notes) > 60:
-            notes_short = e.notes[:57] + "..."
-        else:
-            notes_short = e.notes or ""
-
-        table.add_row(
-            str(e.id),           # Event ID
-            contrat_id_str,      # Contract ID
-            client_name,         # Client name
-            client_contact,      # Client contact
-            debut_str,           # Event date start
-            fin_str,             # Event date end
-            support_name,        # Support contact
-            e.lieu or "",        # Location
-            participants_str,    # Attendees
-            notes_short,         # Notes
-        )
-
-    console.print(table)
+    # The service is scoped to the role (filtered in SQL): all events for
+    # 'gestion', events of own contracts for 'commercial', assigned events
+    # for 'support'
+    def fetch_page(after, before):
+        return evenement_service.get_evenements_page(
+            page_size=PAGE_SIZE, after=after, before=before, profile="list")
+
+    def render(evenements):
+        table = Table(
+            title="[bold bright_cyan ] LISTE DES EVENEMENTS [/bold bright_cyan]")
+
+        table.add_column("Event ID", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Contract ID", justify="right", style="green")
+        table.add_column("Client name", style="magenta")
+        table.add_column("Client contact", style="yellow")
+        table.add_column("Event date start", style="white")
+        table.add_column("Event date end", style="white")
+        table.add_column("Support contact", style="blue")
+        table.add_column("Location", style="white")
+        table.add_column("Attendees", justify="right", style="bright_white")
+        table.add_column("Notes", style="bright_black")
+
+        for e in evenements:
+            # Client name: use nom_client if set, otherwise via relation
+            client_name = (
+                e.nom_client
+                or (e.contrat.client.nom_complet if e.contrat and e.contrat.client else "Inconnu")
+            )
+            # Client contact: use contact_client if set, otherwise try from client entity
+            if e.contact_client:
+                client_contact = e.contact_client
+            elif e.contrat and e.contrat.client:
+                cl = e.contrat.client
+                client_contact = f"{cl.email or ''} / {cl.telephone or ''}"
+            else:
+                client_contact = ""
+
+            support_name = e.support.nom if e.support else "Non assigné"
+            debut_str = e.date_debut.strftime(
+                "%Y-%m-%d %H:%M") if e.date_debut else "N/A"
+            fin_str = e.date_fin.strftime(
+                "%Y-%m-%d %H:%M") if e.date_fin else "N/A"
+            contrat_id_str = str(e.contrat_id) if e.contrat_id else "N/A"
+            participants_str = str(
+                e.participants) if e.participants is not None else ""
+
+            # Notes potentially longues → on tronque pour l'affichage
+            if e.notes and len(e.notes) > 60:
+                notes_short = e.notes[:57] + "..."
+            else:
+                notes_short = e.notes or ""
+
+            table.add_row(
+                str(e.id),           # Event ID
+                contrat_id_str,      # Contract ID
+                client_name,         # Client name
+                client_contact,      # Client contact
+                debut_str,           # Event date start
+                fin_str,             # Event date end
+                support_name,        # Support contact
+                e.lieu or "",        # Location
+                participants_str,    # Attendees
+                notes_short,         # Notes
+            )
+
+        console.print(table)
+
+    browse(fetch_page, render, "Aucun événement trouvé.")
     session.close()
 
 
@@ -260,65 +251,66 @@ def run_update_evenement():
         return
 
     session = Session()
-    evenement_service = EvenementService(session)
-    user_service = UtilisateurService(session)
+    evenement_service = EvenementService(session, payload)
+    user_service = UtilisateurService(session, payload)
 
-    user = user_service.repo.find_by_email(payload["email"])
+    user = get_current_user(session, payload)
     if not user:
         print("Utilisateur introuvable.")
         session.close()
         return
 
-    # Charger les événements accessibles selon le rôle
-    if role == "gestion":
-        evenements = evenement_service.get_all_evenements()
-    else:  # support
-        evenements = evenement_service.get_evenements_by_support_id(user.id)
-
-    if not evenements:
-        print("Aucun événement disponible pour modification.")
+    # Événements accessibles selon le rôle (filtrés en SQL), page par page
+    def fetch_page(after, before):
+        return evenement_service.get_evenements_page(
+            page_size=PAGE_SIZE, after=after, before=before, profile="list")
+
+    def render(evenements):
+        # Afficher les événements avec rich
+        table = Table(
+            title="[bold bright_cyan] EVENEMENTS MODIFIABLES [/bold bright_cyan]")
+        table.add_column("ID", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Client", style="magenta")
+        table.add_column("Support", style="blue")
+        table.add_column("Début", style="white")
+        table.add_column("Fin", style="white")
+        table.add_column("Lieu", style="yellow")
+        table.add_column("Participants", justify="right", style="bright_white")
+
+        for e in evenements:
+            client_name = e.nom_client or (
+                e.contrat.client.nom_complet if e.contrat and e.contrat.client else "Inconnu"
+            )
+            debut_str = e.date_debut.strftime(
+                "%Y-%m-%d %H:%M") if e.date_debut else "N/A"
+            fin_str = e.date_fin.strftime(
+                "%Y-%m-%d %H:%M") if e.date_fin else "N/A"
+            participants_str = str(
+                e.participants) if e.participants is not None else ""
+            if e.support:
+                support_label = f"{e.support.id} - {e.support.nom}"
+            else:
+                support_label = "Non assigné"
+
+            table.add_row(
+                str(e.id),
+                client_name,
+                support_label,
+                debut_str,
+                fin_str,
+                e.lieu or "",
+                participants_str,
+            )
+
+        console.print(table)
+
+    evenement_id_input = choose(
+        fetch_page, render, "Aucun événement disponible pour modification.",
+        "Entrez l'ID de l'événement à modifier")
+    if evenement_id_input is None:
         session.close()
         return
 
-    # Afficher les événements avec rich
-    table = Table(
-        title="[bold bright_cyan] EVENEMENTS MODIFIABLES [/bold bright_cyan]")
-    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Client", style="magenta")
-    table.add_column("Support", style="blue")
-    table.add_column("Début", style="white")
-    table.add_column("Fin", style="white")
-    table.add_column("Lieu", style="yellow")
-    table.add_column("Participants", justify="right", style="bright_white")
-
-    for e in evenements:
-        client_name = e.nom_client or (
-            e.contrat.client.nom_complet if e.contrat and e.contrat.client else "Inconnu"
-        )
-        debut_str = e.date_debut.strftime(
-            "%Y-%m-%d %H:%M") if e.date_debut else "N/A"
-        fin_str = e.date_fin.strftime(
-            "%Y-%m-%d %H:%M") if e.date_fin else "N/A"
-        participants_str = str(
-            e.participants) if e.participants is not None else ""
-        if e.support:
-            support_label = f"{e.support.id} - {e.support.nom}"
-        else:
-            support_label = "Non assigné"
-
-        table.add_row(
-            str(e.id),
-            client_name,
-            support_label,
-            debut_str,
-            fin_str,
-            e.lieu or "",
-            participants_str,
-        )
-
-    console.print(table)
-
-    evenement_id_input = input("Entrez l'ID de l'événement à modifier : ")
     try:
         evenement_id = int(evenement_id_input)
     except ValueError:
@@ -326,18 +318,14 @@ def run_update_evenement():
         session.close()
         return
 
+    # Sécurité : la recherche filtrée par rôle ne trouve, pour un support,
+    # que ses propres événements
     evenement = evenement_service.get_evenement_by_id(evenement_id)
     if not evenement:
         print("Événement introuvable.")
         session.close()
         return
 
-    # Sécurité : le support ne peut modifier que ses propres événements
-    if role == "support" and evenement.support_id != user.id:
-        print("Vous ne pouvez modifier que les événements qui vous sont attribués.")
-        session.close()
-        return
-
     print("Laissez vide pour ne pas modifier un champ.")
 
     current_debut = (
@@ -403,11 +391,7 @@ def run_update_evenement():
     if role == "gestion":
         print("Affectation d'un collaborateur support (optionnel).")
         # 1. Récupérer tous les utilisateurs SUPPORT
-        # Adapte cette partie selon les méthods dispo dans ton repo utilisateur.
-        supports = [
-            u for u in user_service.repo.get_all()
-            if u.role == "support"
-        ]
+        supports = user_service.get_users_by_role("support")
         if not supports:
             print("Aucun utilisateur avec le role SUPPORT n'est disponible.")
         else:
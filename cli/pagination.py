@@ -0,0 +1,82 @@
+import os
+
+# Number of rows displayed per page in the list views
+PAGE_SIZE = int(os.getenv("EPIC_PAGE_SIZE", "20"))
+
+
+def _navigate(fetch_page, render, empty_message, ask):
+    """
+    Show the pages of a keyset-paginated listing until ask() returns an
+    answer other than "n" (next page) or "p" (previous page).
+
+    ask(options) receives the navigation choices available on the current
+    page ("p = page précédente", "n = page suivante") and returns the
+    answer of the user, stripped, or None to stop without prompting.
+
+    Returns that answer, or None when the listing is empty.
+    """
+    page = fetch_page(after=None, before=None)
+    if not page.items:
+        print(empty_message)
+        return None
+
+    while True:
+        render(page.items)
+
+        options = []
+        if page.prev_cursor is not None:
+            options.append("p = page précédente")
+        if page.next_cursor is not None:
+            options.append("n = page suivante")
+
+        answer = ask(options)
+        if answer is None:
+            return None
+        if answer.lower() == "n" and page.next_cursor is not None:
+            page = fetch_page(after=page.next_cursor, before=None)
+        elif answer.lower() == "p" and page.prev_cursor is not None:
+            page = fetch_page(after=None, before=page.prev_cursor)
+        else:
+            return answer
+
+
+def browse(fetch_page, render, empty_message):
+    """
+    Display a keyset-paginated listing with next/previous navigation.
+
+    Parameters
+    ----------
+    fetch_page : callable
+        fetch_page(after=None, before=None) returning a Page.
+    render : callable
+        render(items) displaying the entities of one page.
+    empty_message : str
+        Message printed when the listing has no result at all.
+
+    The navigation prompt is only shown when another page exists, so a
+    listing that fits on one page behaves exactly like before.
+    """
+    def ask(options):
+        if not options:
+            return None
+        return input(
+            f"{', '.join(options)}, Entrée = retour au menu : ").strip()
+
+    _navigate(fetch_page, render, empty_message, ask)
+
+
+def choose(fetch_page, render, empty_message, prompt):
+    """
+    Display a keyset-paginated listing to pick an entity from.
+
+    Same navigation as browse(), except that any other answer than "n" or
+    "p" is returned: the prompt asks for the ID of the entity, which may
+    be on any page (or typed without browsing at all).
+
+    Returns the answer, stripped, or None when the listing is empty.
+    """
+    def ask(options):
+        suffix = f" ({', '.join(options)})" if options else ""
+        return input(f"{prompt}{suffix} : ").strip()
+
+    return _navigate(fetch_page, render, empty_message, ask)
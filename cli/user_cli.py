@@ -3,6 +3,7 @@ from models.base import Session
 from utils.jwt_manager import load_token
 from rich.table import Table
 from rich.console import Console
+from cli.pagination import PAGE_SIZE, browse
 
 console = Console()
 
@@ -32,26 +33,26 @@ def list_all_users():
         return
 
     session = Session()
-    service = UtilisateurService(session)
+    service = UtilisateurService(session, payload)
 
-    users = service.list_users()
+    def fetch_page(after, before):
+        return service.list_users_page(
+            page_size=PAGE_SIZE, after=after, before=before)
 
-    if not users:
-        print("Aucun utilisateur trouvé.")
-        session.close()
-        return
-    table = Table(
-        title="[bold bright_cyan] LISTE DES UTILISATEURS [/bold bright_cyan]")
-    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Nom", style="magenta")
-    table.add_column("Email", style="green")
-    table.add_column("Role", style="Yellow")
+    def render(users):
+        table = Table(
+            title="[bold bright_cyan] LISTE DES UTILISATEURS [/bold bright_cyan]")
+        table.add_column("ID", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Nom", style="magenta")
+        table.add_column("Email", style="green")
+        table.add_column("Role", style="Yellow")
 
-    for u in users:
-        table.add_row(str(u.id), u.nom, u.email, u.role)
+        for u in users:
+            table.add_row(str(u.id), u.nom, u.email, u.role)
 
-    console.print(table)
+        console.print(table)
 
+    browse(fetch_page, render, "Aucun utilisateur trouvé.")
     session.close()
 # cli/user_cli.py
 
@@ -69,7 +70,7 @@ def run_update_user():
         return
 
     session = Session()
-    service = UtilisateurService(session)
+    service = UtilisateurService(session, payload)
 
     # List all users
     users = service.list_users()
@@ -145,7 +146,7 @@ def run_delete_user():
         return
 
     session = Session()
-    service = UtilisateurService(session)
+    service = UtilisateurService(session, payload)
 
     users = service.list_users()
     if not users:
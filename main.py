@@ -1,28 +1,106 @@
-
-from cli.auth import run_login, run_logout, whoami
-from models.base import Base, engine
-from sqlalchemy import text
-from cli.user_cli import run_create_user, list_all_users, run_delete_user, run_update_user
-from utils.jwt_manager import load_token
-from cli.client_cli import run_create_client, list_clients, update_client, delete_client
-from cli.contrat_cli import (
-    run_create_contrat, run_list_contrats, run_update_contrat, run_delete_contrat,
-    run_list_contrats_non_payes, run_list_contrats_non_signes)
-from cli.evenement_cli import run_create_evenement, run_list_evenements, run_update_evenement
-import sentry_sdk
-from utils.sentry_config import init_sentry
-
-
-# Placeholder - no models yet, we just test the connection
-Base.metadata.create_all(engine)
-
-print("Connexion réussie à la base de données MySQL.")
-
-# To get the name of the DB
-with engine.connect() as connection:
-    result = connection.execute(text("SELECT DATABASE();"))
-    db_name = result.scalar()
-    print(f"Nom de la base de données : {db_name}")
+import time
+
+# Origin of the startup profile (python main.py --startup-profile)
+_START = time.perf_counter()
+
+import argparse  # noqa: E402
+import importlib  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+
+from utils import sql_instrumentation  # noqa: E402
+from utils.startup_profile import profile  # noqa: E402
+
+profile.origin = _START
+with profile.phase("import utils.jwt_manager"):
+    from utils.jwt_manager import load_token  # noqa: E402
+
+# Menu choice -> (module, function). Command modules (and rich, the
+# services and the models they pull in) are only imported on first use.
+ACTIONS = {
+    "2": ("cli.user_cli", "run_create_user"),
+    "3": ("cli.user_cli", "list_all_users"),
+    "4": ("cli.auth", "run_logout"),
+    "6": ("cli.client_cli", "run_create_client"),
+    "7": ("cli.client_cli", "list_clients"),
+    "8": ("cli.client_cli", "update_client"),
+    "9": ("cli.client_cli", "delete_client"),
+    "10": ("cli.contrat_cli", "run_create_contrat"),
+    "11": ("cli.contrat_cli", "run_list_contrats"),
+    "12": ("cli.contrat_cli", "run_list_contrats_non_signes"),
+    "13": ("cli.contrat_cli", "run_list_contrats_non_payes"),
+    "14": ("cli.contrat_cli", "run_update_contrat"),
+    "15": ("cli.contrat_cli", "run_delete_contrat"),
+    "16": ("cli.evenement_cli", "run_create_evenement"),
+    "17": ("cli.evenement_cli", "run_list_evenements"),
+    "18": ("cli.evenement_cli", "run_update_evenement"),
+    "19": ("cli.user_cli", "run_update_user"),
+    "20": ("cli.user_cli", "run_delete_user"),
+}
+
+
+def run_action(module_name, function_name):
+    """
+    Import the command module on first use and run one of its functions.
+    """
+    if not _database_hooks:
+        install_database_hooks()
+    module = sys.modules.get(module_name)
+    if module is None:
+        with profile.phase(f"import {module_name}"):
+            module = importlib.import_module(module_name)
+    from utils.sentry_config import transaction
+
+    with transaction(function_name, "cli.action"), \
+            sql_instrumentation.action(function_name):
+        getattr(module, function_name)()
+
+
+_database_hooks = []
+
+
+def install_database_hooks():
+    """
+    Import models.base (and SQLAlchemy), register the startup checks to
+    run once the engine is created and the pool statistics handlers.
+    """
+    with profile.phase("import models.base"):
+        from models.base import install_pool_stats_handlers, on_engine_created
+    install_pool_stats_handlers()
+    # The schema version is checked when the first session needs the
+    # database, not before the menu is displayed
+    _database_hooks.append(on_engine_created(check_schema_version))
+
+
+def check_schema_version(engine):
+    """
+    Engine creation hook: compare the schema version with the migrations
+    (no DDL, see `python -m migrations upgrade`).
+    """
+    from contextlib import redirect_stdout
+
+    with profile.phase("check schema version"):
+        from migrations import check_schema
+        # warnings go to stderr, the output of the commands stays parseable
+        with redirect_stdout(sys.stderr):
+            check_schema(engine)
+
+
+def check_database(stream=None):
+    """
+    Open a connection right away and print the database name.
+    """
+    stream = stream or sys.stdout
+    if not _database_hooks:
+        install_database_hooks()
+    from models.base import get_engine
+
+    with profile.phase("database connectivity check"):
+        engine = get_engine()
+        with engine.connect():
+            pass
+    print("Connexion réussie à la base de données.", file=stream)
+    print(f"Nom de la base de données : {engine.url.database}", file=stream)
 
 
 def main_menu():
@@ -39,7 +117,7 @@ def main_menu():
             choice = input("Choisissez une option : ")
 
             if choice == "1":
-                run_login()
+                run_action("cli.auth", "run_login")
             elif choice == "0":
                 print("Au revoir!")
                 break
@@ -112,58 +190,68 @@ def main_menu():
         choice = input("Choisissez une option : ")
 
         # --- Actions  ---
-        if choice == "2":
-            run_create_user()           # déjà protégé par rôle à l’intérieur si tu veux
-        elif choice == "3":
-            list_all_users()
-        elif choice == "4":
-            run_logout()
-
-        elif choice == "6":
-            run_create_client()
-
-        elif choice == "7":
-            list_clients()
-        elif choice == "8":
-            update_client()
-        elif choice == "9":
-            delete_client()
-        elif choice == "10":
-            run_create_contrat()
-        elif choice == "11":
-            run_list_contrats()
-        elif choice == "12":
-            run_list_contrats_non_signes()
-        elif choice == "13":
-            run_list_contrats_non_payes()
-        elif choice == "14":
-            run_update_contrat()
-        elif choice == "15":
-            run_delete_contrat()
-        elif choice == "16":
-            run_create_evenement()
-        elif choice == "17":
-            run_list_evenements()
-        elif choice == "18":
-            run_update_evenement()
-        elif choice == "19":
-            run_update_user()
-        elif choice == "20":
-            run_delete_user()
-        elif choice == "0":
+        if choice == "0":
             print("Au revoir!")
             break
+        action = ACTIONS.get(choice)
+        if action:
+            run_action(*action)
         else:
             print("Option invalide.")
 
 
-if __name__ == "__main__":
-    init_sentry()
-    # Test Entry
-    sentry_sdk.capture_message("Test message from Abi", level="info")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Epic Events CRM")
+    parser.add_argument(
+        "--check-db", action="store_true",
+        help="vérifier la connexion à la base dès le démarrage "
+             "(aussi activé par EPIC_CHECK_DB=1)")
+    parser.add_argument(
+        "--startup-profile", action="store_true",
+        help="afficher la durée de chaque phase de démarrage à la sortie")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="profiler les requêtes SQL de chaque action : résumé sur "
+             "stderr, détail dans sql_profile.jsonl (ou EPIC_SQL_PROFILE=1)")
+    parser.add_argument(
+        "command", nargs=argparse.REMAINDER,
+        help="commande non interactive, ex. : contrats list --unsigned "
+             "--format jsonl (voir `python main.py contrats --help`)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.startup_profile:
+        import atexit
+        atexit.register(profile.report)
+    if args.profile:
+        sql_instrumentation.enable()
+
+    if args.command:
+        # Non-interactive mode: run one command and exit with its status
+        install_database_hooks()
+        if args.check_db or os.getenv("EPIC_CHECK_DB") == "1":
+            check_database(sys.stderr)
+        with profile.phase("import cli.commands"):
+            from cli.commands import main as run_command
+        return run_command(args.command)
+
+    with profile.phase("init sentry"):
+        from utils.sentry_config import init_sentry, capture_exception
+        init_sentry()
+
+    if args.check_db or os.getenv("EPIC_CHECK_DB") == "1":
+        check_database()
+
+    profile.mark("menu ready")
     try:
         main_menu()
     except Exception:
         # toutes les exceptions non gérées sont envoyées à Sentry
-        sentry_sdk.capture_exception()
+        capture_exception()
         raise
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Versioned schema migrations.
+
+Each step is a module exposing VERSION, DESCRIPTION, up(connection) and
+down(connection). Applied versions are recorded in the schema_version
+table. The application only reads that table at startup (check_schema);
+DDL is run explicitly with `python -m migrations upgrade`.
+"""
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select, func
+from sqlalchemy import exc
+
+from migrations import m0001_baseline, m0002_indexes, m0003_report_indexes
+
+MIGRATIONS = [m0001_baseline, m0002_indexes, m0003_report_indexes]
+LATEST_VERSION = MIGRATIONS[-1].VERSION
+
+version_table = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255)),
+    Column("applied_at", DateTime),
+)
+
+
+def current_version(connection):
+    """
+    Return the highest applied migration version, 0 for an unversioned DB.
+
+    Only a single SELECT is issued; a missing schema_version table is
+    treated as version 0.
+    """
+    try:
+        version = connection.execute(
+            select(func.max(version_table.c.version))).scalar()
+    except (exc.ProgrammingError, exc.OperationalError):
+        connection.rollback()
+        return 0
+    return version or 0
+
+
+def upgrade(engine, target=None):
+    """
+    Apply every pending migration up to target (latest by default).
+
+    Each migration runs in its own transaction and is recorded as soon as
+    it succeeds, so an interrupted upgrade can simply be re-run.
+
+    Returns the list of applied versions.
+    """
+    target = LATEST_VERSION if target is None else target
+    with engine.begin() as connection:
+        version_table.create(connection, checkfirst=True)
+        version = current_version(connection)
+
+    applied = []
+    for migration in MIGRATIONS:
+        if version < migration.VERSION <= target:
+            with engine.begin() as connection:
+                migration.up(connection)
+                connection.execute(version_table.insert().values(
+                    version=migration.VERSION,
+                    description=migration.DESCRIPTION,
+                    applied_at=datetime.now(),
+                ))
+            applied.append(migration.VERSION)
+    return applied
+
+
+def downgrade(engine, target):
+    """
+    Revert applied migrations, newest first, down to target (exclusive).
+
+    Returns the list of reverted versions.
+    """
+    with engine.connect() as connection:
+        version = current_version(connection)
+
+    reverted = []
+    for migration in reversed(MIGRATIONS):
+        if target < migration.VERSION <= version:
+            with engine.begin() as connection:
+                migration.down(connection)
+                connection.execute(version_table.delete().where(
+                    version_table.c.version == migration.VERSION))
+            reverted.append(migration.VERSION)
+    return reverted
+
+
+def check_schema(engine):
+    """
+    Compare the database version with the latest migration, without DDL.
+
+    Prints a warning when migrations are pending and returns the current
+    database version.
+    """
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if version < LATEST_VERSION:
+        print(
+            f"Attention : schéma de base de données en version {version}, "
+            f"version attendue {LATEST_VERSION}. "
+            "Lancez `python -m migrations upgrade`."
+        )
+    elif version > LATEST_VERSION:
+        print(
+            f"Attention : schéma de base de données en version {version}, "
+            f"plus récente que l'application ({LATEST_VERSION})."
+        )
+    return version
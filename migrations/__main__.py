@@ -0,0 +1,48 @@
+"""
+Command line entry point for schema migrations.
+
+    python -m migrations current
+    python -m migrations upgrade [VERSION]
+    python -m migrations downgrade VERSION
+"""
+import argparse
+
+from models.base import engine
+from migrations import MIGRATIONS, LATEST_VERSION, current_version, upgrade, downgrade
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m migrations", description="Migrations du schéma Epic Events.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("current", help="Afficher la version du schéma")
+    sub.add_parser("history", help="Lister les migrations disponibles")
+    up = sub.add_parser("upgrade", help="Appliquer les migrations en attente")
+    up.add_argument("version", nargs="?", type=int, default=None)
+    down = sub.add_parser("downgrade", help="Revenir à une version antérieure")
+    down.add_argument("version", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "current":
+        with engine.connect() as connection:
+            version = current_version(connection)
+        print(f"Version du schéma : {version} (dernière : {LATEST_VERSION})")
+    elif args.command == "history":
+        for migration in MIGRATIONS:
+            print(f"{migration.VERSION:>4} - {migration.DESCRIPTION}")
+    elif args.command == "upgrade":
+        applied = upgrade(engine, args.version)
+        if applied:
+            print(f"Migrations appliquées : {', '.join(map(str, applied))}")
+        else:
+            print("Schéma déjà à jour.")
+    elif args.command == "downgrade":
+        reverted = downgrade(engine, args.version)
+        if reverted:
+            print(f"Migrations annulées : {', '.join(map(str, reverted))}")
+        else:
+            print("Aucune migration à annuler.")
+
+
+if __name__ == "__main__":
+    main()
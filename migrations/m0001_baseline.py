@@ -0,0 +1,72 @@
+"""
+Baseline schema: the four tables as they were created by
+Base.metadata.create_all before migrations existed.
+
+The tables are declared here rather than imported from the models so
+that this step stays identical when the models evolve. Creation uses
+checkfirst, which lets databases built with create_all adopt the
+migration history without changes.
+"""
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Date, DateTime, Text,
+    DECIMAL, Boolean, ForeignKey,
+)
+
+VERSION = 1
+DESCRIPTION = "baseline schema (utilisateurs, clients, contrats, evenements)"
+
+metadata = MetaData()
+
+Table(
+    "utilisateurs", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("nom", String(50), nullable=False),
+    Column("email", String(100), nullable=False, unique=True),
+    Column("mot_de_passe", String(255), nullable=False),
+    Column("role", String(20), nullable=False),
+)
+
+Table(
+    "clients", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("nom_complet", String(100), nullable=False),
+    Column("email", String(100), nullable=False),
+    Column("telephone", String(20)),
+    Column("entreprise", String(100)),
+    Column("date_creation", Date),
+    Column("date_mise_a_jour", Date),
+    Column("commercial_id", Integer, ForeignKey("utilisateurs.id")),
+)
+
+Table(
+    "contrats", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("client_id", Integer, ForeignKey("clients.id")),
+    Column("commercial_id", Integer, ForeignKey("utilisateurs.id")),
+    Column("montant_total", DECIMAL(10, 2)),
+    Column("montant_restant", DECIMAL(10, 2)),
+    Column("date_creation", Date),
+    Column("statut", Boolean),
+)
+
+Table(
+    "evenements", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("contrat_id", Integer, ForeignKey("contrats.id")),
+    Column("support_id", Integer, ForeignKey("utilisateurs.id")),
+    Column("nom_client", String(100)),
+    Column("contact_client", String(100)),
+    Column("date_debut", DateTime),
+    Column("date_fin", DateTime),
+    Column("lieu", String(255)),
+    Column("participants", Integer),
+    Column("notes", Text),
+)
+
+
+def up(connection):
+    metadata.create_all(connection, checkfirst=True)
+
+
+def down(connection):
+    metadata.drop_all(connection, checkfirst=True)
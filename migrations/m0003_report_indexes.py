@@ -0,0 +1,39 @@
+"""
+Covering index for the aggregate reports: the per-commercial totals,
+month and entreprise breakdowns read every contract, and can do so from
+the index alone instead of the table rows.
+"""
+from sqlalchemy import MetaData, Table, Column, Integer, DECIMAL, Boolean, Date, Index
+
+VERSION = 3
+DESCRIPTION = "covering index for the contract reports"
+
+metadata = MetaData()
+
+contrats = Table(
+    "contrats", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("client_id", Integer),
+    Column("commercial_id", Integer),
+    Column("montant_total", DECIMAL(10, 2)),
+    Column("montant_restant", DECIMAL(10, 2)),
+    Column("date_creation", Date),
+    Column("statut", Boolean),
+)
+
+INDEXES = [
+    Index("ix_contrats_report",
+          contrats.c.commercial_id, contrats.c.date_creation,
+          contrats.c.statut, contrats.c.montant_total,
+          contrats.c.montant_restant, contrats.c.client_id),
+]
+
+
+def up(connection):
+    for index in INDEXES:
+        index.create(connection, checkfirst=True)
+
+
+def down(connection):
+    for index in reversed(INDEXES):
+        index.drop(connection, checkfirst=True)
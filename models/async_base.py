@@ -0,0 +1,94 @@
+"""
+asyncio engine and sessions, for concurrent front-ends.
+
+The async engine uses the same database as models.base, through an
+asyncio driver (aiosqlite for SQLite, aiomysql for MySQL), so a query in
+flight waits on the event loop instead of blocking a thread:
+
+    async with AsyncSessionLocal() as session:
+        contrats = await AsyncContratService(session, payload).get_unsigned_contrats()
+
+DATABASE_ASYNC_URL overrides the URL derived from DATABASE_URL. Like the
+synchronous engine, it is only created when the first session is opened.
+"""
+import os
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models.base import DATABASE_URL, engine_options
+from utils import pool_metrics, sql_instrumentation
+
+# backend -> asyncio driver
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+}
+
+# Moteur asynchrone, créé à la première session (voir get_async_engine)
+_async_engine = None
+
+
+def async_url(url):
+    """
+    Return the URL of the asyncio driver of a database URL
+    ("mysql+pymysql://..." -> "mysql+aiomysql://...").
+
+    Raises ValueError for a backend without a supported asyncio driver.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Pas de pilote asynchrone pour la base {backend!r}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def get_async_engine():
+    """
+    Return the async engine, creating it on first use.
+
+    Raises ValueError if neither DATABASE_ASYNC_URL nor DATABASE_URL is
+    configured.
+    """
+    global _async_engine
+    if _async_engine is None:
+        url = os.getenv("DATABASE_ASYNC_URL")
+        if not url:
+            if not DATABASE_URL:
+                raise ValueError(" DATABASE_URL est manquant dans .env")
+            url = async_url(DATABASE_URL)
+        options = engine_options(str(url))
+        # the instrumented pool is a synchronous QueuePool: keep the
+        # asyncio pool chosen by SQLAlchemy, with the same sizing
+        options.pop("poolclass", None)
+        engine = create_async_engine(url, **options)
+        pool_metrics.install(engine.sync_engine)
+        if sql_instrumentation.enabled():
+            sql_instrumentation.install(engine.sync_engine)
+        set_async_engine(engine)
+    return _async_engine
+
+
+def set_async_engine(engine):
+    """
+    Use the given async engine and bind AsyncSessionLocal to it.
+    """
+    global _async_engine
+    _async_engine = engine
+    AsyncSessionLocal.configure(bind=engine)
+
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    """
+    async_sessionmaker creating the engine when the first session is opened.
+    """
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and local_kw.get("bind") is None:
+            get_async_engine()
+        return super().__call__(**local_kw)
+
+
+# Attributes stay loaded after commit: reading an expired attribute would
+# need a query outside of an await (MissingGreenlet).
+AsyncSessionLocal = _LazyAsyncSessionmaker(expire_on_commit=False)
@@ -1,7 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from utils import pool_metrics, sql_instrumentation
 import os
+import signal
+import atexit
 import logging
 # charger .env
 load_dotenv()
@@ -9,16 +13,158 @@ load_dotenv()
 # Charger l'URL de la base
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise ValueError(" DATABASE_URL est manquant dans .env")
 
-# Moteur SQLALchemy
-engine = create_engine(DATABASE_URL, echo=False)
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on", "oui")
+
+
+def engine_options(url):
+    """
+    Build the create_engine keyword arguments from the environment.
+
+    Environment variables
+    ---------------------
+    DB_POOL_SIZE : int (default 5)
+        Number of connections kept open in the pool.
+    DB_MAX_OVERFLOW : int (default 10)
+        Extra connections allowed above DB_POOL_SIZE under load.
+    DB_POOL_TIMEOUT : float (default 30)
+        Seconds to wait for a free connection before giving up.
+    DB_POOL_RECYCLE : int (default 1800)
+        Connections older than this (seconds) are replaced, which must be
+        lower than MySQL's wait_timeout to avoid stale connections.
+    DB_POOL_PRE_PING : bool (default true)
+        Test each connection on checkout and transparently reconnect.
+
+    SQLite uses its own pool classes, only pre-ping applies to it.
+    """
+    options = {
+        "echo": False,
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=pool_metrics.InstrumentedQueuePool,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    )
+    return options
+
+
+# Moteur SQLALchemy, créé à la première session (voir get_engine)
+_engine = None
+# Callables run once with the engine right after it is created
+_engine_hooks = []
+
+
+def get_engine():
+    """
+    Return the application engine, creating it on first use.
+
+    Creating the engine is deferred so that importing the models (or
+    starting the menu) costs no database work.
+
+    Raises ValueError if DATABASE_URL is not configured.
+    """
+    global _engine
+    if _engine is None:
+        if not DATABASE_URL:
+            raise ValueError(" DATABASE_URL est manquant dans .env")
+        engine = pool_metrics.install(
+            create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
+        if sql_instrumentation.enabled():
+            sql_instrumentation.install(engine)
+        set_engine(engine)
+        for hook in _engine_hooks:
+            hook(_engine)
+    return _engine
+
+
+def set_engine(engine):
+    """
+    Use the given engine for the application and bind Session to it.
+    """
+    global _engine
+    _engine = engine
+    Session.configure(bind=engine)
+
+
+def on_engine_created(hook):
+    """
+    Register hook(engine) to run once the engine is created (startup
+    checks deferred until the database is actually needed).
+    """
+    _engine_hooks.append(hook)
+    return hook
+
+
+class _LazySessionmaker(sessionmaker):
+    """
+    sessionmaker creating the engine when the first session is opened.
+    """
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and local_kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
 
 # session locale
-Session = sessionmaker(bind=engine)
+Session = _LazySessionmaker()
 # removes the sql log in console.
 logging.getLogger("sqlalchemy.engine").setLevel(logging.ERROR)
 
 # Base commune pour les modèles
 Base = declarative_base()
+
+
+def __getattr__(name):
+    # `from models.base import engine` keeps working, lazily
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def pool_stats():
+    """
+    Return the connection pool statistics of the application engine.
+    """
+    return pool_metrics.metrics.snapshot(_engine.pool if _engine else None)
+
+
+def dump_pool_stats(*_args):
+    """
+    Write the pool statistics as a JSON line on stderr.
+
+    Also usable as a signal handler: `kill -USR1 <pid>` dumps the stats
+    of a running process.
+    """
+    pool_metrics.metrics.dump(_engine.pool if _engine else None)
+
+
+def install_pool_stats_handlers():
+    """
+    Dump the pool statistics on SIGUSR1 (POSIX only) and, when
+    DB_POOL_STATS is true, at exit.
+
+    Called by the entry points (main.py, python -m api) rather than on
+    import, so that tests, benchmarks and other importers keep their own
+    signal handlers.
+    """
+    if hasattr(signal, "SIGUSR1"):
+        try:
+            signal.signal(signal.SIGUSR1, dump_pool_stats)
+        except ValueError:
+            # signal handlers can only be installed from the main thread
+            pass
+    # registered once, however many times this is called
+    atexit.unregister(dump_pool_stats)
+    if _env_bool("DB_POOL_STATS", False):
+        atexit.register(dump_pool_stats)
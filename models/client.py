@@ -5,6 +5,7 @@ from .base import Base
 
 class Client(Base):
     __tablename__ = "clients"
+    # Indexes are only declared by the migrations (migrations/m0002_indexes.py)
 
     id = Column(Integer, primary_key=True)
     nom_complet = Column(String(100), nullable=False)
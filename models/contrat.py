@@ -5,6 +5,8 @@ from .base import Base
 
 class Contrat(Base):
     __tablename__ = "contrats"
+    # Indexes are only declared by the migrations (migrations/m0002_indexes.py
+    # and m0003_report_indexes.py)
 
     id = Column(Integer, primary_key=True)
 
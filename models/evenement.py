@@ -5,6 +5,7 @@ from .base import Base
 
 class Evenement(Base):
     __tablename__ = "evenements"
+    # Indexes are only declared by the migrations (migrations/m0002_indexes.py)
 
     id = Column(Integer, primary_key=True)
 
@@ -5,6 +5,8 @@ from models.client import Client
 from models.contrat import Contrat
 from models.evenement import Evenement
 
+ROLES = ("gestion", "commercial", "support")
+
 
 class Utilisateur(Base):
     __tablename__ = "utilisateurs"
@@ -23,7 +25,5 @@ class Utilisateur(Base):
     evenements = relationship("Evenement", back_populates="support")
 
     def __repr__(self):
-        return f"<Utilisateur(nom={
-            self.nom}, email={
-            self.email}, role={
-            self.role})>"
+        return (f"<Utilisateur(nom={self.nom}, "
+                f"email={self.email}, role={self.role})>")
@@ -0,0 +1,149 @@
+"""
+Role-based access rules expressed as SQL predicates.
+
+The rules of the README (gestion sees everything, a commercial sees his
+own portfolio, a support sees the events assigned to him) are declared
+once in RULES. Repositories build every read statement from
+scoped_select(), so the filtering always happens in the database.
+
+A payload of None means an internal, unscoped access (authentication,
+migrations, maintenance scripts). CLI and API callers always pass the
+decoded JWT payload.
+"""
+from sqlalchemy import inspect, select, true
+
+from models.client import Client
+from models.contrat import Contrat
+from models.evenement import Evenement
+from models.utilisateur import Utilisateur
+
+
+class AccessDenied(PermissionError):
+    """
+    Raised when a role is not allowed to read an entity type at all.
+    """
+
+
+def _everything(user_id):
+    return true()
+
+
+# entity -> role -> function(user_id) returning the SQL predicate.
+# A role missing from an entity's rules has no read access to it.
+RULES = {
+    Utilisateur: {
+        "gestion": _everything,
+        "commercial": lambda user_id: Utilisateur.id == user_id,
+        "support": lambda user_id: Utilisateur.id == user_id,
+    },
+    Client: {
+        "gestion": _everything,
+        "commercial": lambda user_id: Client.commercial_id == user_id,
+    },
+    Contrat: {
+        "gestion": _everything,
+        "commercial": lambda user_id: Contrat.commercial_id == user_id,
+    },
+    Evenement: {
+        "gestion": _everything,
+        "commercial": lambda user_id: Evenement.contrat_id.in_(
+            select(Contrat.id).where(Contrat.commercial_id == user_id)),
+        "support": lambda user_id: Evenement.support_id == user_id,
+    },
+}
+
+
+# The same rules evaluated on an instance already loaded in the session:
+# entity -> role -> (attributes read, function(instance, user_id)).
+# Rules that need a relationship (a commercial's events) are left out and
+# always checked by the database.
+ROW_RULES = {
+    Utilisateur: {
+        "commercial": (("id",), lambda user, user_id: user.id == user_id),
+        "support": (("id",), lambda user, user_id: user.id == user_id),
+    },
+    Client: {
+        "commercial": (("commercial_id",),
+                       lambda client, user_id: client.commercial_id == user_id),
+    },
+    Contrat: {
+        "commercial": (("commercial_id",),
+                       lambda contrat, user_id: contrat.commercial_id == user_id),
+    },
+    Evenement: {
+        "support": (("support_id",),
+                    lambda evenement, user_id: evenement.support_id == user_id),
+    },
+}
+
+
+def allows(payload, model):
+    """
+    Tell whether the role in the payload may read the given entity type.
+    """
+    if payload is None:
+        return True
+    return payload.get("role") in RULES.get(model, {})
+
+
+def predicate(payload, model):
+    """
+    Return the SQL condition restricting `model` rows to the payload's scope.
+
+    Raises AccessDenied when the role cannot read this entity type.
+    """
+    if payload is None:
+        return true()
+    try:
+        rule = RULES[model][payload.get("role")]
+    except KeyError:
+        raise AccessDenied(
+            f"Role {payload.get('role')!r} cannot read {model.__name__}")
+    return rule(payload["id"])
+
+
+def scoped_select(payload, model):
+    """
+    Build a SELECT of `model` limited to the rows the payload may read.
+
+    Parameters
+    ----------
+    payload : dict or None
+        Decoded JWT payload (id, email, role), None for unscoped access.
+    model : type
+        One of Client, Contrat, Evenement, Utilisateur.
+    """
+    condition = predicate(payload, model)
+    stmt = select(model)
+    if condition is true():
+        # unrestricted scope: keep the statement free of a WHERE true
+        return stmt
+    return stmt.where(condition)
+
+
+def permits(payload, instance):
+    """
+    Tell whether the payload may read an instance already in the session,
+    without querying the database.
+
+    Returns True or False, or None when the rule cannot be decided from
+    the loaded state (attribute expired or not loaded, rule based on a
+    relationship): the caller must then check through scoped_select.
+    """
+    if payload is None:
+        return True
+    model = type(instance)
+    role = payload.get("role")
+    if role not in RULES.get(model, {}):
+        return False
+    if RULES[model][role] is _everything:
+        return True
+    try:
+        attributes, rule = ROW_RULES[model][role]
+    except KeyError:
+        return None
+    state = inspect(instance)
+    if state.deleted or state.detached or any(
+            name in state.unloaded for name in attributes):
+        return None
+    return rule(instance, payload["id"])
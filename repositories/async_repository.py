@@ -0,0 +1,121 @@
+"""
+asyncio versions of the repositories.
+
+Each async repository runs the method of the same name of its synchronous
+repository on the connection of an AsyncSession (AsyncSession.run_sync):
+the statements, the access scoping and the commits are the very same
+code, while the I/O goes through the asyncio driver and never blocks the
+event loop.
+
+Entities come back attached to the AsyncSession. Relationships that were
+not loaded cannot be lazy loaded outside of an await: use a loading
+profile ("list", "detail") or `await session.refresh(entity, [...])`.
+An AsyncSession must not be shared by concurrent tasks; open one per
+request or task.
+"""
+from repositories.client_repository import ClientRepository
+from repositories.contrat_repository import ContratRepository
+from repositories.evenement_repository import EvenementRepository
+from repositories.utilisateur_repository import UtilisateurRepository
+
+
+def delegate(name):
+    """
+    Build a coroutine method running `name` of the synchronous class.
+    """
+    async def method(self, *args, **kwargs):
+        return await self._run(name, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = f"Async version of {name}(), same arguments and result."
+    return method
+
+
+class AsyncRepository:
+    """
+    Base class of the async repositories (and async services).
+
+    sync_class is the synchronous class whose methods are run; it is
+    instantiated with the synchronous session of the AsyncSession and the
+    payload for every call, which costs no query.
+    """
+
+    sync_class = None
+
+    def __init__(self, session, payload=None):
+        """
+        :param session: sqlalchemy.ext.asyncio.AsyncSession
+        :param payload: JWT payload scoping the reads (None = unscoped).
+        """
+        self.session = session
+        self.payload = payload
+
+    def sync(self, sync_session):
+        """
+        Return the synchronous object bound to the given sync session.
+        """
+        return self.sync_class(sync_session, self.payload)
+
+    async def _run(self, name, *args, **kwargs):
+        def call(sync_session):
+            return getattr(self.sync(sync_session), name)(*args, **kwargs)
+        return await self.session.run_sync(call)
+
+
+class AsyncClientRepository(AsyncRepository):
+    sync_class = ClientRepository
+
+    save = delegate("save")
+    insert_many = delegate("insert_many")
+    get_all = delegate("get_all")
+    get_by_commercial_id = delegate("get_by_commercial_id")
+    get_page = delegate("get_page")
+    get_by_id = delegate("get_by_id")
+    get_many = delegate("get_many")
+    update = delegate("update")
+    delete = delegate("delete")
+
+
+class AsyncContratRepository(AsyncRepository):
+    sync_class = ContratRepository
+
+    save = delegate("save")
+    get_all = delegate("get_all")
+    get_by_commercial_id = delegate("get_by_commercial_id")
+    get_page = delegate("get_page")
+    get_by_id = delegate("get_by_id")
+    get_many = delegate("get_many")
+    update = delegate("update")
+    delete = delegate("delete")
+    get_by_staut = delegate("get_by_staut")
+    get_unpaid = delegate("get_unpaid")
+
+
+class AsyncEvenementRepository(AsyncRepository):
+    sync_class = EvenementRepository
+
+    save = delegate("save")
+    get_all = delegate("get_all")
+    get_by_support_id = delegate("get_by_support_id")
+    get_by_commercial_id = delegate("get_by_commercial_id")
+    get_page = delegate("get_page")
+    get_by_id = delegate("get_by_id")
+    get_many = delegate("get_many")
+    update = delegate("update")
+
+
+class AsyncUtilisateurRepository(AsyncRepository):
+    sync_class = UtilisateurRepository
+
+    find_by_email = delegate("find_by_email")
+    save = delegate("save")
+    insert_many = delegate("insert_many")
+    existing_emails = delegate("existing_emails")
+    get_all = delegate("get_all")
+    get_page = delegate("get_page")
+    get_by_role = delegate("get_by_role")
+    get_emails_by_id = delegate("get_emails_by_id")
+    get_by_id = delegate("get_by_id")
+    get_many = delegate("get_many")
+    update = delegate("update")
+    delete = delegate("delete")
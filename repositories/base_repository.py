@@ -0,0 +1,337 @@
+from datetime import datetime
+
+from sqlalchemy import Date, and_, inspect, or_, select
+
+from policies.access_policy import permits, predicate, scoped_select
+from utils.sentry_config import traced
+
+# session.info key holding the nesting depth of the open unit of work
+# (see services.unit_of_work)
+UNIT_OF_WORK_KEY = "unit_of_work_depth"
+
+
+class Page:
+    """
+    One page of a keyset-paginated listing.
+
+    Attributes:
+        items : list
+            The entities of the page, in ascending sort order.
+        next_cursor : tuple or None
+            Cursor to pass as `after` to fetch the following page, None on
+            the last page.
+        prev_cursor : tuple or None
+            Cursor to pass as `before` to fetch the preceding page, None on
+            the first page.
+    """
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+@traced("db.repository")
+class BaseRepository:
+    """
+    Common query helpers shared by the entity repositories.
+
+    Every read statement starts from policies.access_policy.scoped_select,
+    so a repository built with a JWT payload only ever sees the rows the
+    role may read; without payload the access is unscoped (internal use).
+
+    Subclasses set `model` and may declare `load_profiles`, a mapping of
+    profile names to SQLAlchemy loader options. A profile describes which
+    relationships a view needs so that they are fetched with the main
+    query (or one extra IN query per collection) instead of lazily, row
+    by row.
+
+        "list"   : relationships displayed in the list views.
+        "detail" : relationships displayed for a single entity.
+
+    `sort_keys` lists the columns a listing can be paginated on, by name.
+    They must be non nullable; the primary key is always appended as a
+    tie-breaker so that the ordering is total.
+
+    `export_columns` maps the column names available to stream_rows() to
+    SQL expressions, `export_joins` lists the (target, onclause) outer
+    joins they need, and `date_column` names the column filtered by the
+    date range of an export.
+
+    Public methods, including those of the subclasses, run in a Sentry
+    span (op "db.repository") when tracing is on.
+    """
+
+    model = None
+    load_profiles = {}
+    sort_keys = ("id",)
+    export_columns = {}
+    export_joins = ()
+    date_column = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        traced("db.repository")(cls)
+
+    def __init__(self, session, payload=None):
+        """
+        Initialize the repository with a SQLALchemy session and the JWT
+        payload of the current user, which limits the reads to what this
+        user may see (None for unscoped access).
+        """
+        self.session = session
+        self.payload = payload
+
+    def _options(self, profile):
+        if profile is None:
+            return ()
+        try:
+            return self.load_profiles[profile]
+        except KeyError:
+            raise ValueError(
+                f"Unknown loading profile {profile!r} for {self.model.__name__}")
+
+    def _select(self, profile=None):
+        """
+        Build a role-scoped SELECT on the repository model.
+
+        Parameters:
+            profile : str or None
+                Name of a profile declared in load_profiles, or None to
+                keep the default lazy loading.
+
+        Raises policies.access_policy.AccessDenied when the role of the
+        payload cannot read this entity type.
+        """
+        stmt = scoped_select(self.payload, self.model)
+        options = self._options(profile)
+        return stmt.options(*options) if options else stmt
+
+    def _commit(self, entity=None, refresh=False):
+        """
+        Make the pending writes of a save/update/delete visible.
+
+        Inside a unit of work the changes are only flushed (the unit of
+        work commits once at the end); otherwise the session is committed
+        as before. The entity is reloaded from the database only when
+        refresh is requested, e.g. to read server-side defaults.
+        """
+        if self.session.info.get(UNIT_OF_WORK_KEY):
+            self.session.flush()
+        else:
+            self.session.commit()
+        if refresh and entity is not None:
+            self.session.refresh(entity)
+
+    def _all(self, stmt):
+        return self.session.scalars(stmt).all()
+
+    def _get(self, ident, profile=None):
+        """
+        Load one entity by primary key within the repository scope.
+
+        An entity already present in the session identity map is returned
+        without any query when the access rule can be checked on it;
+        otherwise a single scoped SELECT is issued.
+        """
+        if self.payload is None:
+            return self.session.get(
+                self.model, ident, options=self._options(profile))
+        cached = self._from_identity_map(ident)
+        if cached is not None:
+            return cached or None
+        stmt = self._select(profile).where(self.model.id == ident)
+        return self.session.scalars(stmt).first()
+
+    def _from_identity_map(self, ident):
+        """
+        Look an entity up in the session identity map.
+
+        Returns the entity, False when it is present but out of scope, or
+        None when it has to be loaded (absent, expired or undecidable).
+        """
+        try:
+            key = self.session.identity_key(self.model, int(ident))
+        except (TypeError, ValueError):
+            return None
+        instance = self.session.identity_map.get(key)
+        # expired by a commit: reloading it costs a query per instance
+        if instance is None or inspect(instance).expired:
+            return None
+        allowed = permits(self.payload, instance)
+        if allowed is None:
+            return None
+        return instance if allowed else False
+
+    def get_many(self, ids, profile=None, chunk_size=500):
+        """
+        Load the entities of several primary keys within the repository scope.
+
+        Entities found in the identity map are reused; the others are
+        loaded with `WHERE id IN (...)` queries of at most chunk_size ids,
+        so a mass operation costs one query per chunk instead of one per id.
+
+        Parameters:
+            ids : iterable of int
+                Primary keys; duplicates are ignored.
+            profile : str or None
+                Loading profile declared in load_profiles.
+            chunk_size : int
+                Maximum number of ids per IN query (database parameter
+                limits).
+
+        Returns: list of entities in the order of ids. Ids that do not
+        exist or are out of scope are left out.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        wanted = list(dict.fromkeys(int(i) for i in ids))
+        found = {}
+        missing = []
+        for ident in wanted:
+            cached = self._from_identity_map(ident)
+            if cached is None:
+                missing.append(ident)
+            elif cached is not False:
+                found[ident] = cached
+
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            for entity in self._all(
+                    self._select(profile).where(self.model.id.in_(chunk))):
+                found[entity.id] = entity
+
+        return [found[ident] for ident in wanted if ident in found]
+
+    def stream_rows(self, columns=None, date_from=None, date_to=None,
+                    batch_size=1000):
+        """
+        Stream plain rows of the repository model, for exports.
+
+        The rows are read with a server-side cursor (yield_per, which
+        implies stream_results) and no entity is built or kept in the
+        session, so memory stays bounded by batch_size whatever the size
+        of the table.
+
+        Parameters:
+            columns : list of str or None
+                Names from export_columns, all of them by default.
+            date_from, date_to : datetime or None
+                Inclusive bounds applied to date_column.
+            batch_size : int
+                Number of rows fetched from the cursor at a time.
+
+        Returns: an iterator of Row objects, in primary key order.
+
+        Raises ValueError for an unknown column and AccessDenied when the
+        role cannot read this entity type.
+        """
+        names = list(columns or self.export_columns)
+        unknown = [name for name in names if name not in self.export_columns]
+        if unknown:
+            raise ValueError(
+                f"Unknown column(s) for {self.model.__name__}: "
+                f"{', '.join(unknown)} (available: "
+                f"{', '.join(self.export_columns)})")
+
+        stmt = select(
+            *(self.export_columns[name].label(name) for name in names)
+        ).select_from(self.model)
+        for target, onclause in self.export_joins:
+            stmt = stmt.outerjoin(target, onclause)
+        stmt = stmt.where(predicate(self.payload, self.model))
+        if (date_from or date_to) and self.date_column is None:
+            raise ValueError(
+                f"No date column to filter {self.model.__name__} on")
+        date_column = getattr(self.model, self.date_column, None)
+        if date_from is not None:
+            stmt = stmt.where(date_column >= self._date_bound(date_column, date_from))
+        if date_to is not None:
+            stmt = stmt.where(date_column <= self._date_bound(date_column, date_to))
+        stmt = stmt.order_by(self.model.id).execution_options(
+            yield_per=batch_size)
+
+        result = self.session.execute(stmt)
+        for partition in result.partitions():
+            yield from partition
+
+    @staticmethod
+    def _date_bound(column, value):
+        # DATE columns are compared with dates, DATETIME ones as given
+        if isinstance(column.type, Date) and isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def _paginate(self, stmt, page_size, after=None, before=None, sort="id"):
+        """
+        Return one page of `stmt` using keyset (seek) pagination.
+
+        Instead of OFFSET, the page boundary is expressed as a WHERE clause
+        on the sort key, so every page costs the same index range scan
+        whatever its position in the table.
+
+        Parameters:
+            stmt : Select
+                Filtered SELECT on the repository model.
+            page_size : int
+                Maximum number of items in the page.
+            after : tuple or None
+                Cursor of the last item of the previous page (next_cursor).
+            before : tuple or None
+                Cursor of the first item of the following page (prev_cursor).
+            sort : str
+                Name of a column listed in sort_keys.
+
+        Returns: Page
+        """
+        if sort not in self.sort_keys:
+            raise ValueError(
+                f"Cannot paginate {self.model.__name__} on {sort!r}")
+        if page_size < 1:
+            raise ValueError("page_size must be a positive integer")
+
+        pk = self.model.id
+        column = getattr(self.model, sort)
+        columns = (pk,) if sort == "id" else (column, pk)
+
+        def cursor_of(item):
+            return tuple(getattr(item, col.key) for col in columns)
+
+        def seek(cursor, forward):
+            if sort == "id":
+                return pk > cursor[0] if forward else pk < cursor[0]
+            value, ident = cursor
+            if forward:
+                return or_(column > value, and_(column == value, pk > ident))
+            return or_(column < value, and_(column == value, pk < ident))
+
+        if before is not None:
+            rows = self._all(
+                stmt.where(seek(before, forward=False))
+                .order_by(*(col.desc() for col in columns))
+                .limit(page_size + 1)
+            )
+            has_previous = len(rows) > page_size
+            items = list(reversed(rows[:page_size]))
+            return Page(
+                items,
+                next_cursor=cursor_of(items[-1]) if items else None,
+                prev_cursor=cursor_of(items[0]) if has_previous else None,
+            )
+
+        if after is not None:
+            stmt = stmt.where(seek(after, forward=True))
+        rows = self._all(stmt.order_by(*columns).limit(page_size + 1))
+        has_next = len(rows) > page_size
+        items = list(rows[:page_size])
+        return Page(
+            items,
+            next_cursor=cursor_of(items[-1]) if has_next else None,
+            prev_cursor=cursor_of(items[0]) if after is not None and items else None,
+        )
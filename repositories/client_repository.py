@@ -1,8 +1,14 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import aliased, joinedload, selectinload
 from models.client import Client
+from models.utilisateur import Utilisateur
 from models.base import Session
+from repositories.base_repository import BaseRepository
 
+_commercial = aliased(Utilisateur)
 
-class ClientRepository:
+
+class ClientRepository(BaseRepository):
     """
     Repository class responsible for managing Client entities.
     Tis class provides methods to interact with the database sesssion
@@ -10,65 +16,123 @@ class ClientRepository:
 
     """
 
-    def __init__(self, session):
+    model = Client
+    load_profiles = {
+        "list": (joinedload(Client.commercial),),
+        "detail": (joinedload(Client.commercial), selectinload(Client.contrats)),
+    }
+    sort_keys = ("id", "nom_complet")
+    export_columns = {
+        "id": Client.id,
+        "nom_complet": Client.nom_complet,
+        "email": Client.email,
+        "telephone": Client.telephone,
+        "entreprise": Client.entreprise,
+        "date_creation": Client.date_creation,
+        "date_mise_a_jour": Client.date_mise_a_jour,
+        "commercial_id": Client.commercial_id,
+        "commercial": _commercial.nom,
+    }
+    export_joins = ((_commercial, Client.commercial_id == _commercial.id),)
+    date_column = "date_creation"
+
+    def save(self, client, refresh=False):
         """
-        Initialize the repository with a database session.
+        Save a client entity and commit the transaction (flush only inside
+        a unit of work).
 
         Parameters
-        session: Session
-            An SQLALchemy session used to interact with the database.
+        client: Client
+            The client instance to be added or updated in the database.
+        refresh: bool
+            Reload the client from the database after the write.
 
         """
+        self.session.add(client)
+        self._commit(client, refresh)
 
-        self.session = session
-
-    def save(self, client):
+    def insert_many(self, rows):
         """
-        Save a client entity and commit the transaction.
+        Insert a batch of clients in one statement and commit it (inside a
+        unit of work, the unit of work commits).
+
+        The rows go through a Core insert() executed with a list of
+        parameters (executemany), so no Client object is built or tracked
+        by the session. The batch is rolled back as a whole on error.
 
         Parameters
-        client: Client
-            The client instance to be added or updated in the database.
+        rows: list of dict
+            Column values of the clients to insert.
 
         """
-        self.session.add(client)
-        self.session.commit()
+        if not rows:
+            return
+        self.session.execute(insert(Client.__table__), rows)
+        self._commit()
 
-    def get_all(self):
+    def get_all(self, profile=None):
         """
         Retrieve all clients from the database.
 
+        Parameters
+        profile : Optional loading profile ("list", "detail").
+
         Returns: A list containing all client records.
 
         """
-        return self.session.query(Client).all()
+        return self._all(self._select(profile))
 
-    def get_by_commercial_id(self, commercial_id):
+    def get_by_commercial_id(self, commercial_id, profile=None):
         """
         Retrieve all clients assigned to a specific commercial user.
 
         Parameters
         commercial_id : The identifier of the commercial (Utilisateur) responsible
         for the clients.
+        profile : Optional loading profile ("list", "detail").
 
         Returns:
             A list of Client records linked to the given commercial_id.
 
         """
-        return self.session.query(Client).filter_by(commercial_id=commercial_id).all()
+        return self._all(
+            self._select(profile).where(Client.commercial_id == commercial_id))
+
+    def get_page(self, page_size=20, after=None, before=None, sort="id",
+                 commercial_id=None, profile=None):
+        """
+        Retrieve one page of clients using keyset pagination.
+
+        Parameters
+        page_size : Maximum number of clients in the page.
+        after : Cursor returned as next_cursor by the previous call.
+        before : Cursor returned as prev_cursor by the previous call.
+        sort : Pagination key ("id" or "nom_complet").
+        commercial_id : Only return clients of this commercial if given.
+        profile : Optional loading profile ("list", "detail").
+
+        Returns:
+            A Page of Client records.
+
+        """
+        stmt = self._select(profile)
+        if commercial_id is not None:
+            stmt = stmt.where(Client.commercial_id == commercial_id)
+        return self._paginate(stmt, page_size, after, before, sort)
 
-    def get_by_id(self, client_id):
+    def get_by_id(self, client_id, profile=None):
         """
         Retrieve a single client by its identifier.
         Parameters:
             client_id : int
             Primary key of the client to load.
+            profile : Optional loading profile ("list", "detail").
         Returns
             The matching client instance if found,otherwise none.
         """
-        return self.session.query(Client).filter_by(id=client_id).first()
+        return self._get(client_id, profile)
 
-    def update(self, client):
+    def update(self, client, refresh=False):
         """
         Saves the pending changes for the given client to the database.
 
@@ -76,9 +140,11 @@ class ClientRepository:
            client : Client
            The client instance whose modifications have already been applied to the 
            SQLALchemy session.
+           refresh : bool
+           Reload the client from the database after the write.
        """
-        self.session.commit()
+        self._commit(client, refresh)
 
     def delete(self, client):
         self.session.delete(client)
-        self.session.commit()
+        self._commit()
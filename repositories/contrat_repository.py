@@ -1,63 +1,116 @@
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from models.client import Client
 from models.contrat import Contrat
+from models.evenement import Evenement
+from models.utilisateur import Utilisateur
+from repositories.base_repository import BaseRepository
 
+# aliases keep the export joins apart from the tables used by the filters
+_client = aliased(Client)
+_commercial = aliased(Utilisateur)
 
-class ContratRepository:
+
+class ContratRepository(BaseRepository):
     """
     Data access layer for Contrat entities using SQLALchemy ORM.
 
     """
 
-    def __init__(self, session):
-        """
-        Initialize with SQLALchemy session.
-        Parameters:
-            session : sqlalchemy.orm.session
-                A session object for DB communication.
-        """
-        self.session = session
+    model = Contrat
+    load_profiles = {
+        "list": (joinedload(Contrat.client), joinedload(Contrat.commercial)),
+        "detail": (
+            joinedload(Contrat.client),
+            joinedload(Contrat.commercial),
+            selectinload(Contrat.evenements).joinedload(Evenement.support),
+        ),
+    }
+    export_columns = {
+        "id": Contrat.id,
+        "client_id": Contrat.client_id,
+        "client": _client.nom_complet,
+        "commercial_id": Contrat.commercial_id,
+        "commercial": _commercial.nom,
+        "montant_total": Contrat.montant_total,
+        "montant_restant": Contrat.montant_restant,
+        "date_creation": Contrat.date_creation,
+        "statut": Contrat.statut,
+    }
+    export_joins = (
+        (_client, Contrat.client_id == _client.id),
+        (_commercial, Contrat.commercial_id == _commercial.id),
+    )
+    date_column = "date_creation"
 
-    def save(self, contrat):
+    def save(self, contrat, refresh=False):
         """
-        Persist a new contrat to the database and refresh it.
+        Persist a new contrat to the database, reloading it only if
+        refresh is requested.
 
         """
         self.session.add(contrat)
-        self.session.commit()
-        self.session.refresh(contrat)
+        self._commit(contrat, refresh)
         return contrat
 
-    def get_all(self):
+    def get_all(self, profile=None):
         """
         Retrieve all contracts from the database.
         """
-        return self.session.query(Contrat).all()
+        return self._all(self._select(profile))
 
-    def get_by_commercial_id(self, commercial_id: int):
+    def get_by_commercial_id(self, commercial_id: int, profile=None):
         """
         Retrieve all contracts associated with a given commercial.
         Parameters:
             commercial_id : int
             The ID of the commercial user.
+            profile : str or None
+            Optional loading profile ("list", "detail").
         Returns: list of contrats
         """
-        return (
-            self.session
-            .query(Contrat)
-            .filter(Contrat.commercial_id == commercial_id)
+        return self._all(
+            self._select(profile)
+            .where(Contrat.commercial_id == commercial_id)
         )
 
-    def get_by_id(self, contrat_id: int):
+    def get_page(self, page_size: int = 20, after=None, before=None, sort="id",
+                 commercial_id: int = None, statut: bool = None, unpaid=False,
+                 profile=None):
+        """
+        Retrieve one page of contracts using keyset pagination.
+        Parameters:
+            page_size : int
+            Maximum number of contracts in the page.
+            after / before : tuple or None
+            Cursors returned by the previous page (next_cursor / prev_cursor).
+            commercial_id : int or None
+            Only return contracts of this commercial.
+            statut : bool or None
+            Only return signed (True) or unsigned (False) contracts.
+            unpaid : bool
+            Only return contracts with a remaining amount greater than zero.
+        Returns: Page of contrats
+        """
+        stmt = self._select(profile)
+        if commercial_id is not None:
+            stmt = stmt.where(Contrat.commercial_id == commercial_id)
+        if statut is not None:
+            stmt = stmt.where(Contrat.statut == statut)
+        if unpaid:
+            stmt = stmt.where(Contrat.montant_restant > 0)
+        return self._paginate(stmt, page_size, after, before, sort)
+
+    def get_by_id(self, contrat_id: int, profile=None):
         """
         Retrieve a contract by its identifier.
         """
-        return self.session.query(Contrat).get(contrat_id)
+        return self._get(contrat_id, profile)
 
-    def update(self, contrat: Contrat):
+    def update(self, contrat: Contrat, refresh=False):
         """
         Persist changes made to an existing contract.
         """
-        self.session.commit()
-        self.session.refresh(contrat)
+        self._commit(contrat, refresh)
         return contrat
 
     def delete(self, contrat: Contrat):
@@ -65,26 +118,22 @@ class ContratRepository:
         Delete a contrat from the database.
         """
         self.session.delete(contrat)
-        self.session.commit()
+        self._commit()
 
-    def get_by_staut(self, statut: bool):
+    def get_by_staut(self, statut: bool, profile=None):
         """
         Retrieve contrats filtered by signature status.
         """
-        return (
-            self.session
-            .query(Contrat)
-            .filter(Contrat.statut == statut)
-            .all()
+        return self._all(
+            self._select(profile)
+            .where(Contrat.statut == statut)
         )
 
-    def get_unpaid(self):
+    def get_unpaid(self, profile=None):
         """
         Retrieve contracts where the remainig amount is greater than zero.
         """
-        return (
-            self.session
-            .query(Contrat)
-            .filter(Contrat.montant_restant > 0)
-            .all()
+        return self._all(
+            self._select(profile)
+            .where(Contrat.montant_restant > 0)
         )
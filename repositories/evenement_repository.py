@@ -1,53 +1,148 @@
+from sqlalchemy import func
+from sqlalchemy.orm import aliased, joinedload
+from models.client import Client
+from models.contrat import Contrat
 from models.evenement import Evenement
+from models.utilisateur import Utilisateur
+from repositories.base_repository import BaseRepository
 
+# aliases keep the export joins apart from the Contrat subquery of the
+# commercial access rule and of the filters
+_contrat = aliased(Contrat)
+_client = aliased(Client)
+_support = aliased(Utilisateur)
 
-class EvenementRepository:
+
+class EvenementRepository(BaseRepository):
     """
     Data access layer for Evenement entities using SQLALchemy ORM.
     """
 
-    def __init__(self, session):
-        """
-        Initialize the repository with a SQLALchemy session.
-        """
-        self.session = session
+    model = Evenement
+    load_profiles = {
+        "list": (
+            joinedload(Evenement.contrat).joinedload(Contrat.client),
+            joinedload(Evenement.support),
+        ),
+        "detail": (
+            joinedload(Evenement.contrat).joinedload(Contrat.client),
+            joinedload(Evenement.contrat).joinedload(Contrat.commercial),
+            joinedload(Evenement.support),
+        ),
+    }
+    export_columns = {
+        "id": Evenement.id,
+        "contrat_id": Evenement.contrat_id,
+        "client": func.coalesce(Evenement.nom_client, _client.nom_complet),
+        "contact_client": Evenement.contact_client,
+        "support_id": Evenement.support_id,
+        "support": _support.nom,
+        "date_debut": Evenement.date_debut,
+        "date_fin": Evenement.date_fin,
+        "lieu": Evenement.lieu,
+        "participants": Evenement.participants,
+        "notes": Evenement.notes,
+    }
+    export_joins = (
+        (_contrat, Evenement.contrat_id == _contrat.id),
+        (_client, _contrat.client_id == _client.id),
+        (_support, Evenement.support_id == _support.id),
+    )
+    date_column = "date_debut"
 
-    def save(self, evenement: Evenement):
+    def save(self, evenement: Evenement, refresh=False):
         """
-        Persist a new Evenement to the database and refresh it.
+        Persist a new Evenement to the database, reloading it only if
+        refresh is requested.
         """
         self.session.add(evenement)
-        self.session.commit()
-        self.session.refresh(evenement)
+        self._commit(evenement, refresh)
         return evenement
 
-    def get_all(self):
+    def get_all(self, profile=None):
         """
         Retrieve all evenements from the database.
         """
-        return self.session.query(Evenement).all()
+        return self._all(self._select(profile))
 
-    def get_by_support_id(self, support_id: int):
+    def get_by_support_id(self, support_id: int, profile=None):
         """
         Retrieve all events assigned to a specific support user.
         """
-        return (
-            self.session
-            .query(Evenement)
-            .filter(Evenement.support_id == support_id)
-            .all()
+        return self._all(
+            self._select(profile)
+            .where(Evenement.support_id == support_id)
+        )
+
+    def get_by_commercial_id(self, commercial_id: int, date_from=None, date_to=None,
+                             unassigned_only=False, profile=None):
+        """
+        Retrieve the events of the contracts handled by a commercial user.
+
+        The contract ownership is resolved in SQL by joining evenements to
+        contrats, so only the commercial's events are read.
+
+        Parameters:
+            commercial_id : int
+                The ID of the commercial owning the contracts.
+            date_from, date_to : datetime or None
+                Inclusive bounds on date_debut.
+            unassigned_only : bool
+                Only return events without a support user.
+        """
+        return self._all(self._filter(
+            self._select(profile), commercial_id=commercial_id,
+            date_from=date_from, date_to=date_to,
+            unassigned_only=unassigned_only,
+        ))
+
+    def get_page(self, page_size: int = 20, after=None, before=None, sort="id",
+                 support_id: int = None, commercial_id: int = None,
+                 date_from=None, date_to=None, unassigned_only=False, profile=None):
+        """
+        Retrieve one page of events using keyset pagination.
+
+        `after` and `before` are the next_cursor / prev_cursor of the
+        previously returned page. The filters are those of
+        get_by_commercial_id, plus support_id.
+        """
+        stmt = self._filter(
+            self._select(profile), support_id=support_id,
+            commercial_id=commercial_id, date_from=date_from,
+            date_to=date_to, unassigned_only=unassigned_only,
         )
+        return self._paginate(stmt, page_size, after, before, sort)
+
+    def _filter(self, stmt, support_id=None, commercial_id=None,
+                date_from=None, date_to=None, unassigned_only=False):
+        """
+        Apply the optional event filters to a statement.
+        """
+        if support_id is not None:
+            stmt = stmt.where(Evenement.support_id == support_id)
+        if commercial_id is not None:
+            stmt = (
+                stmt
+                .join(Contrat, Evenement.contrat_id == Contrat.id)
+                .where(Contrat.commercial_id == commercial_id)
+            )
+        if date_from is not None:
+            stmt = stmt.where(Evenement.date_debut >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Evenement.date_debut <= date_to)
+        if unassigned_only:
+            stmt = stmt.where(Evenement.support_id.is_(None))
+        return stmt
 
-    def get_by_id(self, evenement_id: int):
+    def get_by_id(self, evenement_id: int, profile=None):
         """
         Retrieve an event by its identifier.
         """
-        return self.session.query(Evenement).get(evenement_id)
+        return self._get(evenement_id, profile)
 
-    def update(self, evenement: Evenement):
+    def update(self, evenement: Evenement, refresh=False):
         """
         Persist changes made to an existing event.
         """
-        self.session.commit()
-        self.session.refresh(evenement)
+        self._commit(evenement, refresh)
         return evenement
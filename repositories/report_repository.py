@@ -0,0 +1,147 @@
+from sqlalchemy import and_, case, func, select
+
+from models.client import Client
+from models.contrat import Contrat
+from models.evenement import Evenement
+from models.utilisateur import Utilisateur
+from policies.access_policy import predicate
+from repositories.base_repository import BaseRepository
+
+# Breakdowns available on top of the per-commercial grouping
+BREAKDOWNS = ("month", "entreprise")
+
+# "YYYY-MM" of a date, per dialect
+_MONTH_FORMATS = {
+    "sqlite": lambda column: func.strftime("%Y-%m", column),
+    "mysql": lambda column: func.date_format(column, "%Y-%m"),
+}
+
+
+class ReportRepository(BaseRepository):
+    """
+    Aggregate queries on contracts, computed by the database.
+
+    Each report is a single GROUP BY statement: one round trip whatever
+    the number of contracts, and only the aggregated rows are returned.
+    Contracts are scoped with the access policy like every other read.
+    """
+
+    model = Contrat
+
+    def commercial_totals(self, breakdown=None, date_from=None, date_to=None,
+                          commercial_id=None):
+        """
+        Aggregate the contracts per commercial.
+
+        Parameters:
+            breakdown : str or None
+                "month" (of date_creation, as "YYYY-MM") or "entreprise"
+                (company of the client) to split each commercial's totals.
+            date_from, date_to : date or None
+                Inclusive bounds on the contract creation date.
+            commercial_id : int or None
+                Only aggregate the contracts of this commercial.
+
+        Returns: list of Row with commercial_id, commercial, [mois |
+        entreprise,] contrats, signes, non_signes, montant_total,
+        montant_restant and evenements.
+        """
+        if breakdown is not None and breakdown not in BREAKDOWNS:
+            raise ValueError(f"Unknown report breakdown {breakdown!r}")
+
+        keys = [Contrat.commercial_id.label("commercial_id")]
+        if breakdown == "month":
+            # grouped on the raw date first, in the order of the covering
+            # index, then the per-day rows are rolled up to months: no
+            # date function per contract
+            keys.append(Contrat.date_creation.label("jour"))
+        elif breakdown == "entreprise":
+            keys.append(Client.entreprise.label("entreprise"))
+
+        def scoped(stmt):
+            if breakdown == "entreprise":
+                stmt = stmt.outerjoin(Client, Contrat.client_id == Client.id)
+            stmt = stmt.where(predicate(self.payload, Contrat))
+            if date_from is not None:
+                stmt = stmt.where(Contrat.date_creation >= date_from)
+            if date_to is not None:
+                stmt = stmt.where(Contrat.date_creation <= date_to)
+            if commercial_id is not None:
+                stmt = stmt.where(Contrat.commercial_id == commercial_id)
+            return stmt.group_by(*keys)
+
+        # Contracts and events are aggregated separately on the same keys
+        # and the two small results are joined, so that events never
+        # multiply the contract amounts. Events are first counted per
+        # contract from their index, so each contract is looked up once.
+        contracts = scoped(
+            select(
+                *keys,
+                func.count(Contrat.id).label("contrats"),
+                func.sum(case((Contrat.statut.is_(True), 1), else_=0))
+                .label("signes"),
+                func.sum(case((Contrat.statut.is_(True), 0), else_=1))
+                .label("non_signes"),
+                func.coalesce(func.sum(Contrat.montant_total), 0)
+                .label("montant_total"),
+                func.coalesce(func.sum(Contrat.montant_restant), 0)
+                .label("montant_restant"),
+            ).select_from(Contrat)
+        ).subquery()
+        per_contract = (
+            select(Evenement.contrat_id,
+                   func.count(Evenement.id).label("evenements"))
+            .group_by(Evenement.contrat_id)
+            .subquery()
+        )
+        events = scoped(
+            select(*keys, func.sum(per_contract.c.evenements)
+                   .label("evenements"))
+            .select_from(per_contract)
+            .join(Contrat, per_contract.c.contrat_id == Contrat.id)
+        ).subquery()
+        if breakdown == "month":
+            contracts = self._by_month(contracts, (
+                "contrats", "signes", "non_signes", "montant_total",
+                "montant_restant"))
+            events = self._by_month(events, ("evenements",))
+
+        names = [column.name for column in contracts.c
+                 if column.name in ("commercial_id", "mois", "entreprise")]
+        group_columns = [contracts.c[name] for name in names[1:]]
+        stmt = (
+            select(
+                contracts.c.commercial_id,
+                Utilisateur.nom.label("commercial"),
+                *group_columns,
+                contracts.c.contrats,
+                contracts.c.signes,
+                contracts.c.non_signes,
+                contracts.c.montant_total,
+                contracts.c.montant_restant,
+                func.coalesce(events.c.evenements, 0).label("evenements"),
+            )
+            .select_from(contracts)
+            .outerjoin(Utilisateur, contracts.c.commercial_id == Utilisateur.id)
+            .outerjoin(events, and_(*(
+                contracts.c[name].is_not_distinct_from(events.c[name])
+                for name in names)))
+            .order_by(contracts.c.commercial_id, *group_columns)
+        )
+        return self.session.execute(stmt).all()
+
+    def _by_month(self, per_day, totals):
+        """
+        Roll a subquery grouped on (commercial_id, jour) up to
+        (commercial_id, mois).
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in _MONTH_FORMATS:
+            raise ValueError(f"No month breakdown on {dialect}")
+        month = _MONTH_FORMATS[dialect](per_day.c.jour).label("mois")
+        return (
+            select(per_day.c.commercial_id, month,
+                   *(func.sum(per_day.c[name]).label(name) for name in totals))
+            .group_by(per_day.c.commercial_id, month)
+            .subquery()
+        )
@@ -1,8 +1,11 @@
+from sqlalchemy import func, insert
+
 from models.utilisateur import Utilisateur
 from models.base import Session
+from repositories.base_repository import BaseRepository
 
 
-class UtilisateurRepository:
+class UtilisateurRepository(BaseRepository):
     """
     Repository class responsible for managing Utlisateur entities.
     This class provides methods to interact with the database session
@@ -10,12 +13,8 @@ class UtilisateurRepository:
 
     """
 
-    def __init__(self, session):
-        """
-        Initializes the repository with a SQLALchemy session.
-        :param session: SQLALchemy session used for database operations.
-        """
-        self.session = session
+    model = Utilisateur
+    sort_keys = ("id", "nom", "email")
 
     def find_by_email(self, email):
         """
@@ -26,18 +25,51 @@ class UtilisateurRepository:
         :return: The matching utilisateur instance if found, otherwise none.
 
         """
-        return self.session.query(Utilisateur).filter_by(email=email).first()
+        return self.session.scalars(
+            self._select().where(Utilisateur.email == email)).first()
 
-    def save(self, utilisateur):
+    def save(self, utilisateur, refresh=False):
         """
         Saves a utilisateur entity to the database.
-        The entity is added to the current session and committed immediately.
+        The entity is added to the current session and committed immediately
+        (flushed only, inside a unit of work).
 
         :param utilisateur: Utilisateur instance to save.
+        :param refresh: reload the user from the database after the write.
 
         """
         self.session.add(utilisateur)
-        self.session.commit()
+        self._commit(utilisateur, refresh)
+
+    def insert_many(self, rows):
+        """
+        Insert a batch of users in one executemany statement and commit it
+        (inside a unit of work, the unit of work commits).
+
+        :param rows: list of dict with nom, email, mot_de_passe (hashed) and role.
+        """
+        if not rows:
+            return
+        self.session.execute(insert(Utilisateur.__table__), rows)
+        self._commit()
+
+    def existing_emails(self, emails):
+        """
+        Return the emails of the list that already belong to a user, in
+        one query. The comparison ignores the case, whatever the collation
+        of the database (MySQL compares case-insensitively, SQLite does
+        not).
+
+        :param emails: email addresses to check.
+        :return: set of the emails already taken, in lower case.
+        """
+        emails = {email.lower() for email in emails}
+        if not emails:
+            return set()
+        email = func.lower(Utilisateur.email)
+        stmt = (self._select().with_only_columns(email)
+                .where(email.in_(emails)))
+        return set(self.session.scalars(stmt))
 
     def get_all(self):
         """
@@ -45,20 +77,54 @@ class UtilisateurRepository:
         :return: List of Utilisateur objects
 
         """
-        return self.session.query(Utilisateur).all()
+        return self._all(self._select())
+
+    def get_page(self, page_size: int = 20, after=None, before=None, sort="id",
+                 role: str = None):
+        """
+        Fetch one page of users using keyset pagination.
+
+        :param page_size: maximum number of users in the page.
+        :param after: next_cursor of the previous page.
+        :param before: prev_cursor of the following page.
+        :param sort: pagination key ("id", "nom" or "email").
+        :param role: only return users with this role if given.
+        :return: Page of Utilisateur objects
+
+        """
+        stmt = self._select()
+        if role is not None:
+            stmt = stmt.where(Utilisateur.role == role)
+        return self._paginate(stmt, page_size, after, before, sort)
+
+    def get_by_role(self, role: str):
+        """
+        Fetch all users having the given role.
+        :return: List of Utilisateur objects
+        """
+        return self._all(self._select().where(Utilisateur.role == role))
+
+    def get_emails_by_id(self, role: str):
+        """
+        Fetch the id and email of every user having the given role, in a
+        single query and without loading the entities.
+        :return: dict mapping user id to email
+        """
+        stmt = self._select().where(Utilisateur.role == role).with_only_columns(
+            Utilisateur.id, Utilisateur.email)
+        return dict(self.session.execute(stmt).all())
 
     def get_by_id(self, user_id: int):
         """
         Retrieve a user by its identifier.
         """
-        return self.session.query(Utilisateur).get(user_id)
+        return self._get(user_id)
 
-    def update(self, utilisateur: Utilisateur):
+    def update(self, utilisateur: Utilisateur, refresh=False):
         """
         Persist changes made to an existing user.
         """
-        self.session.commit()
-        self.session.refresh(utilisateur)
+        self._commit(utilisateur, refresh)
         return utilisateur
 
     def delete(self, utilisateur: Utilisateur):
@@ -66,4 +132,4 @@ class UtilisateurRepository:
         Delete a user from a database.
         """
         self.session.delete(utilisateur)
-        self.session.commit()
+        self._commit()
@@ -0,0 +1,115 @@
+"""
+asyncio versions of the services, on top of an AsyncSession.
+
+    async with AsyncSessionLocal() as session:
+        service = AsyncContratService(session, payload)
+        page = await service.get_contrats_page(page_size=50, profile="list")
+
+Every method awaits the synchronous service method of the same name run
+on the AsyncSession connection (see repositories.async_repository), so
+the business rules (Sentry events, cache invalidation, unit of work
+callbacks) are exactly those of the synchronous services. Password
+hashing and verification, which are CPU bound, are awaited on the
+hashing pool instead of running on the event loop. Group several writes
+with services.unit_of_work.async_unit_of_work.
+"""
+import asyncio
+
+from repositories.async_repository import AsyncRepository, delegate
+from services.client_service import ClientService
+from services.contrat_service import ContratService
+from services.evenement_service import EvenementService
+from services.utilisateur_service import UtilisateurService
+from utils.security import needs_rehash, submit_hash, submit_verify
+
+
+class AsyncClientService(AsyncRepository):
+    sync_class = ClientService
+
+    create_client = delegate("create_client")
+    get_all_clients = delegate("get_all_clients")
+    get_clients_by_commercial_id = delegate("get_clients_by_commercial_id")
+    get_clients_page = delegate("get_clients_page")
+    get_client_by_id = delegate("get_client_by_id")
+    get_clients_by_ids = delegate("get_clients_by_ids")
+    update_client = delegate("update_client")
+    delete_client = delegate("delete_client")
+
+
+class AsyncContratService(AsyncRepository):
+    sync_class = ContratService
+
+    create_contrat = delegate("create_contrat")
+    get_all_contrats = delegate("get_all_contrats")
+    get_contrats_by_commercial_id = delegate("get_contrats_by_commercial_id")
+    get_contrats_page = delegate("get_contrats_page")
+    get_contrat_by_id = delegate("get_contrat_by_id")
+    get_contrats_by_ids = delegate("get_contrats_by_ids")
+    update_contrat = delegate("update_contrat")
+    delete_contrat = delegate("delete_contrat")
+    get_signed_contrats = delegate("get_signed_contrats")
+    get_unsigned_contrats = delegate("get_unsigned_contrats")
+    get_unpaid_contrats = delegate("get_unpaid_contrats")
+
+
+class AsyncEvenementService(AsyncRepository):
+    sync_class = EvenementService
+
+    create_evenement = delegate("create_evenement")
+    get_all_evenements = delegate("get_all_evenements")
+    get_evenements_by_support_id = delegate("get_evenements_by_support_id")
+    get_evenements_by_commercial_id = delegate("get_evenements_by_commercial_id")
+    get_evenements_page = delegate("get_evenements_page")
+    get_evenement_by_id = delegate("get_evenement_by_id")
+    get_evenements_by_ids = delegate("get_evenements_by_ids")
+    update_evenement = delegate("update_evenement")
+
+
+class AsyncUtilisateurService(AsyncRepository):
+    sync_class = UtilisateurService
+
+    list_users = delegate("list_users")
+    list_users_page = delegate("list_users_page")
+    get_users_by_role = delegate("get_users_by_role")
+    get_user_by_id = delegate("get_user_by_id")
+    get_users_by_ids = delegate("get_users_by_ids")
+    delete_user = delegate("delete_user")
+
+    async def create_user(self, nom, email, password, role):
+        """
+        Async version of create_user(): the password is hashed on the
+        hashing pool, then the user is saved.
+        """
+        hashed = await asyncio.wrap_future(submit_hash(password))
+        return await self._run("_create", nom, email, hashed, role)
+
+    async def login(self, email, password):
+        """
+        Async version of login(): verification (and the rehash of an
+        outdated hash) run on the hashing pool.
+
+        :return: The authenticated Utilisateur if credentials are valid,
+            otherwise None.
+        """
+        user = await self.session.run_sync(
+            lambda s: self.sync(s).repo.find_by_email(email))
+        if user is None:
+            return None
+        if not await asyncio.wrap_future(
+                submit_verify(password, user.mot_de_passe)):
+            return None
+        if needs_rehash(user.mot_de_passe):
+            hashed = await asyncio.wrap_future(submit_hash(password))
+            await self._run("_store_hash", user, hashed)
+        return user
+
+    async def update_user(self, utilisateur, nom=None, email=None,
+                          role=None, mot_de_passe=None):
+        """
+        Async version of update_user(): a new password is hashed on the
+        hashing pool before the update is applied.
+        """
+        hashed = None
+        if mot_de_passe is not None:
+            hashed = await asyncio.wrap_future(submit_hash(mot_de_passe))
+        await self._run("_update", utilisateur, nom, email, role, hashed)
@@ -0,0 +1,236 @@
+import csv
+import re
+import time
+from datetime import date
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from repositories.client_repository import ClientRepository
+from repositories.utilisateur_repository import UtilisateurRepository
+from services.unit_of_work import unit_of_work
+from utils.sentry_config import capture_message, traced
+
+# Simple sanity check, the full RFC is not worth it for contact lists
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Maximum lengths of the client columns (see models/client.py)
+MAX_LENGTHS = {
+    "nom_complet": 100,
+    "email": 100,
+    "telephone": 20,
+    "entreprise": 100,
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportReport:
+    """
+    Outcome of a client import: counters, rejected rows and throughput.
+    """
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.read = 0
+        self.inserted = 0
+        # (line number, reason, original row) of every rejected row
+        self.rejected = []
+        self.batches = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line, reason, row):
+        self.rejected.append((line, reason, row))
+
+    def write_rejects(self, stream, fieldnames):
+        """
+        Write the rejected rows as CSV: line, raison, then the original columns.
+        """
+        writer = csv.writer(stream)
+        writer.writerow(["ligne", "raison", *fieldnames])
+        for line, reason, row in self.rejected:
+            writer.writerow([line, reason, *(row.get(f, "") for f in fieldnames)])
+
+    def summary(self):
+        return {
+            "lues": self.read,
+            "importees": self.inserted,
+            "rejetees": len(self.rejected),
+            "lots": self.batches,
+            "secondes": round(self.elapsed, 3),
+            "lignes_par_seconde": round(self.rows_per_second, 1),
+            "dry_run": self.dry_run,
+        }
+
+
+@traced("service")
+class ClientImportService:
+    """
+    Bulk import of clients from a CSV file.
+
+    The file is streamed row by row, each row is validated, and the valid
+    rows are inserted in batches with one executemany and one transaction
+    per batch, instead of one ORM object and one commit per client.
+
+    Expected columns: nom_complet, email, telephone, entreprise, and the
+    commercial as commercial_id or commercial_email. A commercial user
+    may leave the commercial empty: the clients are then assigned to him.
+    """
+
+    def __init__(self, session, payload=None):
+        """
+        Initialize the import service.
+
+        :param session: SQLALchemy session used for the inserts.
+        :param payload: JWT payload of the importing user. The commercial
+            lookup is scoped like every read, so a commercial can only
+            import clients for himself.
+        """
+        self.payload = payload
+        self.session = session
+        self.repo = ClientRepository(session, payload)
+        self.user_repo = UtilisateurRepository(session, payload)
+        # header of the last file read, used by the rejected-rows report
+        self.fieldnames = []
+
+    def read_rows(self, stream, delimiter=","):
+        """
+        Yield (line number, row dict) for each data line of a CSV stream.
+        """
+        reader = csv.DictReader(stream, delimiter=delimiter)
+        self.fieldnames = reader.fieldnames or []
+        for row in reader:
+            yield reader.line_num, row
+
+    def validate_rows(self, rows, report):
+        """
+        Yield the column values of each valid row and record the others
+        as rejected in the report.
+
+        The commercials are resolved with a single query before the first
+        row, instead of one lookup per row.
+        """
+        emails_by_id = self.user_repo.get_emails_by_id("commercial")
+        ids_by_email = {email.lower(): id_ for id_, email in emails_by_id.items()}
+        default_commercial = None
+        if self.payload and self.payload.get("role") == "commercial":
+            default_commercial = self.payload["id"]
+        today = date.today()
+
+        for line, row in rows:
+            report.read += 1
+            values = {
+                key: (row.get(key) or "").strip() or None
+                for key in MAX_LENGTHS
+            }
+
+            if not values["nom_complet"]:
+                report.reject(line, "nom_complet manquant", row)
+                continue
+            if not values["email"] or not EMAIL_RE.match(values["email"]):
+                report.reject(line, "email invalide", row)
+                continue
+            too_long = [k for k, v in values.items()
+                        if v and len(v) > MAX_LENGTHS[k]]
+            if too_long:
+                report.reject(
+                    line, f"valeur trop longue : {', '.join(too_long)}", row)
+                continue
+
+            commercial_id = self._resolve_commercial(
+                row, emails_by_id, ids_by_email, default_commercial)
+            if commercial_id is None:
+                report.reject(line, "commercial introuvable", row)
+                continue
+
+            values["commercial_id"] = commercial_id
+            values["date_creation"] = today
+            yield line, row, values
+
+    @staticmethod
+    def _resolve_commercial(row, emails_by_id, ids_by_email, default):
+        raw_id = (row.get("commercial_id") or "").strip()
+        raw_email = (row.get("commercial_email") or "").strip().lower()
+        if raw_id:
+            try:
+                commercial_id = int(raw_id)
+            except ValueError:
+                return None
+            return commercial_id if commercial_id in emails_by_id else None
+        if raw_email:
+            return ids_by_email.get(raw_email)
+        return default
+
+    def import_csv(self, stream, batch_size=DEFAULT_BATCH_SIZE, dry_run=False,
+                   delimiter=",", on_batch=None):
+        """
+        Import the clients of a CSV stream.
+
+        Parameters
+        ----------
+        stream : file-like
+            Opened CSV file (text mode).
+        batch_size : int
+            Number of rows inserted per statement and per transaction.
+        dry_run : bool
+            Only validate the file, nothing is written to the database.
+        delimiter : str
+            CSV field separator.
+        on_batch : callable or None
+            on_batch(report) called after each batch, for progress output.
+
+        Returns
+        -------
+        ImportReport
+            Counters, rejected rows and rows per second. When a batch
+            fails in the database, its rows are reported as rejected and
+            the import goes on with the next batch.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size doit être positif")
+        report = ImportReport(dry_run=dry_run)
+        start = time.perf_counter()
+
+        batch = []
+        valid = self.validate_rows(self.read_rows(stream, delimiter), report)
+        for item in valid:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                self._flush(batch, report, dry_run)
+                batch = []
+                report.elapsed = time.perf_counter() - start
+                if on_batch:
+                    on_batch(report)
+        if batch:
+            self._flush(batch, report, dry_run)
+        report.elapsed = time.perf_counter() - start
+        if on_batch and batch:
+            on_batch(report)
+
+        if not dry_run:
+            capture_message(
+                f"[CLIENTS_IMPORTED] inserted={report.inserted}, "
+                f"rejected={len(report.rejected)}, "
+                f"rows_per_second={report.rows_per_second:.0f}",
+                level="info",
+            )
+        return report
+
+    def _flush(self, batch, report, dry_run):
+        report.batches += 1
+        if dry_run:
+            report.inserted += len(batch)
+            return
+        try:
+            # one transaction per batch, rolled back as a whole on error
+            with unit_of_work(self.session):
+                self.repo.insert_many([values for _, _, values in batch])
+        except SQLAlchemyError as e:
+            reason = f"erreur base de données : {e.__class__.__name__}"
+            for line, row, _ in batch:
+                report.reject(line, reason, row)
+            return
+        report.inserted += len(batch)
@@ -1,8 +1,10 @@
 from models.client import Client
 from repositories.client_repository import ClientRepository
 from datetime import date
+from utils.sentry_config import traced
 
 
+@traced("service")
 class ClientService:
 
     """
@@ -13,13 +15,15 @@ class ClientService:
 
     """
 
-    def __init__(self, session):
+    def __init__(self, session, payload=None):
         """
         Initialize the client service with a database session.
               :param session: SQLALchemy session used to access the repository.
+              :param payload: JWT payload of the current user. Reads are
+                  limited to what the user's role may see (None = unscoped).
 
         """
-        self.repo = ClientRepository(session)
+        self.repo = ClientRepository(session, payload)
 
     def create_client(self, nom_complet, email, phone, entreprise, commercial_id):
         """
@@ -55,16 +59,21 @@ class ClientService:
         self.repo.save(client)
         return client
 
-    def get_all_clients(self):
+    def get_all_clients(self, profile=None):
         """
         Retrieve all clients from the database.
 
+        Parameters
+        ----------
+        profile : str or None
+        Loading profile passed to the repository ("list", "detail").
+
         Returns: A list containing all the saved Client entities.
 
         """
-        return self.repo.get_all()
+        return self.repo.get_all(profile=profile)
 
-    def get_clients_by_commercial_id(self, commercial_id):
+    def get_clients_by_commercial_id(self, commercial_id, profile=None):
         """
         Retrieve all clients assigned to a specific commercial user.
 
@@ -72,9 +81,31 @@ class ClientService:
             A list of Client entities linked to the given commercial_id.
 
         """
-        return self.repo.get_by_commercial_id(commercial_id)
+        return self.repo.get_by_commercial_id(commercial_id, profile=profile)
+
+    def get_clients_page(self, page_size=20, after=None, before=None, sort="id",
+                         commercial_id=None, profile=None):
+        """
+        Retrieve one page of clients, optionally restricted to a commercial.
+
+        Parameters
+        ----------
+        page_size : int
+        Maximum number of clients in the page.
+        after, before : tuple or None
+        Cursors of the neighbouring page (Page.next_cursor / Page.prev_cursor).
+        sort : str
+        Pagination key ("id" or "nom_complet").
+        commercial_id : int or None
+        Identifier of the commercial whose clients are listed.
+
+        Returns : A Page of Client entities.
+        """
+        return self.repo.get_page(
+            page_size=page_size, after=after, before=before, sort=sort,
+            commercial_id=commercial_id, profile=profile)
 
-    def get_client_by_id(self, client_id):
+    def get_client_by_id(self, client_id, profile=None):
         """
         Retrieve a client by its identifier.
 
@@ -82,10 +113,27 @@ class ClientService:
         ----------
         client_id : int
         The primary key of the client to retrieve.
+        profile : str or None
+        Loading profile passed to the repository ("list", "detail").
 
         Returns : The Client instance if found, otherwise None.
     """
-        return self.repo.get_by_id(client_id)
+        return self.repo.get_by_id(client_id, profile=profile)
+
+    def get_clients_by_ids(self, client_ids, profile=None):
+        """
+        Retrieve several clients in batched queries.
+
+        Parameters
+        ----------
+        client_ids : iterable of int
+        The primary keys of the clients to retrieve.
+        profile : str or None
+        Loading profile passed to the repository ("list", "detail").
+
+        Returns : The Client instances found, in the order of client_ids.
+        """
+        return self.repo.get_many(client_ids, profile=profile)
 
     def update_client(self, client, **fields):
         """
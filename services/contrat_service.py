@@ -3,22 +3,26 @@
 from models.contrat import Contrat
 from repositories.contrat_repository import ContratRepository
 from datetime import date
-import sentry_sdk
+from services.unit_of_work import on_commit
+from utils.sentry_config import capture_message, traced
 
 
+@traced("service")
 class ContratService:
     """
     Service layer responsible for business logic related to contracts (Contrats).
     This class handles operations such as contract creation, filtering, and updates.
     """
 
-    def __init__(self, session):
+    def __init__(self, session, payload=None):
         """
         Initialize the contract service with a database session.
 
         :param session: SQLAlchemy session used to initialize the repository.
+        :param payload: JWT payload scoping the reads to the user's role
+            (None = unscoped).
         """
-        self.repo = ContratRepository(session)
+        self.repo = ContratRepository(session, payload)
 
     def create_contrat(self, client_id, commercial_id, montant_total, montant_restant=None, statut=False):
         """
@@ -56,23 +60,48 @@ class ContratService:
         self.repo.save(contrat)
         return contrat
 
-    def get_all_contrats(self):
+    def get_all_contrats(self, profile=None):
         """
         Retrieve all contrats from the database.
+
+        :param profile: optional loading profile ("list", "detail").
         """
-        return self.repo.get_all()
+        return self.repo.get_all(profile=profile)
 
-    def get_contrats_by_commercial_id(self, commercial_id: int):
+    def get_contrats_by_commercial_id(self, commercial_id: int, profile=None):
         """
         Retrieve all contrats associated with a given commercial user.
         """
-        return self.repo.get_by_commercial_id(commercial_id)
+        return self.repo.get_by_commercial_id(commercial_id, profile=profile)
+
+    def get_contrats_page(self, page_size: int = 20, after=None, before=None,
+                          sort="id", commercial_id: int = None, unsigned=False,
+                          unpaid=False, profile=None):
+        """
+        Retrieve one page of contrats.
 
-    def get_contrat_by_id(self, contrat_id: int):
+        :param commercial_id: restrict to the contrats of this commercial.
+        :param unsigned: only contrats that are not signed.
+        :param unpaid: only contrats where montant_restant > 0.
+        :return: Page of contrats (see Page.next_cursor / Page.prev_cursor).
+        """
+        return self.repo.get_page(
+            page_size=page_size, after=after, before=before, sort=sort,
+            commercial_id=commercial_id, statut=False if unsigned else None,
+            unpaid=unpaid, profile=profile)
+
+    def get_contrat_by_id(self, contrat_id: int, profile=None):
         """
         Retrieve a contract by its identifier.
         """
-        return self.repo.get_by_id(contrat_id)
+        return self.repo.get_by_id(contrat_id, profile=profile)
+
+    def get_contrats_by_ids(self, contrat_ids, profile=None):
+        """
+        Retrieve several contracts in batched queries, in the order of the ids.
+        Ids that do not exist or are out of scope are left out.
+        """
+        return self.repo.get_many(contrat_ids, profile=profile)
 
     def update_contrat(self, contrat: Contrat, **fields):
         """
@@ -89,11 +118,13 @@ class ContratService:
                 setattr(contrat, attr, value)
         self.repo.update(contrat)
         # Détection de la signature du contrat
-        if old_statut is False and contrat.staut is True:
-            sentry_sdk.capture_message(
-                f"[CONTRAT_SIGNE] id={contrat.id}, client_id={contrat.client_id}, commercial_id={contrat.commercial_id}",
-                level="info",
-            )
+        if old_statut is False and contrat.statut is True:
+            message = (
+                f"[CONTRAT_SIGNE] id={contrat.id}, client_id={contrat.client_id}, "
+                f"commercial_id={contrat.commercial_id}")
+            # sent once committed (at the end of an open unit of work)
+            on_commit(self.repo.session,
+                      lambda: capture_message(message, level="info"))
 
     def delete_contrat(self, contrat: Contrat):
         """
@@ -101,14 +132,20 @@ class ContratService:
         """
         self.repo.delete(contrat)
 
-    def get_unsigned_contrats(self):
+    def get_signed_contrats(self, profile=None):
+        """
+        Get all signed contrats.
+        """
+        return self.repo.get_by_staut(True, profile=profile)
+
+    def get_unsigned_contrats(self, profile=None):
         """
         Get all contrats that are not signed.
         """
-        return self.repo.get_by_staut(False)
+        return self.repo.get_by_staut(False, profile=profile)
 
-    def get_unpaid_contrats(self):
+    def get_unpaid_contrats(self, profile=None):
         """
         Get all contrats where montant_restant > 0.
         """
-        return self.repo.get_unpaid()
+        return self.repo.get_unpaid(profile=profile)
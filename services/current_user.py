@@ -0,0 +1,70 @@
+"""
+Resolution of the connected user from the JWT payload.
+
+The token is signed and already carries the user id and role, so the
+user is looked up by primary key and the result is kept in a small
+per-process cache. Snapshots are plain tuples, detached from any
+session, so they can be shared between sessions safely.
+"""
+from collections import namedtuple
+import os
+import threading
+import time
+
+from models.utilisateur import Utilisateur
+
+# Seconds a snapshot stays valid; bounds staleness across processes
+CACHE_TTL = float(os.getenv("EPIC_USER_CACHE_TTL", "300"))
+# Snapshots kept at most, the oldest ones are evicted first
+CACHE_SIZE = max(1, int(os.getenv("EPIC_USER_CACHE_SIZE", "1000")))
+
+UserSnapshot = namedtuple("UserSnapshot", ["id", "nom", "email", "role"])
+
+# user id -> (expiry, snapshot), in insertion order: with a fixed TTL the
+# first entries are also the first to expire
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_current_user(session, payload):
+    """
+    Return a snapshot of the user identified by the JWT payload.
+
+    :param session: SQLAlchemy session used on a cache miss.
+    :param payload: decoded JWT payload (must contain "id").
+    :return: UserSnapshot, or None if the user no longer exists.
+    """
+    user_id = payload["id"]
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    user = session.get(Utilisateur, user_id)
+    if user is None:
+        invalidate_user(user_id)
+        return None
+
+    snapshot = UserSnapshot(user.id, user.nom, user.email, user.role)
+    with _lock:
+        _cache.pop(user_id, None)
+        # drop the expired entries, then the oldest ones above CACHE_SIZE
+        while _cache:
+            oldest = next(iter(_cache))
+            if len(_cache) < CACHE_SIZE and _cache[oldest][0] > now:
+                break
+            del _cache[oldest]
+        _cache[user_id] = (now + CACHE_TTL, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id=None):
+    """
+    Drop the cached snapshot of a user, or of every user if user_id is None.
+    """
+    with _lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(user_id, None)
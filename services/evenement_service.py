@@ -1,17 +1,20 @@
 from models.evenement import Evenement
 from repositories.evenement_repository import EvenementRepository
+from utils.sentry_config import traced
 
 
+@traced("service")
 class EvenementService:
     """
     Service layer responsible for business logic related to events (Evenements).
     """
 
-    def __init__(self, session):
+    def __init__(self, session, payload=None):
         """
-        Initialize the event service with a database session.
+        Initialize the event service with a database session and the JWT
+        payload scoping its reads (None = unscoped).
         """
-        self.repo = EvenementRepository(session)
+        self.repo = EvenementRepository(session, payload)
 
     def create_evenement(
             self,
@@ -43,23 +46,64 @@ class EvenementService:
         self.repo.save(evenement)
         return evenement
 
-    def get_all_evenements(self):
+    def get_all_evenements(self, profile=None):
         """
         Retrieve all events from the database.
+
+        :param profile: optional loading profile ("list", "detail").
         """
-        return self.repo.get_all()
+        return self.repo.get_all(profile=profile)
 
-    def get_evenements_by_support_id(self, support_id: int):
+    def get_evenements_by_support_id(self, support_id: int, profile=None):
         """
         Retrieve all events assigned to a specific support user.
         """
-        return self.repo.get_by_support_id(support_id)
+        return self.repo.get_by_support_id(support_id, profile=profile)
+
+    def get_evenements_by_commercial_id(self, commercial_id: int, date_from=None,
+                                        date_to=None, unassigned_only=False,
+                                        profile=None):
+        """
+        Retrieve the events linked to the contracts of a commercial user.
+
+        Parameters
+            commercial_id: int
+                The ID of the commercial owning the contracts.
+            date_from, date_to: datetime or None
+                Optional inclusive bounds on the event start date.
+            unassigned_only: bool
+                Only return events that have no support assigned yet.
+        """
+        return self.repo.get_by_commercial_id(
+            commercial_id, date_from=date_from, date_to=date_to,
+            unassigned_only=unassigned_only, profile=profile)
 
-    def get_evenement_by_id(self, evenement_id: int):
+    def get_evenements_page(self, page_size: int = 20, after=None, before=None,
+                            sort="id", support_id: int = None,
+                            commercial_id: int = None, date_from=None,
+                            date_to=None, unassigned_only=False, profile=None):
+        """
+        Retrieve one page of events, optionally restricted to a support user
+        or to the contracts of a commercial user.
+        """
+        return self.repo.get_page(
+            page_size=page_size, after=after, before=before, sort=sort,
+            support_id=support_id, commercial_id=commercial_id,
+            date_from=date_from, date_to=date_to,
+            unassigned_only=unassigned_only, profile=profile)
+
+    def get_evenement_by_id(self, evenement_id: int, profile=None):
         """
         Retrieve an event by its identifier.
         """
-        return self.repo.get_by_id(evenement_id)
+        return self.repo.get_by_id(evenement_id, profile=profile)
+
+    def get_evenements_by_ids(self, evenement_ids, profile=None):
+        """
+        Retrieve several events in batched queries, in the order of the ids.
+        Ids that do not exist or are out of scope are left out.
+        """
+        return self.repo.get_many(evenement_ids, profile=profile)
 
     def update_evenement(self, evenement, **fields):
         """
@@ -0,0 +1,145 @@
+import sys
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric
+
+from models.client import Client
+from models.contrat import Contrat
+from models.evenement import Evenement
+from repositories.client_repository import ClientRepository
+from repositories.contrat_repository import ContratRepository
+from repositories.evenement_repository import EvenementRepository
+from utils.output_writers import write_parquet, write_rows
+from utils.sentry_config import traced
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# entity name -> (model, repository class)
+ENTITIES = {
+    "clients": (Client, ClientRepository),
+    "contrats": (Contrat, ContratRepository),
+    "evenements": (Evenement, EvenementRepository),
+}
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+@traced("service")
+class ExportService:
+    """
+    Streaming exports of clients, contracts and events.
+
+    Rows come from BaseRepository.stream_rows (server-side cursor, no ORM
+    entity) and are written one by one, or one record batch at a time for
+    Parquet, so an export uses the same memory for ten rows or ten
+    million. Reads are scoped by the JWT payload like every listing.
+    """
+
+    def __init__(self, session, payload=None):
+        """
+        Initialize the export service.
+
+        :param session: SQLALchemy session used for the reads.
+        :param payload: JWT payload scoping the exported rows (None = unscoped).
+        """
+        self.session = session
+        self.payload = payload
+
+    def repository(self, entity):
+        """
+        Return the scoped repository of an entity name ("clients", ...).
+        """
+        try:
+            _, repo_class = ENTITIES[entity]
+        except KeyError:
+            raise ValueError(f"Entité inconnue : {entity}")
+        return repo_class(self.session, self.payload)
+
+    def columns(self, entity):
+        """
+        Return the names of the columns an entity can export.
+        """
+        return list(self.repository(entity).export_columns)
+
+    def export(self, entity, fmt, output=None, columns=None, date_from=None,
+               date_to=None, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Export the rows of an entity visible to the current user.
+
+        Parameters
+        ----------
+        entity : str
+            "clients", "contrats" or "evenements".
+        fmt : str
+            One of EXPORT_FORMATS.
+        output : str, file-like or None
+            Destination: a path, an open text stream, or None for stdout.
+            Parquet needs a path.
+        columns : list of str or None
+            Columns to export, all of them by default.
+        date_from, date_to : datetime or None
+            Inclusive bounds on the creation date (start date for events).
+        batch_size : int
+            Rows fetched per round trip, and rows per Parquet record batch.
+
+        Returns
+        -------
+        int
+            Number of exported rows.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format d'export inconnu : {fmt}")
+        repo = self.repository(entity)
+        names = list(columns or repo.export_columns)
+        result = repo.stream_rows(
+            names, date_from=date_from, date_to=date_to, batch_size=batch_size)
+        # fail on unknown columns before the destination file is created
+        first = next(result, None)
+
+        def rows():
+            if first is None:
+                return
+            yield first._asdict()
+            for row in result:
+                yield row._asdict()
+
+        if fmt == "parquet":
+            if output is None or not isinstance(output, str):
+                raise ValueError("L'export Parquet nécessite un fichier de sortie.")
+            schema = self._arrow_schema(repo, names)
+            return write_parquet(rows(), names, output, schema, batch_size)
+
+        if isinstance(output, str):
+            newline = "" if fmt == "csv" else None
+            with open(output, "w", encoding="utf-8", newline=newline) as f:
+                return write_rows(rows(), names, fmt, stream=f)
+        return write_rows(rows(), names, fmt, stream=output or sys.stdout)
+
+    @staticmethod
+    def _arrow_schema(repo, names):
+        """
+        Build the Parquet schema from the SQL types of the exported columns.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError(
+                "L'export Parquet nécessite pyarrow (pip install pyarrow).")
+
+        fields = []
+        for name in names:
+            sql_type = repo.export_columns[name].type
+            if isinstance(sql_type, Boolean):
+                arrow_type = pa.bool_()
+            elif isinstance(sql_type, Integer):
+                arrow_type = pa.int64()
+            elif isinstance(sql_type, Numeric):
+                arrow_type = pa.decimal128(
+                    sql_type.precision or 18, sql_type.scale or 0)
+            elif isinstance(sql_type, DateTime):
+                arrow_type = pa.timestamp("us")
+            elif isinstance(sql_type, Date):
+                arrow_type = pa.date32()
+            else:
+                arrow_type = pa.string()
+            fields.append(pa.field(name, arrow_type))
+        return pa.schema(fields)
@@ -0,0 +1,58 @@
+from repositories.report_repository import BREAKDOWNS, ReportRepository
+from utils.sentry_config import traced
+
+
+@traced("service")
+class ReportService:
+    """
+    Management reports: revenue, outstanding balances and signature rates
+    per commercial, computed with SQL aggregates.
+    """
+
+    def __init__(self, session, payload=None):
+        """
+        Initialize the report service.
+
+        :param session: SQLALchemy session used for the queries.
+        :param payload: JWT payload scoping the reported contracts
+            (None = unscoped).
+        """
+        self.repo = ReportRepository(session, payload)
+
+    def commercial_report(self, breakdown=None, date_from=None, date_to=None,
+                          commercial_id=None):
+        """
+        Totals per commercial, optionally split by month or by entreprise.
+
+        Parameters
+        ----------
+        breakdown : str or None
+            None, "month" or "entreprise".
+        date_from, date_to : date or None
+            Inclusive bounds on the contract creation date.
+        commercial_id : int or None
+            Restrict the report to one commercial.
+
+        Returns
+        -------
+        list of dict
+            One dict per group with the aggregates of the query plus the
+            derived taux_signature (signed / contracts) and
+            evenements_par_contrat ratios.
+        """
+        if breakdown is not None and breakdown not in BREAKDOWNS:
+            raise ValueError(f"Ventilation inconnue : {breakdown}")
+
+        rows = [row._asdict() for row in self.repo.commercial_totals(
+            breakdown=breakdown, date_from=date_from, date_to=date_to,
+            commercial_id=commercial_id)]
+
+        for values in rows:
+            contrats = values["contrats"]
+            for name in ("signes", "non_signes", "evenements"):
+                values[name] = int(values[name] or 0)
+            values["taux_signature"] = (
+                round(values["signes"] / contrats, 4) if contrats else 0.0)
+            values["evenements_par_contrat"] = (
+                round(values["evenements"] / contrats, 2) if contrats else 0.0)
+        return rows
@@ -0,0 +1,101 @@
+"""
+Unit of work: group several service writes into a single transaction.
+
+    with unit_of_work(session):
+        contrat_service.update_contrat(contrat, statut=True)
+        evenement_service.create_evenement(...)
+
+Inside the block, repositories only flush their changes (so generated ids
+are available right away). The transaction is committed once when the
+block exits, or rolled back as a whole if it raises, so a failing step
+never leaves the previous ones half written. Nested blocks join the
+outermost one. Side effects that must only happen once the data is
+committed (Sentry business events) are registered with on_commit().
+"""
+from contextlib import asynccontextmanager, contextmanager
+
+from repositories.base_repository import UNIT_OF_WORK_KEY
+
+# session.info key of the callbacks to run after the outermost commit
+CALLBACKS_KEY = "unit_of_work_callbacks"
+
+
+@contextmanager
+def unit_of_work(session):
+    """
+    Run the enclosed writes in one transaction on the given session.
+
+    :param session: SQLALchemy session shared by the services involved.
+    :return: context manager yielding the session.
+    """
+    depth = session.info.get(UNIT_OF_WORK_KEY, 0)
+    session.info[UNIT_OF_WORK_KEY] = depth + 1
+    callbacks = []
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+            callbacks = session.info.get(CALLBACKS_KEY, [])
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        if depth == 0:
+            session.info.pop(UNIT_OF_WORK_KEY, None)
+            session.info.pop(CALLBACKS_KEY, None)
+        else:
+            session.info[UNIT_OF_WORK_KEY] = depth
+    for callback in callbacks:
+        callback()
+
+
+@asynccontextmanager
+async def async_unit_of_work(session):
+    """
+    unit_of_work for an AsyncSession: the async services flush inside the
+    block and the transaction is committed once when it exits.
+
+    :param session: sqlalchemy.ext.asyncio.AsyncSession.
+    :return: async context manager yielding the session.
+    """
+    info = session.sync_session.info
+    depth = info.get(UNIT_OF_WORK_KEY, 0)
+    info[UNIT_OF_WORK_KEY] = depth + 1
+    callbacks = []
+    try:
+        yield session
+        if depth == 0:
+            await session.commit()
+            callbacks = info.get(CALLBACKS_KEY, [])
+    except BaseException:
+        if depth == 0:
+            await session.rollback()
+        raise
+    finally:
+        if depth == 0:
+            info.pop(UNIT_OF_WORK_KEY, None)
+            info.pop(CALLBACKS_KEY, None)
+        else:
+            info[UNIT_OF_WORK_KEY] = depth
+    for callback in callbacks:
+        callback()
+
+
+def in_unit_of_work(session):
+    """
+    Tell whether a unit of work is open on the session.
+    """
+    return bool(session.info.get(UNIT_OF_WORK_KEY))
+
+
+def on_commit(session, callback):
+    """
+    Run callback() once the writes are committed: at the end of the open
+    unit of work, or right away when there is none (the repositories have
+    already committed). Discarded if the unit of work rolls back.
+    """
+    if in_unit_of_work(session):
+        session.info.setdefault(CALLBACKS_KEY, []).append(callback)
+    else:
+        callback()
@@ -0,0 +1,202 @@
+import csv
+import time
+from collections import Counter
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.utilisateur import ROLES
+from repositories.utilisateur_repository import UtilisateurRepository
+from services.client_import_service import EMAIL_RE, ImportReport
+from services.unit_of_work import unit_of_work
+from utils.security import bcrypt_rounds, hash_many, hashing_processes
+from utils.sentry_config import capture_message, traced
+
+# Maximum lengths of the user columns (see models/utilisateur.py)
+MAX_LENGTHS = {
+    "nom": 50,
+    "email": 100,
+}
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@traced("service")
+class UserImportService:
+    """
+    Bulk provisioning of users from a CSV file.
+
+    Expected columns: nom, email, role and mot_de_passe (plain text, only
+    kept in memory until it is hashed). Rows are validated, the passwords
+    of each batch are hashed across a process pool (one process per core,
+    bcrypt being CPU bound), then the batch is inserted with one
+    executemany in one transaction. A single aggregated audit message is
+    sent at the end instead of one [USER_CREATED] per account.
+    """
+
+    def __init__(self, session, payload=None):
+        """
+        Initialize the provisioning service.
+
+        :param session: SQLALchemy session used for the inserts.
+        :param payload: JWT payload of the importing user (recorded in the
+            audit message).
+        """
+        self.payload = payload
+        self.session = session
+        self.repo = UtilisateurRepository(session, payload)
+        # header of the last file read, used by the rejected-rows report
+        self.fieldnames = []
+
+    @property
+    def report_fieldnames(self):
+        """
+        Columns copied to the rejected-rows report: never the passwords.
+        """
+        return [f for f in self.fieldnames if f != "mot_de_passe"]
+
+    def read_rows(self, stream, delimiter=","):
+        """
+        Yield (line number, row dict) for each data line of a CSV stream.
+        """
+        reader = csv.DictReader(stream, delimiter=delimiter)
+        self.fieldnames = reader.fieldnames or []
+        for row in reader:
+            yield reader.line_num, row
+
+    def validate_rows(self, rows, report):
+        """
+        Yield (line, row, values) for each valid row and record the others
+        as rejected in the report. Emails repeated in the file are rejected
+        after their first occurrence.
+        """
+        seen = set()
+        for line, row in rows:
+            report.read += 1
+            values = {
+                "nom": (row.get("nom") or "").strip(),
+                "email": (row.get("email") or "").strip(),
+                "role": (row.get("role") or "").strip().lower(),
+            }
+            password = row.get("mot_de_passe") or ""
+
+            if not values["nom"]:
+                report.reject(line, "nom manquant", row)
+                continue
+            if not EMAIL_RE.match(values["email"]):
+                report.reject(line, "email invalide", row)
+                continue
+            too_long = [k for k, limit in MAX_LENGTHS.items()
+                        if len(values[k]) > limit]
+            if too_long:
+                report.reject(
+                    line, f"valeur trop longue : {', '.join(too_long)}", row)
+                continue
+            if values["role"] not in ROLES:
+                report.reject(line, "rôle invalide", row)
+                continue
+            if not password:
+                report.reject(line, "mot de passe vide", row)
+                continue
+            key = values["email"].lower()
+            if key in seen:
+                report.reject(line, "email en double dans le fichier", row)
+                continue
+            seen.add(key)
+
+            values["mot_de_passe"] = password
+            yield line, row, values
+
+    def import_csv(self, stream, batch_size=DEFAULT_BATCH_SIZE, dry_run=False,
+                   delimiter=",", workers=None, on_batch=None):
+        """
+        Create the users of a CSV stream.
+
+        Parameters
+        ----------
+        stream : file-like
+            Opened CSV file (text mode).
+        batch_size : int
+            Number of users hashed together and inserted per transaction.
+        dry_run : bool
+            Only validate the file: nothing is hashed nor written.
+        delimiter : str
+            CSV field separator.
+        workers : int or None
+            Hashing processes, one per core by default.
+        on_batch : callable or None
+            on_batch(report) called after each batch, for progress output.
+
+        Returns
+        -------
+        ImportReport
+            Counters and rejected rows. Emails already in the database are
+            rejected; when a batch fails in the database, its rows are
+            reported as rejected and the import goes on.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size doit être positif")
+        # fail on a bad BCRYPT_ROUNDS before reading the file
+        rounds = bcrypt_rounds()
+        report = ImportReport(dry_run=dry_run)
+        roles = Counter()
+        start = time.perf_counter()
+
+        valid = self.validate_rows(self.read_rows(stream, delimiter), report)
+        with hashing_processes(workers) as pool:
+            batch = []
+            for item in valid:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    self._flush(batch, report, roles, dry_run, rounds, pool)
+                    batch = []
+                    report.elapsed = time.perf_counter() - start
+                    if on_batch:
+                        on_batch(report)
+            if batch:
+                self._flush(batch, report, roles, dry_run, rounds, pool)
+        report.elapsed = time.perf_counter() - start
+        if on_batch and batch:
+            on_batch(report)
+
+        if not dry_run and report.inserted:
+            by = self.payload["id"] if self.payload else None
+            capture_message(
+                f"[USERS_IMPORTED] by={by}, inserted={report.inserted}, "
+                f"rejected={len(report.rejected)}, roles={dict(roles)}, "
+                f"seconds={report.elapsed:.1f}",
+                level="info",
+            )
+        return report
+
+    def _flush(self, batch, report, roles, dry_run, rounds, pool):
+        report.batches += 1
+        taken = self.repo.existing_emails(
+            values["email"] for _, _, values in batch)
+        fresh = []
+        for line, row, values in batch:
+            if values["email"].lower() in taken:
+                report.reject(line, "email déjà utilisé", row)
+            else:
+                fresh.append((line, row, values))
+        if dry_run:
+            report.inserted += len(fresh)
+            return
+        if not fresh:
+            return
+
+        hashes = hash_many(
+            (values["mot_de_passe"] for _, _, values in fresh),
+            rounds=rounds, executor=pool)
+        rows = [dict(values, mot_de_passe=hashed)
+                for (_, _, values), hashed in zip(fresh, hashes)]
+        try:
+            # one transaction per batch, rolled back as a whole on error
+            with unit_of_work(self.session):
+                self.repo.insert_many(rows)
+        except SQLAlchemyError as e:
+            reason = f"erreur base de données : {e.__class__.__name__}"
+            for line, row, _ in fresh:
+                report.reject(line, reason, row)
+            return
+        report.inserted += len(fresh)
+        roles.update(values["role"] for values in rows)
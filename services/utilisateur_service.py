@@ -1,9 +1,14 @@
+from sqlalchemy.exc import SQLAlchemyError
+
 from models.utilisateur import Utilisateur
-from utils.security import hash_password, verify_password
+from utils.security import hash_password, needs_rehash, verify_password
 from repositories.utilisateur_repository import UtilisateurRepository
-import sentry_sdk
+from services.current_user import invalidate_user
+from services.unit_of_work import on_commit
+from utils.sentry_config import capture_message, traced
 
 
+@traced("service")
 class UtilisateurService:
     """
     Service layer responsible for user-related business logic.
@@ -13,14 +18,16 @@ class UtilisateurService:
 
     """
 
-    def __init__(self, session):
+    def __init__(self, session, payload=None):
         """
         Intializes the service with a database session.
 
         :param session: SQLALchemy session used to access the repository.
+        :param payload: JWT payload scoping the reads to the user's role
+            (None = unscoped, e.g. for login).
 
         """
-        self.repo = UtilisateurRepository(session)
+        self.repo = UtilisateurRepository(session, payload)
 
     def create_user(self, nom, email, password, role):
         """
@@ -37,22 +44,31 @@ class UtilisateurService:
         :rtype: Utilisateur
 
         """
-        hashed = hash_password(password)
+        return self._create(nom, email, hash_password(password), role)
+
+    def _create(self, nom, email, hashed, role):
+        """
+        Save a new user whose password is already hashed (shared with the
+        async service, which hashes off the event loop).
+        """
         utilisateur = Utilisateur(
             nom=nom, email=email, mot_de_passe=hashed, role=role)
         self.repo.save(utilisateur)
 
-    # Journalisation Sentry
-        sentry_sdk.capture_message(
-            f"[USER_CREATED] id={utilisateur.id}, email={utilisateur.email}, role={utilisateur.role}",
-            level="info"
-        )
+    # Journalisation Sentry (une fois l'écriture validée)
+        message = (
+            f"[USER_CREATED] id={utilisateur.id}, email={utilisateur.email}, "
+            f"role={utilisateur.role}")
+        on_commit(self.repo.session,
+                  lambda: capture_message(message, level="info"))
         return utilisateur
 
     def login(self, email, password):
         """
         Authenticates a user using email and password.
         The provided password is verified against the stored hashed password.
+        A hash made with an outdated cost factor (BCRYPT_ROUNDS) is replaced
+        by a fresh one while the plain password is at hand.
 
         :param email: User's email address.
         :type email: str
@@ -63,9 +79,24 @@ class UtilisateurService:
         """
         user = self.repo.find_by_email(email)
         if user and verify_password(password, user.mot_de_passe):
+            if needs_rehash(user.mot_de_passe):
+                self._store_hash(user, hash_password(password))
             return user
         return None
 
+    def _store_hash(self, user, hashed):
+        """
+        Store a hash of the password at the current cost factor.
+
+        Best effort: the login succeeds even if the update cannot be
+        written, the upgrade is then retried on the next login.
+        """
+        user.mot_de_passe = hashed
+        try:
+            self.repo.update(user)
+        except SQLAlchemyError:
+            self.repo.session.rollback()
+
     def list_users(self):
         """
         Get all users via repository
@@ -74,12 +105,34 @@ class UtilisateurService:
         """
         return self.repo.get_all()
 
+    def list_users_page(self, page_size: int = 20, after=None, before=None,
+                        sort="id", role: str = None):
+        """
+        Get one page of users via repository
+        :return: Page of utilisateurs
+
+        """
+        return self.repo.get_page(
+            page_size=page_size, after=after, before=before, sort=sort, role=role)
+
+    def get_users_by_role(self, role: str):
+        """
+        Get all users having the given role.
+        """
+        return self.repo.get_by_role(role)
+
     def get_user_by_id(self, user_id: int):
         """
         Retrieve a user by its identifier.
         """
         return self.repo.get_by_id(user_id)
 
+    def get_users_by_ids(self, user_ids):
+        """
+        Retrieve several users in batched queries, in the order of the ids.
+        """
+        return self.repo.get_many(user_ids)
+
     def update_user(self, utilisateur, nom=None, email=None,
                     role=None, mot_de_passe=None):
         """
@@ -87,6 +140,13 @@ class UtilisateurService:
 
         mot_de_passe, if provided, will be re-hashed.
         """
+        hashed = hash_password(mot_de_passe) if mot_de_passe is not None else None
+        self._update(utilisateur, nom, email, role, hashed)
+
+    def _update(self, utilisateur, nom, email, role, hashed):
+        """
+        Apply an update whose new password, if any, is already hashed.
+        """
         old_data = {
             "nom": utilisateur.nom,
             "email": utilisateur.email,
@@ -98,20 +158,25 @@ class UtilisateurService:
             utilisateur.email = email
         if role is not None:
             utilisateur.role = role
-        if mot_de_passe is not None:
-            utilisateur.mot_de_passe = hash_password(mot_de_passe)
+        if hashed is not None:
+            utilisateur.mot_de_passe = hashed
 
         self.repo.update(utilisateur)
-        # Sentry Journalisation
-        sentry_sdk.capture_message(
+        # the cached snapshot of this user is now stale
+        invalidate_user(utilisateur.id)
+        # Sentry Journalisation (once committed)
+        message = (
             f"[USER_UPDATED] id={utilisateur.id},"
             f"old={old_data},"
-            f"new={{'nom': '{utilisateur.nom}', 'email': '{utilisateur.email}', 'role':'{utilisateur.role}'}}",
-            level="info"
+            f"new={{'nom': '{utilisateur.nom}', 'email': '{utilisateur.email}', 'role':'{utilisateur.role}'}}"
         )
+        on_commit(self.repo.session,
+                  lambda: capture_message(message, level="info"))
 
     def delete_user(self, utilisateur):
         """
         Delete a user from the database.
         """
+        user_id = utilisateur.id
         self.repo.delete(utilisateur)
+        invalidate_user(user_id)
@@ -0,0 +1,253 @@
+"""
+Shared fixtures: one database per test process, one rolled back
+transaction per test.
+
+The schema is built once per session by the migrations, on in-memory
+SQLite by default. EPIC_TEST_DATABASE_URL selects another database
+(e.g. sqlite:////tmp/epic-{worker}.db); {worker} is replaced by the
+pytest-xdist worker id, so `python -m pytest -n auto` gives each worker
+its own database.
+
+The `session` fixture opens a connection, begins a transaction and binds
+models.base.Session to it: every session created by the code under test
+(services, CLI functions) joins that transaction through a SAVEPOINT, so
+their commits and rollbacks work as usual and everything is rolled back
+at the end of the test. The HTTP server and the async services open
+connections of their own: their tests use `database_file`, a SQLite file
+built by the same migrations and seeded with the same data.
+"""
+import builtins
+from datetime import date, datetime, timedelta
+import os
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.pool import StaticPool
+
+# Fast hashes for the users created by the tests (cost 12 by default)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from models import base  # noqa: E402
+from models.base import Session, set_engine  # noqa: E402
+from models.client import Client  # noqa: E402
+from models.contrat import Contrat  # noqa: E402
+from models.evenement import Evenement  # noqa: E402
+from models.utilisateur import Utilisateur  # noqa: E402
+from services.client_service import ClientService  # noqa: E402
+from services.contrat_service import ContratService  # noqa: E402
+from services.current_user import invalidate_user  # noqa: E402
+from services.evenement_service import EvenementService  # noqa: E402
+from services.utilisateur_service import UtilisateurService  # noqa: E402
+from utils.jwt_manager import (  # noqa: E402
+    TOKEN_FILE, generate_token, invalidate_token_cache,
+)
+from utils.security import hash_password  # noqa: E402
+
+PASSWORD = "pw"
+
+
+def _test_engine(worker):
+    url = os.getenv("EPIC_TEST_DATABASE_URL")
+    if url:
+        engine = create_engine(url.replace("{worker}", worker))
+        if engine.dialect.name != "sqlite":
+            return engine
+    else:
+        # one connection shared by the whole process: the in-memory
+        # database lives as long as it does
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    # pysqlite starts its transactions lazily, which breaks SAVEPOINT:
+    # let SQLAlchemy emit BEGIN itself
+    @event.listens_for(engine, "connect")
+    def _autocommit_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+@pytest.fixture(scope="session")
+def engine(worker_id):
+    from migrations import upgrade
+
+    previous = base._engine
+    engine = _test_engine(worker_id)
+    upgrade(engine)
+    set_engine(engine)
+    yield engine
+    engine.dispose()
+    base._engine = previous
+    Session.configure(bind=previous)
+
+
+@pytest.fixture(scope="session")
+def worker_id(request):
+    # provided by pytest-xdist when installed; "master" without it
+    return getattr(request.config, "workerinput", {}).get("workerid", "master")
+
+
+@pytest.fixture
+def session(engine):
+    """
+    Session of the test, inside a transaction rolled back at teardown.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    Session.configure(bind=connection, join_transaction_mode="create_savepoint")
+    invalidate_user()
+    session = Session()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+    Session.kw.pop("join_transaction_mode", None)
+    Session.configure(bind=engine)
+    invalidate_user()
+
+
+def seed(session):
+    """
+    Fill an empty database with a small CRM: one user per role plus a
+    second commercial, 12 clients (half per commercial), a signed and an
+    unsigned contract per client, and an event per signed contract (one
+    in three without support).
+
+    Returns a dict of the ids: users by name ("Gestion", "C1", "C2",
+    "S1") and the lists "clients", "contrats", "evenements".
+    """
+    hashed = hash_password(PASSWORD)
+    users = {}
+    for nom, role in (("Gestion", "gestion"), ("C1", "commercial"),
+                      ("C2", "commercial"), ("S1", "support")):
+        users[nom] = Utilisateur(nom=nom, email=f"{nom.lower()}@epic.fr",
+                                 mot_de_passe=hashed, role=role)
+    session.add_all(users.values())
+    clients, contrats, evenements = [], [], []
+    start = datetime(2025, 6, 1, 14)
+    for i in range(12):
+        commercial = users["C1"] if i % 2 else users["C2"]
+        client = Client(nom_complet=f"Client {i}", email=f"client{i}@x.fr",
+                        entreprise="ACME", date_creation=date(2025, 1, 1),
+                        commercial=commercial)
+        clients.append(client)
+        for signed in (True, False):
+            contrat = Contrat(client=client, commercial=commercial,
+                              montant_total=1000,
+                              montant_restant=500 * i % 1000,
+                              date_creation=date(2025, 2, 1), statut=signed)
+            contrats.append(contrat)
+            if signed:
+                evenements.append(Evenement(
+                    contrat=contrat, support=users["S1"] if i % 3 else None,
+                    date_debut=start + timedelta(days=i),
+                    date_fin=start + timedelta(days=i, hours=4),
+                    lieu="Paris", participants=50))
+    session.add_all(clients + contrats + evenements)
+    session.commit()
+    ids = {nom: user.id for nom, user in users.items()}
+    ids["clients"] = [c.id for c in clients]
+    ids["contrats"] = [c.id for c in contrats]
+    ids["evenements"] = [e.id for e in evenements]
+    session.expunge_all()
+    return ids
+
+
+@pytest.fixture
+def data(session):
+    """
+    The CRM of seed() in the test transaction; returns its ids.
+    """
+    return seed(session)
+
+
+@pytest.fixture
+def database_file(tmp_path):
+    """
+    A SQLite file at the latest migration holding the CRM of seed(), for
+    the code that opens its own connections from several threads or
+    through an asyncio driver (the HTTP server, the async services),
+    which cannot join the shared test connection and its transaction.
+
+    Returns (url, ids).
+    """
+    from migrations import upgrade
+
+    url = f"sqlite:///{tmp_path / 'epic.db'}"
+    engine = create_engine(url)
+    upgrade(engine)
+    with OrmSession(engine) as session:
+        ids = seed(session)
+    engine.dispose()
+    return url, ids
+
+
+@pytest.fixture
+def payload(data):
+    """
+    payload("C1") returns the JWT payload of a seeded user.
+    """
+    roles = {"Gestion": "gestion", "C1": "commercial", "C2": "commercial",
+             "S1": "support"}
+
+    def payload(nom):
+        return {"id": data[nom], "email": f"{nom.lower()}@epic.fr",
+                "role": roles[nom]}
+    return payload
+
+
+@pytest.fixture
+def services(session):
+    """
+    services(payload=None) returns the four services on the test session,
+    scoped to payload.
+    """
+    class Services:
+        def __init__(self, payload):
+            self.clients = ClientService(session, payload)
+            self.contrats = ContratService(session, payload)
+            self.evenements = EvenementService(session, payload)
+            self.users = UtilisateurService(session, payload)
+
+    return lambda payload=None: Services(payload)
+
+
+@pytest.fixture
+def login(payload, tmp_path, monkeypatch):
+    """
+    login("C1") writes the .token file of a seeded user in a temporary
+    working directory, as `auth login` does; returns its payload.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def login(nom):
+        user = payload(nom)
+        with open(TOKEN_FILE, "w") as f:
+            f.write(generate_token(user["id"], user["email"], user["role"]))
+        invalidate_token_cache()
+        invalidate_user()
+        return user
+    yield login
+    invalidate_token_cache()
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    """
+    answers("1", "", "o") scripts the replies to the next input() calls;
+    an unexpected prompt fails the test.
+    """
+    def script(*values):
+        replies = iter(values)
+
+        def reply(prompt=""):
+            try:
+                return next(replies)
+            except StopIteration:
+                pytest.fail(f"Question inattendue : {prompt!r}")
+        monkeypatch.setattr(builtins, "input", reply)
+    return script
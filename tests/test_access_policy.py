@@ -0,0 +1,117 @@
+"""
+Role-based access rules (policies/access_policy.py): the SQL scoping of
+every role and entity, and permits() checked against it.
+
+Run from the project root: python -m pytest tests/test_access_policy.py
+"""
+import pytest
+from sqlalchemy import select
+
+from models.client import Client
+from models.contrat import Contrat
+from models.evenement import Evenement
+from models.utilisateur import Utilisateur
+from policies.access_policy import (
+    AccessDenied, allows, permits, predicate, scoped_select,
+)
+
+MODELS = (Utilisateur, Client, Contrat, Evenement)
+ROLES = ("Gestion", "C1", "C2", "S1")
+
+
+def visible(session, payload, model):
+    return set(session.scalars(
+        scoped_select(payload, model).with_only_columns(model.id)))
+
+
+def everything(session, model):
+    return session.scalars(select(model)).all()
+
+
+def expected(session, data, nom, model):
+    """
+    The scope of a seeded user, computed in Python from the loaded rows.
+    """
+    user_id = data[nom]
+    rows = everything(session, model)
+    if nom == "Gestion":
+        return {row.id for row in rows}
+    if model is Utilisateur:
+        return {user_id}
+    if nom == "S1":
+        return ({row.id for row in rows if row.support_id == user_id}
+                if model is Evenement else None)
+    if model is Evenement:
+        return {row.id for row in rows
+                if row.contrat.commercial_id == user_id}
+    return {row.id for row in rows if row.commercial_id == user_id}
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda m: m.__name__)
+@pytest.mark.parametrize("nom", ROLES)
+def test_sql_scope_of_each_role(data, session, payload, nom, model):
+    scope = expected(session, data, nom, model)
+    if scope is None:
+        assert not allows(payload(nom), model)
+        with pytest.raises(AccessDenied):
+            scoped_select(payload(nom), model)
+        return
+    assert allows(payload(nom), model)
+    assert visible(session, payload(nom), model) == scope
+    # the fixture gives every role something to see
+    assert scope
+
+
+@pytest.mark.parametrize("model", (Client, Contrat))
+def test_support_cannot_read_clients_nor_contracts(data, payload, model):
+    with pytest.raises(AccessDenied):
+        predicate(payload("S1"), model)
+    assert not allows(payload("S1"), model)
+    assert not allows({"id": 1, "role": "inconnu"}, Evenement)
+
+
+def test_no_payload_means_unscoped(data, session):
+    for model in MODELS:
+        assert visible(session, None, model) == {
+            row.id for row in everything(session, model)}
+    assert permits(None, everything(session, Client)[0]) is True
+    # gestion's statements carry no WHERE clause at all
+    assert scoped_select({"id": 1, "role": "gestion"},
+                         Client).whereclause is None
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda m: m.__name__)
+@pytest.mark.parametrize("nom", ROLES)
+def test_permits_agrees_with_the_sql_scope(data, session, payload, nom,
+                                           model):
+    rows = everything(session, model)
+    if not allows(payload(nom), model):
+        assert {permits(payload(nom), row) for row in rows} == {False}
+        return
+    scope = visible(session, payload(nom), model)
+    decisions = {row.id: permits(payload(nom), row) for row in rows}
+    undecided = {ident for ident, allowed in decisions.items()
+                 if allowed is None}
+    if (nom, model) in (("C1", Evenement), ("C2", Evenement)):
+        # a commercial's events depend on the contract: always the database
+        assert undecided == set(decisions)
+    else:
+        assert not undecided
+    assert {ident for ident, allowed in decisions.items() if allowed} == (
+        scope - undecided)
+
+
+def test_permits_is_undecided_on_expired_or_detached_rows(
+        data, session, payload):
+    client = session.get(Client, data["clients"][1])
+    assert permits(payload("C1"), client) is True
+    assert permits(payload("C2"), client) is False
+
+    session.expire(client)
+    assert permits(payload("C1"), client) is None
+    # gestion needs no attribute at all
+    assert permits(payload("Gestion"), client) is True
+
+    session.refresh(client)
+    session.expunge(client)
+    assert permits(payload("C1"), client) is None
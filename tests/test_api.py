@@ -0,0 +1,190 @@
+"""
+HTTP API served on a free local port, against the seeded SQLite file of
+the `database_file` fixture: the server threads open their own
+connections, which cannot join the rolled back transaction of `session`.
+
+Run from the project root: python -m pytest tests/test_api.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.client import HTTPConnection
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+import pytest
+from sqlalchemy import create_engine
+
+from api.server import encode_cursor, make_server, parse_datetime
+from models import base
+from models.base import Session, set_engine
+from services.client_service import ClientService
+from services.current_user import invalidate_user
+
+
+@pytest.fixture
+def api(database_file):
+    url, _ = database_file
+    previous = base._engine
+    engine = create_engine(url)
+    set_engine(engine)
+    invalidate_user()
+
+    server = make_server("127.0.0.1", 0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+    engine.dispose()
+    invalidate_user()
+    base._engine = previous
+    Session.configure(bind=previous)
+
+
+def call(url, method="GET", body=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urlopen(Request(url, data, headers, method=method)) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+def login(api, email):
+    status, data = call(f"{api}/auth/login", "POST",
+                        {"email": email, "password": "pw"})
+    assert status == 200
+    return data["token"]
+
+
+def test_requests_need_a_valid_token(api):
+    assert call(f"{api}/clients")[0] == 401
+    assert call(f"{api}/clients", token="not-a-jwt")[0] == 401
+    status, _ = call(f"{api}/auth/login", "POST",
+                     {"email": "g@epic.fr", "password": "bad"})
+    assert status == 401
+
+
+def test_listing_is_paginated_and_scoped(api):
+    # the clients of C1 have an odd number
+    token = login(api, "c1@epic.fr")
+    status, page = call(f"{api}/clients?limit=4", token=token)
+    assert status == 200
+    assert [c["nom_complet"] for c in page["items"]] == [
+        "Client 1", "Client 3", "Client 5", "Client 7"]
+    assert page["prev"] is None
+
+    status, page = call(f"{api}/clients?limit=4&after={page['next']}",
+                        token=token)
+    assert [c["nom_complet"] for c in page["items"]] == [
+        "Client 9", "Client 11"]
+    assert page["next"] is None
+
+    status, page = call(f"{api}/clients?limit=4&before={page['prev']}",
+                        token=token)
+    assert [c["nom_complet"] for c in page["items"]] == [
+        "Client 1", "Client 3", "Client 5", "Client 7"]
+
+
+def test_roles_are_enforced(api, database_file):
+    _, ids = database_file
+    commercial = login(api, "c1@epic.fr")
+    assert call(f"{api}/users", token=commercial)[0] == 403
+    # a client of C2
+    assert call(f"{api}/clients/{ids['clients'][0]}", token=commercial)[0] == 404
+
+    status, client = call(f"{api}/clients", "POST",
+                          {"nom_complet": "Nouveau", "email": "n@x.fr"},
+                          token=commercial)
+    assert status == 201 and client["commercial"] == "C1"
+
+    gestion = login(api, "gestion@epic.fr")
+    status, contrat = call(f"{api}/contrats", "POST",
+                           {"client_id": client["id"], "montant_total": 100},
+                           token=gestion)
+    assert status == 201 and contrat["commercial_id"] == client["commercial_id"]
+    status, contrat = call(f"{api}/contrats/{contrat['id']}", "PATCH",
+                           {"statut": True}, token=commercial)
+    assert status == 200 and contrat["statut"] is True
+
+
+def test_concurrent_requests(api):
+    token = login(api, "gestion@epic.fr")
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(
+            lambda _: call(f"{api}/clients?limit=20", token=token), range(32)))
+    assert {status for status, _ in results} == {200}
+    assert all(len(page["items"]) == 12 for _, page in results)
+
+
+def test_date_alone_ends_the_day_when_it_is_an_upper_bound():
+    assert parse_datetime("to", "2025-06-30", end_of_day=True) == datetime(
+        2025, 6, 30, 23, 59, 59, 999999)
+    assert parse_datetime("to", "2025-06-30T14:00", end_of_day=True) == (
+        datetime(2025, 6, 30, 14))
+    assert parse_datetime("from", "2025-06-30") == datetime(2025, 6, 30)
+
+
+def test_event_listing_to_a_date_includes_that_day(api):
+    # the seeded events start at 14:00, one a day from 2025-06-01
+    token = login(api, "gestion@epic.fr")
+    status, page = call(f"{api}/evenements?to=2025-06-03", token=token)
+    assert status == 200 and len(page["items"]) == 3
+    status, page = call(f"{api}/evenements?from=2025-06-03&to=2025-06-03",
+                        token=token)
+    assert len(page["items"]) == 1
+
+
+def test_invalid_query_parameters_are_rejected(api):
+    token = login(api, "gestion@epic.fr")
+    status, data = call(f"{api}/clients?sort=email", token=token)
+    assert status == 400 and "nom_complet" in data["erreur"]
+    assert call(f"{api}/users?sort=role", token=token)[0] == 400
+
+    # an id cursor on a listing sorted by name, and the reverse
+    status, page = call(f"{api}/clients?sort=nom_complet&limit=2&after="
+                        f"{encode_cursor((1,))}", token=token)
+    assert status == 400
+    status, page = call(f"{api}/clients?limit=2&before="
+                        f"{encode_cursor(('Client 2', 3))}", token=token)
+    assert status == 400
+
+    status, page = call(f"{api}/clients?sort=nom_complet&limit=3", token=token)
+    status, page = call(f"{api}/clients?sort=nom_complet&limit=2&after="
+                        f"{page['next']}", token=token)
+    assert status == 200
+    assert [c["nom_complet"] for c in page["items"]] == [
+        "Client 11", "Client 2"]
+
+
+def test_invalid_content_length_is_rejected(api):
+    token = login(api, "gestion@epic.fr")
+    parts = urlsplit(api)
+    for length in ("-1", "abc"):
+        connection = HTTPConnection(parts.hostname, parts.port, timeout=5)
+        connection.putrequest("POST", "/clients")
+        connection.putheader("Authorization", f"Bearer {token}")
+        connection.putheader("Content-Length", length)
+        connection.endheaders(b"{}")
+        response = connection.getresponse()
+        assert response.status == 400
+        assert json.loads(response.read())["erreur"] == (
+            "En-tête Content-Length invalide.")
+        assert response.getheader("Connection") == "close"
+        connection.close()
+
+
+def test_unexpected_errors_are_internal_errors(api, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("bug")
+    monkeypatch.setattr(ClientService, "get_clients_page", broken)
+    token = login(api, "gestion@epic.fr")
+    status, data = call(f"{api}/clients", token=token)
+    assert (status, data) == (500, {"erreur": "Erreur interne du serveur."})
@@ -0,0 +1,97 @@
+"""
+Async services through aiosqlite, against the seeded SQLite file of the
+`database_file` fixture: the asyncio driver opens its own connections,
+which cannot join the rolled back transaction of `session`.
+
+Run from the project root: python -m pytest tests/test_async_services.py
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models.async_base import async_url
+from services import contrat_service
+from services.async_services import (
+    AsyncClientService, AsyncContratService, AsyncUtilisateurService,
+)
+from services.unit_of_work import async_unit_of_work
+from utils.security import hash_rounds
+
+
+@pytest.fixture
+def session_factory(database_file):
+    url, _ = database_file
+    engine = create_async_engine(async_url(url))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def ids(database_file):
+    return database_file[1]
+
+
+def test_login_checks_password_and_upgrades_outdated_hash(
+        session_factory, monkeypatch):
+    async def scenario():
+        async with session_factory() as session:
+            service = AsyncUtilisateurService(session)
+            assert await service.login("c1@epic.fr", "wrong") is None
+            assert await service.login("nobody@epic.fr", "pw") is None
+            await service.create_user("Nouveau", "nouveau@epic.fr", "pw",
+                                      "support")
+            assert (await service.login("nouveau@epic.fr", "pw")).nom == "Nouveau"
+
+            monkeypatch.setenv("BCRYPT_ROUNDS", "5")
+            user = await service.login("c1@epic.fr", "pw")
+            assert user is not None
+        async with session_factory() as session:
+            stored = await AsyncUtilisateurService(session).get_user_by_id(user.id)
+            return stored.mot_de_passe
+
+    assert hash_rounds(asyncio.run(scenario())) == 5
+
+
+def test_reads_are_scoped_like_the_sync_services(session_factory, ids):
+    async def scenario():
+        payload = {"id": ids["C1"], "role": "commercial"}
+
+        async def visible(payload):
+            async with session_factory() as session:
+                clients = await AsyncClientService(session, payload).get_all_clients()
+                return {client.commercial_id for client in clients}, len(clients)
+
+        # one session per task, queries of both tasks interleave
+        return await asyncio.gather(visible(payload), visible(None))
+
+    own, everything = asyncio.run(scenario())
+    assert own == ({ids["C1"]}, 6)
+    assert everything[1] == 12
+
+
+def test_signature_event_is_sent_once_the_unit_of_work_commits(
+        session_factory, ids, monkeypatch):
+    messages = []
+    monkeypatch.setattr(contrat_service, "capture_message",
+                        lambda message, level: messages.append(message))
+
+    async def scenario():
+        async with session_factory() as session:
+            service = AsyncContratService(session)
+            # a client of C1
+            contrat = await service.create_contrat(ids["clients"][1], ids["C1"],
+                                                   1000)
+            async with async_unit_of_work(session):
+                await service.update_contrat(contrat, statut=True)
+                assert messages == []
+            signed = await service.get_signed_contrats()
+            return [c.id for c in signed], contrat.id
+
+    signed, contrat_id = asyncio.run(scenario())
+    # one signed contract per seeded client, plus the new one
+    assert contrat_id in signed and len(signed) == 13
+    assert len(messages) == 1 and messages[0].startswith("[CONTRAT_SIGNE]")
@@ -0,0 +1,105 @@
+"""
+Synthetic dataset of the benchmarks (benchmarks/dataset.py), loaded into
+SQLite files built by the migrations, with foreign keys enforced.
+
+Run from the project root: python -m pytest tests/test_benchmark_dataset.py
+"""
+import pytest
+from sqlalchemy import create_engine, event, func, select, text
+
+from benchmarks.dataset import TABLES, load
+from migrations import upgrade
+
+CLIENTS = 300
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    database(name) returns an engine on a new, migrated SQLite file.
+    """
+    engines = []
+
+    def build(name):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+
+        # a child inserted before its parent fails the batch
+        @event.listens_for(engine, "connect")
+        def _foreign_keys(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+        upgrade(engine)
+        engines.append(engine)
+        return engine
+
+    yield build
+    for engine in engines:
+        engine.dispose()
+
+
+def dump(engine):
+    """
+    Every row of the dataset tables, without the password hashes (salted).
+    """
+    with engine.connect() as connection:
+        return {
+            name: connection.execute(
+                select(*(c for c in table.c if c.name != "mot_de_passe"))
+                .order_by(table.c.id)).all()
+            for name, table in TABLES.items()
+        }
+
+
+def test_same_seed_same_rows(database):
+    first, second = database("a.db"), database("b.db")
+    summary = load(first, CLIENTS, seed=7, batch_size=50)
+    assert load(second, CLIENTS, seed=7, batch_size=200)["lignes"] == (
+        summary["lignes"])
+    assert summary["lignes"]["clients"] == CLIENTS
+    assert dump(first) == dump(second)
+
+    other = database("c.db")
+    load(other, CLIENTS, seed=8, batch_size=50)
+    assert dump(other)["clients"] != dump(first)["clients"]
+
+
+def test_users_per_role(database):
+    engine = database("roles.db")
+    load(engine, CLIENTS, batch_size=100)
+    load(engine, 10, batch_size=100, commercials=4, supports=3, gestion=2)
+    with engine.connect() as connection:
+        roles = dict(connection.execute(
+            select(TABLES["utilisateurs"].c.role, func.count())
+            .group_by(TABLES["utilisateurs"].c.role)).all())
+    # derived from the number of clients by default: 3 commercials,
+    # 2 supports, 1 gestion
+    assert roles == {"commercial": 3 + 4, "support": 2 + 3, "gestion": 1 + 2}
+
+
+def test_loading_into_a_non_empty_database(database):
+    engine = database("twice.db")
+    first = load(engine, CLIENTS, seed=7, batch_size=50)
+    # same seed: same draws, new ids after the rows already there
+    second = load(engine, CLIENTS, seed=7, batch_size=50)
+    assert second["lignes"] == first["lignes"]
+    with engine.connect() as connection:
+        for name, count in first["lignes"].items():
+            table = TABLES[name]
+            assert connection.execute(select(
+                func.count(), func.count(table.c.id.distinct()))
+            ).one() == (2 * count, 2 * count)
+
+        # every foreign key resolves
+        assert connection.execute(text("PRAGMA foreign_key_check")).all() == []
+        assert connection.execute(text(
+            "SELECT COUNT(*) FROM contrats c JOIN clients cl "
+            "ON cl.id = c.client_id JOIN utilisateurs u "
+            "ON u.id = c.commercial_id AND u.role = 'commercial'"
+        )).scalar() == 2 * first["lignes"]["contrats"]
+        assert connection.execute(text(
+            "SELECT COUNT(*) FROM evenements e "
+            "LEFT JOIN contrats c ON c.id = e.contrat_id "
+            "LEFT JOIN utilisateurs u ON u.id = e.support_id "
+            "WHERE c.id IS NULL OR c.statut = 0 "
+            "OR (e.support_id IS NOT NULL AND u.role IS NOT 'support')"
+        )).scalar() == 0
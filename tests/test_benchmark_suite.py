@@ -0,0 +1,76 @@
+"""
+Result helpers of the benchmark suite (benchmarks/suite.py): sizes,
+percentiles and the comparison with a baseline.
+
+Run from the project root: python -m pytest tests/test_benchmark_suite.py
+"""
+import argparse
+
+import pytest
+
+from benchmarks.suite import PERCENTILES, compare, parse_size, percentiles
+
+
+def results(p50=10.0, peak_kib=100, queries=2, case="clients_list",
+            size="10000"):
+    return {"sizes": {size: {"cases": {case: {
+        "latency_ms": {"p50": p50}, "peak_kib": peak_kib, "queries": queries,
+    }}}}}
+
+
+def regressions(rows):
+    return {metric for _, _, metric, _, _, regression in rows if regression}
+
+
+@pytest.mark.parametrize("value, rows", [
+    ("10000", 10_000), ("10k", 10_000), (" 2.5M ", 2_500_000), ("1m", 1_000_000),
+])
+def test_parse_size(value, rows):
+    assert parse_size(value) == rows
+
+
+@pytest.mark.parametrize("value", ["", "dix", "10g", "k"])
+def test_parse_size_rejects_invalid_input(value):
+    with pytest.raises(argparse.ArgumentTypeError, match="taille invalide"):
+        parse_size(value)
+
+
+def test_percentiles_of_a_single_sample():
+    assert percentiles([0.0125]) == {
+        **{f"p{p}": 12.5 for p in PERCENTILES}, "max": 12.5}
+
+
+def test_percentiles_of_several_samples():
+    values = percentiles([i / 1000 for i in range(1, 101)])
+    assert values["max"] == 100
+    assert values["p50"] == pytest.approx(50.5)
+    assert values["p50"] <= values["p90"] <= values["p95"] <= values["p99"]
+
+
+def test_compare_within_tolerance():
+    rows = compare(results(p50=12.4, peak_kib=124), results(), tolerance=0.25)
+    assert [(metric, old, new) for _, _, metric, old, new, _ in rows] == [
+        ("p50_ms", 10.0, 12.4), ("peak_kib", 100, 124), ("queries", 2, 2)]
+    assert regressions(rows) == set()
+
+
+def test_compare_flags_each_regression():
+    assert regressions(compare(results(p50=13), results())) == {"p50_ms"}
+    assert regressions(compare(results(peak_kib=130), results())) == {
+        "peak_kib"}
+    # any extra query is a regression, whatever the tolerance
+    assert regressions(compare(results(queries=3), results(),
+                               tolerance=1)) == {"queries"}
+
+
+def test_compare_with_a_zero_baseline():
+    baseline = results(p50=0.0, peak_kib=0, queries=0)
+    assert regressions(compare(baseline, baseline)) == set()
+    assert regressions(compare(results(p50=0.1, peak_kib=1, queries=1),
+                               baseline)) == {"p50_ms", "peak_kib", "queries"}
+
+
+def test_compare_skips_what_the_baseline_lacks():
+    assert compare(results(case="nouveau"), results()) == []
+    assert compare(results(size="100000"), results()) == []
+    assert compare(results(), {}) == []
@@ -0,0 +1,142 @@
+"""
+Bulk client import (services/client_import_service.py).
+
+Run from the project root: python -m pytest tests/test_client_import.py
+"""
+import io
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from models.client import Client
+from repositories.client_repository import ClientRepository
+from services import client_import_service
+from services.client_import_service import ClientImportService
+from utils.query_budget import count_queries
+
+HEADER = "nom_complet,email,telephone,entreprise,commercial_id,commercial_email\n"
+
+
+def run_import(session, payload, lines, **options):
+    service = ClientImportService(session, payload)
+    return service, service.import_csv(
+        io.StringIO(HEADER + "".join(lines)), **options)
+
+
+def valid_lines(count, commercial="c1@epic.fr"):
+    return [f"Nouveau {i},nouveau{i}@x.fr,,ACME,,{commercial}\n"
+            for i in range(count)]
+
+
+def clients_named(session, prefix):
+    return session.scalars(select(Client).where(
+        Client.nom_complet.startswith(prefix)).order_by(Client.id)).all()
+
+
+def test_rejection_reasons(data, session, payload):
+    _, report = run_import(session, payload("Gestion"), [
+        ",sans.nom@x.fr,,,,c1@epic.fr\n",
+        "Sans Email,,,,,c1@epic.fr\n",
+        "Email Invalide,pas-un-email,,,,c1@epic.fr\n",
+        f"{'x' * 101},long@x.fr,,,,c1@epic.fr\n",
+        "Support,s@x.fr,,,{},\n".format(data["S1"]),
+        "Inconnu,i@x.fr,,,,personne@epic.fr\n",
+        "Id Invalide,ii@x.fr,,,abc,\n",
+        "Sans Commercial,sc@x.fr,,,,\n",
+        "Majuscules,maj@x.fr,,,,C2@EPIC.FR\n",
+        "Par Id,id@x.fr,,,{},\n".format(data["C1"]),
+    ])
+    assert [(line, reason) for line, reason, _ in report.rejected] == [
+        (2, "nom_complet manquant"),
+        (3, "email invalide"),
+        (4, "email invalide"),
+        (5, "valeur trop longue : nom_complet"),
+        (6, "commercial introuvable"),
+        (7, "commercial introuvable"),
+        (8, "commercial introuvable"),
+        (9, "commercial introuvable"),
+    ]
+    assert (report.read, report.inserted) == (10, 2)
+    assert [(c.nom_complet, c.commercial_id)
+            for c in clients_named(session, "")[-2:]] == [
+        ("Majuscules", data["C2"]), ("Par Id", data["C1"])]
+
+
+def test_commercial_imports_for_themselves_only(data, session, payload):
+    _, report = run_import(session, payload("C1"), [
+        "Sans Commercial,sc@x.fr,,,,\n",
+        "Autre Commercial,ac@x.fr,,,,c2@epic.fr\n",
+    ])
+    assert [reason for _, reason, _ in report.rejected] == [
+        "commercial introuvable"]
+    [client] = clients_named(session, "Sans Commercial")
+    assert client.commercial_id == data["C1"]
+
+
+def test_one_statement_and_one_transaction_per_batch(data, session, payload):
+    batches = []
+    with count_queries() as counted:
+        _, report = run_import(
+            session, payload("Gestion"), valid_lines(7), batch_size=3,
+            on_batch=lambda report: batches.append(report.inserted))
+    assert (report.batches, report.inserted, batches) == (3, 7, [3, 6, 7])
+    inserts = [s for s in counted.statements if s.startswith("INSERT")]
+    # the commercials are resolved with one query before the first row
+    assert len(inserts) == 3 and len(counted) == 4
+    assert counted.transactions == 3
+    assert len(clients_named(session, "Nouveau")) == 7
+
+
+def test_failed_batch_is_rolled_back_and_reported(data, session, payload,
+                                                 monkeypatch):
+    insert_many = ClientRepository.insert_many
+    calls = []
+
+    def fail_second_batch(self, rows):
+        calls.append(len(rows))
+        insert_many(self, rows)
+        if len(calls) == 2:
+            raise IntegrityError("INSERT INTO clients", {}, Exception("doublon"))
+    monkeypatch.setattr(ClientRepository, "insert_many", fail_second_batch)
+
+    _, report = run_import(session, payload("Gestion"), valid_lines(7),
+                           batch_size=3)
+    assert calls == [3, 3, 1]
+    assert report.inserted == 4
+    assert [(line, reason) for line, reason, _ in report.rejected] == [
+        (line, "erreur base de données : IntegrityError") for line in (5, 6, 7)]
+    # the rows inserted before the error were rolled back with their batch
+    assert [c.nom_complet for c in clients_named(session, "Nouveau")] == [
+        "Nouveau 0", "Nouveau 1", "Nouveau 2", "Nouveau 6"]
+
+
+def test_dry_run_writes_nothing(data, session, payload, monkeypatch):
+    messages = []
+    monkeypatch.setattr(client_import_service, "capture_message",
+                        lambda message, level: messages.append(message))
+    before = session.scalar(select(func.count()).select_from(Client))
+    _, report = run_import(session, payload("Gestion"),
+                           valid_lines(5) + ["Invalide,x,,,,c1@epic.fr\n"],
+                           batch_size=2, dry_run=True)
+    assert report.summary()["dry_run"] is True
+    assert (report.inserted, len(report.rejected), report.batches) == (5, 1, 3)
+    assert session.scalar(select(func.count()).select_from(Client)) == before
+    assert messages == []
+
+
+def test_rejects_report(data, session, payload, monkeypatch):
+    messages = []
+    monkeypatch.setattr(client_import_service, "capture_message",
+                        lambda message, level: messages.append(message))
+    service, report = run_import(session, payload("Gestion"), [
+        "Bon,bon@x.fr,,ACME,,c1@epic.fr\n",
+        "Mauvais,mauvais,0102,ACME,,c1@epic.fr\n",
+    ])
+    output = io.StringIO()
+    report.write_rejects(output, service.fieldnames)
+    assert output.getvalue().splitlines() == [
+        "ligne,raison," + HEADER.strip(),
+        "3,email invalide,Mauvais,mauvais,0102,ACME,,c1@epic.fr",
+    ]
+    assert len(messages) == 1
+    assert messages[0].startswith("[CLIENTS_IMPORTED] inserted=1, rejected=1")
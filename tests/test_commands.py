@@ -0,0 +1,107 @@
+"""
+Non-interactive commands (cli/commands.py) on the shared fixtures.
+
+Run from the project root: python -m pytest tests/test_commands.py
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from cli.commands import EXIT_AUTH, EXIT_USAGE, build_parser, execute, main
+
+
+def run(*argv):
+    """
+    Run a command with JSON lines output and return the rows written.
+    """
+    stream = io.StringIO()
+    execute(build_parser().parse_args([*argv, "--format", "jsonl"]),
+            stream=stream)
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_date_alone_includes_the_whole_day(data, login):
+    # the seeded events start at 14:00, from 2025-06-01 on
+    login("Gestion")
+    assert len(run("evenements", "list", "--to", "2025-06-03")) == 3
+    assert len(run("evenements", "list", "--to", "2025-06-03 14:00")) == 3
+    assert len(run("evenements", "list", "--to", "2025-06-03 13:59")) == 2
+    assert len(run("evenements", "list", "--from", "2025-06-03",
+                   "--to", "2025-06-03")) == 1
+
+
+def test_export_to_a_date_includes_the_whole_day(data, login, tmp_path):
+    login("Gestion")
+    output = tmp_path / "evenements.jsonl"
+    execute(build_parser().parse_args([
+        "export", "evenements", "--format", "jsonl", "--output", str(output),
+        "--to", "2025-06-03"]))
+    assert len(output.read_text().splitlines()) == 3
+
+
+def export(tmp_path, *argv, name="export.csv"):
+    """
+    Run `export` into a file of tmp_path; returns its path.
+    """
+    output = tmp_path / name
+    execute(build_parser().parse_args(["export", *argv, "--output", str(output)]))
+    return output
+
+
+def test_export_selected_columns(data, login, tmp_path):
+    login("Gestion")
+    output = export(tmp_path, "clients", "--columns", "id, nom_complet,commercial")
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["id", "nom_complet", "commercial"]
+    assert [(int(r["id"]), r["nom_complet"], r["commercial"]) for r in rows] == [
+        (ident, f"Client {i}", "C1" if i % 2 else "C2")
+        for i, ident in enumerate(data["clients"])]
+
+
+def test_export_is_scoped_to_the_role(data, login, tmp_path):
+    # the clients of C1 have an odd number
+    login("C1")
+    output = export(tmp_path, "clients", "--format", "jsonl", "--columns",
+                    "nom_complet", name="clients.jsonl")
+    assert [json.loads(line)["nom_complet"]
+            for line in output.read_text().splitlines()] == [
+        f"Client {i}" for i in range(1, 12, 2)]
+
+
+def test_export_denied_to_a_support_on_clients(data, login, tmp_path, capsys):
+    login("S1")
+    output = tmp_path / "clients.csv"
+    assert main(["export", "clients", "--output", str(output)]) == EXIT_AUTH
+    assert "Accès non autorisé" in capsys.readouterr().err
+    assert not output.exists()
+
+
+def test_export_unknown_column(data, login, tmp_path, capsys):
+    login("Gestion")
+    output = tmp_path / "contrats.csv"
+    assert main(["export", "contrats", "--columns", "id,mot_de_passe",
+                 "--output", str(output)]) == EXIT_USAGE
+    assert "mot_de_passe" in capsys.readouterr().err
+    # the error comes before the destination file is created
+    assert not output.exists()
+
+
+def test_export_parquet(data, login, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    login("Gestion")
+    # Parquet is written to a file, never to the standard output
+    assert main(["export", "contrats", "--format", "parquet"]) == EXIT_USAGE
+    output = export(tmp_path, "contrats", "--format", "parquet", "--columns",
+                    "id,montant_total,statut,date_creation", "--batch-size",
+                    "5", name="contrats.parquet")
+    table = pq.read_table(output)
+    assert table.column_names == ["id", "montant_total", "statut",
+                                  "date_creation"]
+    assert table.num_rows == 24
+    rows = table.to_pylist()
+    assert [row["id"] for row in rows] == sorted(data["contrats"])
+    assert {row["statut"] for row in rows} == {True, False}
+    assert str(table.schema.field("montant_total").type).startswith("decimal128")
@@ -0,0 +1,75 @@
+"""
+Cache of the connected user (services/current_user.py).
+
+Run from the project root: python -m pytest tests/test_current_user.py
+"""
+import pytest
+
+from services import current_user
+from services.current_user import get_current_user, invalidate_user
+from services.utilisateur_service import UtilisateurService
+from utils.query_budget import count_queries, query_budget
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Monotonic clock of the cache, moved forward with clock.append(seconds).
+    """
+    now = [1000.0]
+    monkeypatch.setattr(current_user.time, "monotonic", lambda: sum(now))
+    invalidate_user()
+    yield now
+    invalidate_user()
+
+
+def test_snapshot_is_cached_until_the_ttl(data, session, payload, clock):
+    user = payload("C1")
+    with query_budget(1):
+        assert get_current_user(session, user).nom == "C1"
+        get_current_user(session, user)
+
+    clock.append(current_user.CACHE_TTL - 1)
+    with query_budget(0):
+        assert get_current_user(session, user).role == "commercial"
+    clock.append(2)
+    # past the TTL the user is looked up again (empty the identity map
+    # so that the lookup is a query)
+    session.expunge_all()
+    with count_queries() as counted:
+        assert get_current_user(session, user).id == user["id"]
+    assert len(counted) == 1
+
+
+def test_update_invalidates_the_snapshot(data, session, payload, clock):
+    user = payload("C1")
+    get_current_user(session, user)
+    service = UtilisateurService(session)
+    service.update_user(service.get_user_by_id(user["id"]), nom="Camille",
+                        role="gestion")
+    snapshot = get_current_user(session, user)
+    assert (snapshot.nom, snapshot.role) == ("Camille", "gestion")
+
+
+def test_delete_invalidates_the_snapshot(data, session, payload, clock):
+    user = payload("S1")
+    assert get_current_user(session, user) is not None
+    service = UtilisateurService(session)
+    service.delete_user(service.get_user_by_id(user["id"]))
+    assert get_current_user(session, user) is None
+    assert user["id"] not in current_user._cache
+
+
+def test_cache_is_bounded(data, session, payload, clock, monkeypatch):
+    monkeypatch.setattr(current_user, "CACHE_SIZE", 2)
+    users = [payload(nom) for nom in ("Gestion", "C1", "C2")]
+    for user in users:
+        get_current_user(session, user)
+        clock.append(1)
+    # the oldest snapshot made room for the newest
+    assert list(current_user._cache) == [users[1]["id"], users[2]["id"]]
+
+    # expired snapshots are dropped on the next insertion
+    clock.append(current_user.CACHE_TTL)
+    get_current_user(session, payload("S1"))
+    assert list(current_user._cache) == [data["S1"]]
@@ -1,28 +1,30 @@
-import mysql.connector
-from mysql.connector import Error
-connection = None
+"""
+Connection to a real MySQL server.
 
-try:
-    connection = mysql.connector.connect(
-        host='localhost',
-        database='epic_events',
-        user='epic_user',
-        password='epic@123'
-    )
+Skipped unless EPIC_TEST_MYSQL_URL is set, e.g.
+mysql+pymysql://epic_user:<password>@localhost/epic_events
+"""
+import os
 
-    if connection.is_connected():
-        print("Connected to MySQL database")
+import pytest
+from sqlalchemy import create_engine, text
 
-        cursor = connection.cursor()
-        cursor.execute("SELECT DATABASE();")
-        db = cursor.fetchone()
-        print(f"Using database: {db[0]}")
+MYSQL_URL = os.getenv("EPIC_TEST_MYSQL_URL")
 
-except Error as e:
-    print("Error while connecting to MySQL", e)
+pytestmark = [
+    pytest.mark.mysql,
+    pytest.mark.skipif(not MYSQL_URL, reason="EPIC_TEST_MYSQL_URL non défini"),
+]
 
-finally:
-    if connection.is_connected():
-        cursor.close()
-        connection.close()
-        print("MySQL connection is closed")
+
+def test_connects_to_mysql():
+    from migrations import current_version
+
+    engine = create_engine(MYSQL_URL, pool_pre_ping=True)
+    try:
+        with engine.connect() as connection:
+            database = connection.execute(text("SELECT DATABASE()")).scalar()
+            assert database == engine.url.database
+            assert current_version(connection) >= 0
+    finally:
+        engine.dispose()
@@ -0,0 +1,81 @@
+"""
+Batched loading by primary key (BaseRepository.get_many) and its use of
+the identity map, counted with utils.query_budget.
+
+Run from the project root: python -m pytest tests/test_get_many.py
+"""
+import re
+
+from sqlalchemy import select
+
+from models.client import Client
+from models.evenement import Evenement
+from repositories.client_repository import ClientRepository
+from repositories.evenement_repository import EvenementRepository
+from utils.query_budget import count_queries, query_budget
+
+
+def in_list_lengths(counted):
+    return [len(re.search(r"IN \(([^)]*)\)", statement).group(1).split(","))
+            for statement in counted.statements]
+
+
+def test_ids_are_loaded_in_chunks_and_returned_in_order(data, session):
+    ids = list(reversed(data["clients"]))
+    with count_queries() as counted:
+        clients = ClientRepository(session).get_many(ids, chunk_size=5)
+    assert [c.id for c in clients] == ids
+    assert in_list_lengths(counted) == [5, 5, 2]
+
+
+def test_duplicate_and_unknown_ids_are_left_out(data, session):
+    first, second = data["clients"][:2]
+    with query_budget(1) as counted:
+        clients = ClientRepository(session).get_many(
+            [second, first, second, 999999, str(first)])
+    assert [c.id for c in clients] == [second, first]
+    assert in_list_lengths(counted) == [3]
+
+
+def test_out_of_scope_ids_are_dropped(data, session, payload):
+    # the clients of C1 have an odd index
+    repository = ClientRepository(session, payload("C1"))
+    with query_budget(1):
+        clients = repository.get_many(data["clients"])
+    assert [c.id for c in clients] == data["clients"][1::2]
+
+    # once the clients of C2 are in the identity map, they are dropped
+    # without a query
+    everyone = ClientRepository(session).get_many(data["clients"])
+    with query_budget(0):
+        assert repository.get_many(data["clients"]) == everyone[1::2]
+
+
+def test_identity_map_hits_run_no_query(data, session):
+    loaded = session.scalars(select(Client).where(
+        Client.id.in_(data["clients"][:4]))).all()
+    with query_budget(0):
+        clients = ClientRepository(session).get_many(data["clients"][:4])
+    assert clients == loaded
+
+    # only the ids missing from the identity map are queried
+    with count_queries() as counted:
+        clients = ClientRepository(session).get_many(data["clients"][:6])
+    assert clients[:4] == loaded
+    assert in_list_lengths(counted) == [2]
+
+
+def test_expired_or_undecidable_entities_are_reloaded(data, session, payload):
+    loaded = ClientRepository(session).get_many(data["clients"][:2])
+    session.commit()  # expires them
+    with query_budget(1):
+        assert ClientRepository(session).get_many(data["clients"][:2]) == loaded
+
+    # a commercial sees an event through its contract: that rule cannot
+    # be checked on the loaded event, the scoped query decides
+    events = session.scalars(select(Evenement)).all()
+    with query_budget(1):
+        visible = EvenementRepository(session, payload("C1")).get_many(
+            [event.id for event in events])
+    assert visible and {event.contrat.commercial_id for event in visible} == {
+        data["C1"]}
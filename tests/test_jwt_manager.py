@@ -0,0 +1,85 @@
+"""
+Cache of the .token file payload (utils/jwt_manager.load_token).
+
+Run from the project root: python -m pytest tests/test_jwt_manager.py
+"""
+import os
+import time
+
+import jwt
+import pytest
+
+from utils import jwt_manager
+from utils.jwt_manager import (
+    SECRET_KEY, TOKEN_FILE, generate_token, invalidate_token_cache, load_token,
+)
+
+
+@pytest.fixture
+def decodes(tmp_path, monkeypatch):
+    """
+    Run in an empty working directory and count the token decodings.
+    """
+    monkeypatch.chdir(tmp_path)
+    invalidate_token_cache()
+    calls = []
+    decode_token = jwt_manager.decode_token
+
+    def counting(token):
+        calls.append(token)
+        return decode_token(token)
+    monkeypatch.setattr(jwt_manager, "decode_token", counting)
+    yield calls
+    invalidate_token_cache()
+
+
+def write(token, path=TOKEN_FILE):
+    with open(path, "w") as f:
+        f.write(token)
+
+
+def test_payload_is_decoded_once_per_file(decodes):
+    write(generate_token(1, "c1@epic.fr", "commercial"))
+    assert load_token()["id"] == 1
+    assert load_token()["id"] == 1
+    assert len(decodes) == 1
+
+
+def test_replaced_file_is_read_again(decodes):
+    write(generate_token(1, "c1@epic.fr", "commercial"))
+    assert load_token()["id"] == 1
+    # a new file (new inode), as an editor or an atomic save would write it
+    write(generate_token(2, "gestion@epic.fr", "gestion"), "new.token")
+    os.replace("new.token", TOKEN_FILE)
+    assert load_token()["role"] == "gestion"
+    # the same file rewritten in place with another content
+    write(generate_token(3, "s1@epic.fr", "support"))
+    assert load_token()["id"] == 3
+    assert len(decodes) == 3
+
+
+def test_removed_file_is_noticed(decodes, capsys):
+    write(generate_token(1, "c1@epic.fr", "commercial"))
+    assert load_token()
+    os.remove(TOKEN_FILE)
+    assert load_token() is None
+    assert "Aucun utilisateur connecté." in capsys.readouterr().out
+
+
+def test_token_about_to_expire_is_verified_again(decodes):
+    payload = {"id": 1, "email": "c1@epic.fr", "role": "commercial",
+               "exp": int(time.time()) + jwt_manager.EXPIRY_MARGIN - 5}
+    write(jwt.encode(payload, SECRET_KEY, algorithm="HS256"))
+    assert load_token()["id"] == 1
+    assert load_token()["id"] == 1
+    assert len(decodes) == 2
+
+
+def test_callers_cannot_alter_the_cache(decodes):
+    write(generate_token(1, "c1@epic.fr", "commercial"))
+    load_token()["role"] = "gestion"
+    payload = load_token()
+    payload["id"] = 99
+    assert load_token()["role"] == "commercial"
+    assert load_token()["id"] == 1
+    assert len(decodes) == 1
@@ -0,0 +1,69 @@
+"""
+Schema migrations (migrations/), on a database of their own: the shared
+test database of conftest.py stays at the latest version.
+
+Run from the project root: python -m pytest tests/test_migrations.py
+"""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from migrations import (
+    LATEST_VERSION, MIGRATIONS, current_version, downgrade, upgrade,
+)
+from models.base import Base
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def indexes(engine):
+    inspector = inspect(engine)
+    return {index["name"] for table in inspector.get_table_names()
+            for index in inspector.get_indexes(table)}
+
+
+def declared(*versions):
+    return {index.name for migration in MIGRATIONS
+            if migration.VERSION in versions
+            for index in getattr(migration, "INDEXES", ())}
+
+
+def version(engine):
+    with engine.connect() as connection:
+        return current_version(connection)
+
+
+def test_upgrade_downgrade_upgrade(engine):
+    assert upgrade(engine) == [m.VERSION for m in MIGRATIONS]
+    assert version(engine) == LATEST_VERSION
+    assert indexes(engine) == declared(*range(2, LATEST_VERSION + 1))
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO utilisateurs (nom, email, mot_de_passe, role) "
+            "VALUES ('G', 'g@epic.fr', 'x', 'gestion')"))
+
+    # back to the baseline: the indexes go, the tables and rows stay
+    assert downgrade(engine, 1) == list(range(LATEST_VERSION, 1, -1))
+    assert (version(engine), indexes(engine)) == (1, set())
+    with engine.connect() as connection:
+        assert connection.execute(
+            text("SELECT COUNT(*) FROM utilisateurs")).scalar() == 1
+
+    assert upgrade(engine, 2) == [2]
+    assert indexes(engine) == declared(2)
+    assert upgrade(engine) == list(range(3, LATEST_VERSION + 1))
+    assert indexes(engine) == declared(*range(2, LATEST_VERSION + 1))
+    assert upgrade(engine) == []
+
+    assert downgrade(engine, 0) == list(range(LATEST_VERSION, 0, -1))
+    assert set(inspect(engine).get_table_names()) == {"schema_version"}
+    assert upgrade(engine) == [m.VERSION for m in MIGRATIONS]
+
+
+def test_indexes_are_only_declared_by_the_migrations():
+    assert {name for name, table in Base.metadata.tables.items()
+            if table.indexes} == set()
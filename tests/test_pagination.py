@@ -0,0 +1,132 @@
+"""
+Keyset pagination: the repositories (_paginate) and the CLI list and
+selection views.
+
+Run from the project root: python -m pytest tests/test_pagination.py
+"""
+import importlib
+
+import pytest
+
+from services.contrat_service import ContratService
+from services.evenement_service import EvenementService
+
+
+@pytest.mark.parametrize("module, function, service, method, replies", [
+    ("cli.contrat_cli", "run_update_contrat", ContratService,
+     "get_contrats_page", ("n", "7", "", "", "o")),
+    ("cli.evenement_cli", "run_update_evenement", EvenementService,
+     "get_evenements_page", ("n", "7", "", "", "Lyon", "", "", "")),
+])
+def test_update_selects_from_one_page_at_a_time(
+        data, login, answers, capsys, monkeypatch, module, function, service,
+        method, replies):
+    cli = importlib.import_module(module)
+    monkeypatch.setattr(cli, "PAGE_SIZE", 5)
+    pages = []
+    fetch = getattr(service, method)
+
+    def record(self, *args, **kwargs):
+        page = fetch(self, *args, **kwargs)
+        pages.append(len(page.items))
+        return page
+    monkeypatch.setattr(service, method, record)
+
+    login("Gestion")
+    answers(*replies)
+    getattr(cli, function)()
+    # the ID typed on the second page: two pages loaded, not the table
+    assert pages == [5, 5]
+    assert "mis à jour" in capsys.readouterr().out
+
+
+def walk(repo, page_size, **options):
+    """
+    Follow next_cursor from the first page; returns the list of pages.
+    """
+    pages = [repo.get_page(page_size=page_size, **options)]
+    while pages[-1].next_cursor is not None:
+        pages.append(repo.get_page(page_size=page_size,
+                                   after=pages[-1].next_cursor, **options))
+    return pages
+
+
+def ids(page):
+    return [item.id for item in page]
+
+
+@pytest.fixture
+def clients(data, session):
+    from repositories.client_repository import ClientRepository
+
+    return ClientRepository(session)
+
+
+def test_forward_pages_cover_every_row_once(data, clients):
+    pages = walk(clients, 5)
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert sum((ids(page) for page in pages), []) == sorted(data["clients"])
+    assert pages[0].prev_cursor is None
+    assert all(page.prev_cursor == (page.items[0].id,) for page in pages[1:])
+
+
+def test_next_then_prev_comes_back_to_the_same_page(data, clients):
+    first = clients.get_page(page_size=5)
+    second = clients.get_page(page_size=5, after=first.next_cursor)
+    back = clients.get_page(page_size=5, before=second.prev_cursor)
+    assert ids(back) == ids(first)
+    assert back.prev_cursor is None
+    assert back.next_cursor == first.next_cursor
+
+    last = walk(clients, 5)[-1]
+    before_last = clients.get_page(page_size=5, before=last.prev_cursor)
+    assert ids(before_last) == ids(second)
+    assert before_last.prev_cursor is not None
+
+
+def test_ties_on_the_sort_key_are_broken_by_id(data, clients, session):
+    from sqlalchemy import update
+
+    from models.client import Client
+
+    # three clients per name: page boundaries fall inside the groups
+    for i, client_id in enumerate(data["clients"]):
+        session.execute(update(Client).where(Client.id == client_id)
+                        .values(nom_complet="ABCD"[i % 4]))
+    session.commit()
+    expected = [row.id for row in sorted(
+        session.execute(Client.__table__.select()),
+        key=lambda row: (row.nom_complet, row.id))]
+
+    pages = walk(clients, 5, sort="nom_complet")
+    assert sum((ids(page) for page in pages), []) == expected
+    assert pages[1].prev_cursor == (pages[1].items[0].nom_complet,
+                                    pages[1].items[0].id)
+
+    # and backwards from the last page
+    backwards = [pages[-1]]
+    while backwards[-1].prev_cursor is not None:
+        backwards.append(clients.get_page(
+            page_size=5, before=backwards[-1].prev_cursor, sort="nom_complet"))
+    assert [ids(page) for page in reversed(backwards)] == [
+        ids(page) for page in pages]
+
+
+def test_empty_pages(data, clients):
+    page = clients.get_page(page_size=5, commercial_id=9999)
+    assert (page.items, page.next_cursor, page.prev_cursor) == ([], None, None)
+
+    first = clients.get_page(page_size=5)
+    nothing_before = clients.get_page(page_size=5,
+                                      before=(first.items[0].id,))
+    assert (nothing_before.items, nothing_before.next_cursor,
+            nothing_before.prev_cursor) == ([], None, None)
+    nothing_after = clients.get_page(page_size=5, after=(max(data["clients"]),))
+    assert (nothing_after.items, nothing_after.next_cursor) == ([], None)
+
+
+def test_invalid_page_requests(data, clients):
+    with pytest.raises(ValueError):
+        clients.get_page(page_size=5, sort="email")
+    with pytest.raises(ValueError):
+        clients.get_page(page_size=0)
@@ -0,0 +1,141 @@
+"""
+Query budgets of the list and update flows, on an in-memory SQLite
+database seeded with a few rows per table.
+
+The budgets do not depend on the number of rows: a view that lazy loads
+a relationship per row goes over budget with this fixture.
+
+Run from the project root: python -m pytest tests/test_query_budget.py
+"""
+import importlib
+import io
+
+import pytest
+
+from services.client_service import ClientService
+from services.contrat_service import ContratService
+from services.evenement_service import EvenementService
+from services.utilisateur_service import UtilisateurService
+from utils.query_budget import (
+    QueryBudgetExceeded, assert_query_budget, count_queries, query_budget,
+)
+
+
+def test_budget_exceeded_lists_the_statements(data, session):
+    with pytest.raises(QueryBudgetExceeded) as error:
+        with query_budget(1):
+            for contrat in ContratService(session).get_all_contrats():
+                contrat.client.nom_complet
+    assert "13 requête(s)" in str(error.value)
+
+
+def test_roundtrips_include_commits(data, session):
+    client = ClientService(session).get_client_by_id(1)
+    with count_queries() as counted:
+        ClientService(session).update_client(client, telephone="0102030405")
+    assert len(counted) == 1
+    assert counted.roundtrips == 2
+
+
+@pytest.mark.parametrize("call", [
+    lambda s, ids: ClientService(s).get_all_clients(profile="list"),
+    lambda s, ids: ClientService(s).get_clients_by_commercial_id(
+        ids["C1"], profile="list"),
+    lambda s, ids: ContratService(s).get_all_contrats(profile="list"),
+    lambda s, ids: ContratService(s).get_contrats_by_commercial_id(
+        ids["C1"], profile="list"),
+    lambda s, ids: ContratService(s).get_unsigned_contrats(profile="list"),
+    lambda s, ids: ContratService(s).get_unpaid_contrats(profile="list"),
+    lambda s, ids: EvenementService(s).get_all_evenements(profile="list"),
+    lambda s, ids: EvenementService(s).get_evenements_by_support_id(
+        ids["S1"], profile="list"),
+    lambda s, ids: UtilisateurService(s).list_users(),
+])
+def test_service_listings_run_one_query(data, session, call):
+    with query_budget(1):
+        rows = call(session, data)
+        # what the CLI renders from each row
+        for row in rows:
+            for name in ("client", "commercial", "contrat", "support"):
+                related = getattr(row, name, None)
+                if name == "contrat" and related is not None:
+                    related.client
+    assert rows
+
+
+@pytest.mark.parametrize("module, function, user, budget", [
+    ("cli.client_cli", "list_clients", "C1", 1),
+    ("cli.contrat_cli", "run_list_contrats", "Gestion", 2),
+    ("cli.contrat_cli", "run_list_contrats_non_signes", "Gestion", 2),
+    ("cli.contrat_cli", "run_list_contrats_non_payes", "C1", 2),
+    ("cli.evenement_cli", "run_list_evenements", "Gestion", 2),
+    ("cli.evenement_cli", "run_list_evenements", "S1", 2),
+    ("cli.user_cli", "list_all_users", "Gestion", 1),
+])
+def test_interactive_listings(login, answers, capsys, module, function, user,
+                              budget):
+    login(user)
+    answers("")  # Entrée at the navigation prompt, if there is more than one page
+    run = getattr(importlib.import_module(module), function)
+    assert_query_budget(run, max_statements=budget)
+    assert "Aucun" not in capsys.readouterr().out
+
+
+def test_update_client(data, login, answers, capsys):
+    from cli.client_cli import update_client
+
+    login("C1")
+    answers("2", "", "", "0607080910", "")
+    with query_budget(3, max_roundtrips=4):
+        update_client()
+    assert "mis à jour" in capsys.readouterr().out
+
+
+def test_update_contrat(data, login, answers, capsys):
+    from cli.contrat_cli import run_update_contrat
+
+    login("Gestion")
+    answers("2", "", "0", "o")
+    # the selection page is released once an ID is typed: the contract
+    # is reloaded by primary key
+    with query_budget(5, max_roundtrips=7):
+        run_update_contrat()
+    assert "mis à jour" in capsys.readouterr().out
+
+
+def test_update_evenement(data, login, answers, capsys):
+    from cli.evenement_cli import run_update_evenement
+
+    login("Gestion")
+    answers("1", "", "", "Lyon", "80", "", str(data["S1"]))
+    with query_budget(6, max_roundtrips=7):
+        run_update_evenement()
+    assert "mis à jour" in capsys.readouterr().out
+
+
+def test_update_user(data, login, answers, capsys):
+    from cli.user_cli import run_update_user
+
+    login("Gestion")
+    answers(str(data["C2"]), "Commercial 2", "", "", "")
+    with query_budget(3, max_roundtrips=5):
+        run_update_user()
+    assert "mis à jour" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("argv, budget", [
+    (["clients", "list"], 2),
+    (["contrats", "list", "--unpaid"], 2),
+    (["evenements", "list", "--unassigned"], 2),
+    (["users", "list"], 2),
+    # the flush issues one UPDATE per modified row, the rest is fixed
+    (["contrats", "update", "--id", "2", "4", "6", "8", "--signed"], 3 + 4),
+    (["evenements", "assign", "--id", "1", "4", "7", "--support", "4"], 4 + 3),
+])
+def test_commands(login, argv, budget):
+    from cli.commands import build_parser, execute
+
+    login("Gestion")
+    args = build_parser().parse_args([*argv, "--format", "jsonl"])
+    with query_budget(budget):
+        execute(args, stream=io.StringIO())
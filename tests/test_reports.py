@@ -0,0 +1,82 @@
+"""
+Aggregate reports (services/report_service.py) on the shared fixtures.
+
+The seeded data gives each client a signed and an unsigned contract of
+1000, created on 2025-02-01, with 500 left to pay on the clients of C1
+and nothing on those of C2, and one event per signed contract.
+
+Run from the project root: python -m pytest tests/test_reports.py
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from models.client import Client
+from models.contrat import Contrat
+from policies.access_policy import AccessDenied
+from services.report_service import ReportService
+from utils.query_budget import query_budget
+
+
+def report(session, payload=None, **options):
+    with query_budget(1):
+        return ReportService(session, payload).commercial_report(**options)
+
+
+def totals(row):
+    return {name: row[name] for name in (
+        "contrats", "signes", "non_signes", "montant_total",
+        "montant_restant", "evenements", "taux_signature",
+        "evenements_par_contrat")}
+
+
+def test_totals_per_commercial(data, session):
+    rows = report(session)
+    assert [(row["commercial_id"], row["commercial"]) for row in rows] == [
+        (data["C1"], "C1"), (data["C2"], "C2")]
+    assert totals(rows[0]) == {
+        "contrats": 12, "signes": 6, "non_signes": 6, "montant_total": 12000,
+        "montant_restant": 6000, "evenements": 6, "taux_signature": 0.5,
+        "evenements_par_contrat": 0.5}
+    assert totals(rows[1])["montant_restant"] == 0
+
+
+def test_month_and_entreprise_breakdowns(data, session):
+    # move the contracts of the first client of C1 to March, and that
+    # client to another company
+    first = data["clients"][1]
+    session.execute(update(Contrat).where(Contrat.client_id == first)
+                    .values(date_creation=date(2025, 3, 15)))
+    session.execute(update(Client).where(Client.id == first)
+                    .values(entreprise="Globex"))
+    session.commit()
+
+    by_month = report(session, breakdown="month", commercial_id=data["C1"])
+    assert [(row["mois"], row["contrats"], row["evenements"])
+            for row in by_month] == [("2025-02", 10, 5), ("2025-03", 2, 1)]
+    assert "jour" not in by_month[0]
+
+    by_company = report(session, breakdown="entreprise",
+                        commercial_id=data["C1"])
+    assert [(row["entreprise"], row["contrats"], row["montant_restant"])
+            for row in by_company] == [("ACME", 10, 5000), ("Globex", 2, 1000)]
+
+    # the creation date bounds are inclusive
+    march = report(session, date_from=date(2025, 3, 15),
+                   date_to=date(2025, 3, 15))
+    assert [(row["commercial_id"], row["contrats"]) for row in march] == [
+        (data["C1"], 2)]
+
+
+def test_reports_are_scoped_to_the_role(data, session, payload):
+    rows = report(session, payload("C2"))
+    assert [row["commercial_id"] for row in rows] == [data["C2"]]
+    assert report(session, payload("C2"), commercial_id=data["C1"]) == []
+    with pytest.raises(AccessDenied):
+        ReportService(session, payload("S1")).commercial_report()
+
+
+def test_unknown_breakdown(data, session):
+    with pytest.raises(ValueError):
+        ReportService(session).commercial_report(breakdown="day")
@@ -0,0 +1,84 @@
+"""
+Password hashing settings and helpers (utils/security.py).
+
+Run from the project root: python -m pytest tests/test_security.py
+"""
+import pytest
+
+from utils import security
+from utils.security import (
+    DEFAULT_ROUNDS, DEFAULT_WORKERS, bcrypt_rounds, hash_password, hash_rounds,
+    needs_rehash, submit_verify, verify_password,
+)
+
+
+@pytest.fixture
+def fresh_executor(monkeypatch):
+    """
+    Let the next _get_executor() call build a new pool, shut down after
+    the test.
+    """
+    monkeypatch.setattr(security, "_executor", None)
+    yield
+    if security._executor is not None:
+        security._executor.shutdown()
+
+
+def test_rounds_default_and_bounds(monkeypatch):
+    monkeypatch.delenv("BCRYPT_ROUNDS", raising=False)
+    assert bcrypt_rounds() == DEFAULT_ROUNDS
+    for value in ("4", "31"):
+        monkeypatch.setenv("BCRYPT_ROUNDS", value)
+        assert bcrypt_rounds() == int(value)
+    for value in ("3", "32", "douze"):
+        monkeypatch.setenv("BCRYPT_ROUNDS", value)
+        with pytest.raises(ValueError, match="BCRYPT_ROUNDS"):
+            bcrypt_rounds()
+
+
+def test_needs_rehash_compares_the_cost(monkeypatch):
+    hashed = hash_password("secret", rounds=4)
+    assert hash_rounds(hashed) == 4
+    assert not needs_rehash(hashed, 4)
+    assert needs_rehash(hashed, 5)
+    monkeypatch.setenv("BCRYPT_ROUNDS", "4")
+    assert not needs_rehash(hashed)
+    monkeypatch.setenv("BCRYPT_ROUNDS", "5")
+    assert needs_rehash(hashed)
+    # not a bcrypt hash: replaced on the next login
+    assert needs_rehash("plain-text")
+
+
+def test_synchronous_hashing_does_not_use_the_pool(monkeypatch):
+    def no_pool():
+        raise AssertionError("pool de hachage utilisé")
+    monkeypatch.setattr(security, "_get_executor", no_pool)
+    hashed = hash_password("secret", rounds=4)
+    assert verify_password("secret", hashed)
+    assert not verify_password("autre", hashed)
+
+
+def test_pool_size_comes_from_the_environment(monkeypatch, fresh_executor):
+    monkeypatch.setenv("EPIC_HASH_WORKERS", "2")
+    executor = security._get_executor()
+    assert executor._max_workers == 2
+    assert security._get_executor() is executor
+    assert submit_verify("secret", hash_password("secret", rounds=4)).result()
+
+
+@pytest.mark.parametrize("value, workers", [
+    (None, DEFAULT_WORKERS), ("0", 1), ("7", 7),
+])
+def test_pool_size_default_and_minimum(monkeypatch, fresh_executor, value,
+                                       workers):
+    if value is None:
+        monkeypatch.delenv("EPIC_HASH_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("EPIC_HASH_WORKERS", value)
+    assert security._get_executor()._max_workers == workers
+
+
+def test_invalid_pool_size(monkeypatch, fresh_executor):
+    monkeypatch.setenv("EPIC_HASH_WORKERS", "quatre")
+    with pytest.raises(ValueError, match="EPIC_HASH_WORKERS"):
+        security._get_executor()
@@ -0,0 +1,114 @@
+"""
+Sentry trace sampling and spans, sent to a local transport instead of
+sentry.io.
+
+Run from the project root: python -m pytest tests/test_sentry_tracing.py
+"""
+import pytest
+from sentry_sdk.transport import Transport
+
+from utils import sentry_config
+from utils.sentry_config import make_traces_sampler, sample_rates
+
+
+class RecordingTransport(Transport):
+    """
+    Keep the envelopes the SDK would send.
+    """
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.envelopes = []
+
+    def capture_envelope(self, envelope):
+        self.envelopes.append(envelope)
+
+    def transactions(self):
+        return [item.payload.json for envelope in self.envelopes
+                for item in envelope.items if item.type == "transaction"]
+
+
+@pytest.fixture
+def sentry(monkeypatch):
+    """
+    Initialize Sentry with a RecordingTransport; returns a function taking
+    the sample rate environment and returning the transport.
+    """
+    import sentry_sdk
+
+    monkeypatch.setenv("SENTRY_DSN", "https://key@sentry.invalid/1")
+
+    def init(**environ):
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        transport = RecordingTransport()
+        sentry_config.init_sentry(transport=transport)
+        return transport
+
+    yield init
+    sentry_sdk.get_client().close()
+    sentry_config._sentry = None
+
+
+def test_sample_rates_from_the_environment(monkeypatch):
+    monkeypatch.delenv("SENTRY_TRACES_SAMPLE_RATE", raising=False)
+    monkeypatch.delenv("SENTRY_TRACES_SAMPLES", raising=False)
+    assert sample_rates() == (0.1, {})
+
+    monkeypatch.setenv("SENTRY_TRACES_SAMPLE_RATE", "0.5")
+    monkeypatch.setenv("SENTRY_TRACES_SAMPLES",
+                       "http.server=0.01, GET /clients=1")
+    assert sample_rates() == (0.5, {"http.server": 0.01, "GET /clients": 1.0})
+
+    for name, value in (("SENTRY_TRACES_SAMPLE_RATE", "1.5"),
+                        ("SENTRY_TRACES_SAMPLE_RATE", "tous"),
+                        ("SENTRY_TRACES_SAMPLES", "cli.action")):
+        monkeypatch.setenv(name, value)
+        with pytest.raises(ValueError):
+            sample_rates()
+        monkeypatch.delenv(name)
+
+
+def test_sampler_prefers_parent_then_name_then_op():
+    sampler = make_traces_sampler(
+        0.2, {"http.server": 0.0, "contrats_update": 1.0})
+
+    def context(name, op, parent=None):
+        return {"transaction_context": {"name": name, "op": op},
+                "parent_sampled": parent}
+
+    assert sampler(context("GET /clients", "http.server")) == 0.0
+    assert sampler(context("contrats_update", "cli.command")) == 1.0
+    assert sampler(context("clients_list", "cli.command")) == 0.2
+    assert sampler(context("GET /clients", "http.server", True)) == 1.0
+    assert sampler(context("contrats_update", "cli.command", False)) == 0.0
+
+
+def test_unsampled_operations_send_nothing(sentry, data, services):
+    transport = sentry(SENTRY_TRACES_SAMPLE_RATE="1",
+                       SENTRY_TRACES_SAMPLES="cli.command=0")
+    with sentry_config.transaction("clients_list", "cli.command"):
+        services().clients.get_all_clients()
+    sentry_config._sentry.flush()
+    assert transport.transactions() == []
+
+
+def test_spans_around_services_and_repositories(sentry, data, services):
+    transport = sentry(SENTRY_TRACES_SAMPLE_RATE="0",
+                       SENTRY_TRACES_SAMPLES="contrats_list=1")
+    with sentry_config.transaction("contrats_list", "cli.command"):
+        services().contrats.get_unpaid_contrats(profile="list")
+    with sentry_config.transaction("clients_list", "cli.command"):
+        services().clients.get_all_clients()
+    sentry_config._sentry.flush()
+
+    [sent] = transport.transactions()
+    assert (sent["transaction"], sent["contexts"]["trace"]["op"]) == (
+        "contrats_list", "cli.command")
+    spans = {span["op"]: span for span in sent["spans"]}
+    assert spans["service"]["description"] == (
+        "ContratService.get_unpaid_contrats")
+    assert spans["db.repository"]["description"].startswith(
+        "ContratRepository.")
+    assert spans["db.repository"]["parent_span_id"] == (
+        spans["service"]["span_id"])
@@ -0,0 +1,109 @@
+"""
+Service layer on the shared fixtures of tests/conftest.py.
+
+Run from the project root: python -m pytest tests/test_services.py
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from models.client import Client
+from policies.access_policy import AccessDenied
+from services import contrat_service
+from services.unit_of_work import unit_of_work
+from utils.security import hash_rounds
+
+
+@pytest.mark.parametrize("attempt", [1, 2])
+def test_each_test_starts_from_the_seeded_data(data, services, attempt):
+    # the client created by the first run is rolled back before the second
+    service = services().clients
+    assert len(service.get_all_clients()) == 12
+    service.create_client("Nouveau", "unique@x.fr", None, "ACME", data["C1"])
+    assert len(service.get_all_clients()) == 13
+
+
+def test_reads_are_scoped_to_the_role(data, services, payload):
+    c1 = services(payload("C1"))
+    assert {c.commercial_id for c in c1.clients.get_all_clients()} == {data["C1"]}
+    assert len(c1.contrats.get_all_contrats()) == 12
+
+    support = services(payload("S1")).evenements.get_all_evenements()
+    assert support and {e.support_id for e in support} == {data["S1"]}
+    # a commercial only finds their own clients, support no client at all
+    assert c1.clients.get_client_by_id(data["clients"][0]) is None
+    with pytest.raises(AccessDenied):
+        services(payload("S1")).clients.get_all_clients()
+
+
+def test_events_of_a_commercial_and_their_filters(data, services):
+    # event i is on a contract of client i (C1 when i is odd), starts on
+    # June 1 + i days at 14:00 and has no support when i % 3 == 0
+    service = services().evenements
+    number = {ident: i for i, ident in enumerate(data["evenements"])}
+
+    def numbers(**filters):
+        return sorted(number[e.id] for e in service.get_evenements_by_commercial_id(
+            data["C1"], **filters))
+
+    assert numbers() == [1, 3, 5, 7, 9, 11]
+    assert [number[e.id] for e in service.get_evenements_by_commercial_id(
+        data["C2"])] == [0, 2, 4, 6, 8, 10]
+    assert numbers(date_from=datetime(2025, 6, 4, 14)) == [3, 5, 7, 9, 11]
+    assert numbers(date_to=datetime(2025, 6, 8, 14)) == [1, 3, 5, 7]
+    assert numbers(date_from=datetime(2025, 6, 4),
+                   date_to=datetime(2025, 6, 8, 23, 59)) == [3, 5, 7]
+    assert numbers(unassigned_only=True) == [3, 9]
+    assert numbers(unassigned_only=True,
+                   date_to=datetime(2025, 6, 8, 23, 59)) == [3]
+
+
+def test_signature_is_reported_once_committed(data, services, monkeypatch):
+    messages = []
+    monkeypatch.setattr(contrat_service, "capture_message",
+                        lambda message, level: messages.append(message))
+    service = services().contrats
+    contrats = service.get_contrats_by_ids(data["contrats"][:4])
+    with unit_of_work(service.repo.session):
+        for contrat in contrats:
+            service.update_contrat(contrat, statut=True)
+        assert messages == []
+    # two of the four were unsigned
+    assert len(messages) == 2
+    assert all(m.startswith("[CONTRAT_SIGNE]") for m in messages)
+
+
+def test_unit_of_work_rolls_everything_back(data, services, session):
+    service = services().clients
+    with pytest.raises(IntegrityError):
+        with unit_of_work(session):
+            service.create_client("A", "a@x.fr", None, None, data["C1"])
+            service.create_client("B", "b@x.fr", None, None, data["C2"])
+            session.flush()
+            # duplicate primary key
+            session.execute(Client.__table__.insert().values(
+                id=data["clients"][0]))
+    assert len(service.get_all_clients()) == 12
+
+
+def test_login_checks_the_password(data, services, monkeypatch):
+    users = services().users
+    assert users.login("c1@epic.fr", "mauvais") is None
+    monkeypatch.setenv("BCRYPT_ROUNDS", "5")
+    user = users.login("c1@epic.fr", "pw")
+    assert user.id == data["C1"]
+    assert hash_rounds(user.mot_de_passe) == 5
+
+
+def test_cli_creation_with_scripted_input(data, login, answers, services,
+                                          capsys):
+    from cli.client_cli import run_create_client
+
+    login("C1")
+    answers("Jeanne Martin", "jeanne@x.fr", "0102030405", "Martin SA")
+    run_create_client()
+    assert "crée avec success" in capsys.readouterr().out
+    created = services().clients.get_all_clients()[-1]
+    assert (created.nom_complet, created.commercial_id) == (
+        "Jeanne Martin", data["C1"])
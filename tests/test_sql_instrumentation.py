@@ -0,0 +1,117 @@
+"""
+SQL profiler on an in-memory SQLite database.
+
+Run from the project root: python -m pytest tests/test_sql_instrumentation.py
+"""
+from datetime import date
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from models.base import Base
+from models.client import Client
+from models.contrat import Contrat
+from models.utilisateur import Utilisateur
+from services.client_service import ClientService
+from utils.sql_instrumentation import SqlProfiler, statement_shape
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        commercials = [Utilisateur(nom=f"C{i}", email=f"c{i}@x.fr",
+                                   mot_de_passe="x", role="commercial")
+                       for i in range(6)]
+        session.add_all(commercials)
+        session.flush()
+        for commercial in commercials:
+            client = Client(nom_complet="Client", email="client@x.fr",
+                            date_creation=date.today(),
+                            commercial_id=commercial.id)
+            session.add(client)
+            session.flush()
+            session.add(Contrat(client_id=client.id, commercial_id=commercial.id,
+                                montant_total=10, montant_restant=10,
+                                date_creation=date.today(), statut=False))
+        session.commit()
+
+    profiler = SqlProfiler(enabled=True, path=str(tmp_path / "profile.jsonl"),
+                           threshold=3, stream=io.StringIO())
+    profiler.install(engine)
+    yield profiler, engine
+    profiler.close()
+    engine.dispose()
+
+
+def records(profiler, kind):
+    with open(profiler.path, encoding="utf-8") as f:
+        return [r for r in map(json.loads, f) if r["type"] == kind]
+
+
+def test_lazy_loads_in_a_loop_are_reported_as_n_plus_one(profiled):
+    profiler, engine = profiled
+    with Session(engine) as session, profiler.action("liste"):
+        for contrat in session.scalars(select(Contrat)):
+            contrat.client.nom_complet
+
+    action, = records(profiler, "action")
+    assert action["action"] == "liste"
+    assert action["statements"] == 7
+    assert action["n_plus_one"][0]["count"] == 6
+    assert "N+1 probable : 6 x" in profiler.stream.getvalue()
+
+
+def test_statements_are_attributed_to_actions_and_services(profiled):
+    profiler, engine = profiled
+    with Session(engine) as session, profiler.action("menu"):
+        with profiler.action("clients"):
+            ClientService(session).get_all_clients()
+        # repeated pages are not single-object lookups
+        for after in range(4):
+            session.scalars(select(Client).where(Client.id > after)
+                            .order_by(Client.id).limit(2)).all()
+
+    inner, outer = records(profiler, "action")
+    assert inner["action"] == "menu > clients"
+    assert inner["services"] == {"ClientService.get_all_clients": 1}
+    assert outer["statements"] == 5 and outer["n_plus_one"] == []
+    # only the top-level action is printed
+    assert profiler.stream.getvalue().count("PROFIL SQL") == 1
+    assert {r["action"] for r in records(profiler, "statement")} == {
+        "menu > clients", "menu"}
+
+
+def test_failing_statements_are_recorded_and_do_not_leak_their_start(
+        profiled):
+    profiler, engine = profiled
+    with engine.connect() as connection, profiler.action("erreurs"):
+        for _ in range(2):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM absente"))
+        connection.execute(text("SELECT 1"))
+        assert connection.info["sql_profile_start"] == []
+
+    action, = records(profiler, "action")
+    assert (action["statements"], action["failed"]) == (3, 2)
+    statements = records(profiler, "statement")
+    assert [r.get("failed", False) for r in statements] == [True, True, False]
+    assert "3 requête(s) dont 2 en échec" in profiler.stream.getvalue()
+
+
+def test_shapes_ignore_the_length_of_in_lists():
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?)") == \
+        statement_shape("SELECT *\n FROM t WHERE id IN (?, ?, ?, ?)")
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    profiler = SqlProfiler(enabled=False, path=str(tmp_path / "none.jsonl"))
+    with profiler.action("rien") as stats:
+        assert stats is None
+    assert not (tmp_path / "none.jsonl").exists()
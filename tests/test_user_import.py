@@ -0,0 +1,123 @@
+"""
+Bulk user provisioning (services/user_import_service.py).
+
+Run from the project root: python -m pytest tests/test_user_import.py
+"""
+import io
+
+from sqlalchemy import select
+
+from models.utilisateur import Utilisateur
+from services import user_import_service
+from services.user_import_service import UserImportService
+from utils.query_budget import count_queries
+from utils.security import verify_password
+
+HEADER = "nom,email,role,mot_de_passe\n"
+
+
+def run_import(session, payload, lines, **options):
+    options.setdefault("workers", 1)
+    service = UserImportService(session, payload("Gestion"))
+    return service, service.import_csv(
+        io.StringIO(HEADER + "".join(lines)), **options)
+
+
+def emails(session):
+    return set(session.scalars(
+        Utilisateur.__table__.select().with_only_columns(
+            Utilisateur.email)))
+
+
+def test_existing_email_in_another_case_is_rejected(data, session, payload):
+    # the seeded commercial is c1@epic.fr
+    _, report = run_import(session, payload, [
+        "Autre,C1@Epic.fr,commercial,secret\n",
+        "Nouvelle,nouvelle@epic.fr,support,secret\n",
+    ])
+    assert [(line, reason) for line, reason, _ in report.rejected] == [
+        (2, "email déjà utilisé")]
+    assert report.inserted == 1
+    assert "nouvelle@epic.fr" in emails(session)
+    assert "C1@Epic.fr" not in emails(session)
+
+
+def test_rejection_reasons(data, session, payload):
+    _, report = run_import(session, payload, [
+        ",sans.nom@epic.fr,support,secret\n",
+        "Email,pas-un-email,support,secret\n",
+        f"{'x' * 51},long@epic.fr,support,secret\n",
+        "Role,role@epic.fr,directeur,secret\n",
+        "Sans Mot De Passe,vide@epic.fr,support,\n",
+        "Premier,double@epic.fr,Support,secret\n",
+        "Second,DOUBLE@epic.fr,support,secret\n",
+    ])
+    assert [(line, reason) for line, reason, _ in report.rejected] == [
+        (2, "nom manquant"),
+        (3, "email invalide"),
+        (4, "valeur trop longue : nom"),
+        (5, "rôle invalide"),
+        (6, "mot de passe vide"),
+        (8, "email en double dans le fichier"),
+    ]
+    assert report.inserted == 1
+    assert "double@epic.fr" in emails(session)
+
+
+def test_one_statement_and_one_transaction_per_batch(data, session, payload):
+    lines = [f"User {i},user{i}@epic.fr,support,secret{i}\n" for i in range(5)]
+    batches = []
+    with count_queries() as counted:
+        _, report = run_import(
+            session, payload, lines, batch_size=2,
+            on_batch=lambda report: batches.append(report.inserted))
+    assert (report.batches, report.inserted, batches) == (3, 5, [2, 4, 5])
+    inserts = [s for s in counted.statements if s.startswith("INSERT")]
+    selects = [s for s in counted.statements if s.startswith("SELECT")]
+    # one existing-emails check and one executemany per batch
+    assert (len(inserts), len(selects), counted.transactions) == (3, 3, 3)
+
+    rows = session.execute(select(Utilisateur.email, Utilisateur.mot_de_passe)
+                           .where(Utilisateur.email.like("user%"))
+                           .order_by(Utilisateur.id)).all()
+    assert [email for email, _ in rows] == [f"user{i}@epic.fr" for i in range(5)]
+    assert all(verify_password(f"secret{i}", hashed)
+               for i, (_, hashed) in enumerate(rows))
+
+
+def test_dry_run_hashes_and_writes_nothing(data, session, payload,
+                                           monkeypatch):
+    def no_hashing(*args, **kwargs):
+        raise AssertionError("hash_many appelé pendant un dry run")
+    monkeypatch.setattr(user_import_service, "hash_many", no_hashing)
+    before = emails(session)
+    _, report = run_import(session, payload, [
+        "Nouveau,nouveau@epic.fr,support,secret\n",
+        "Existant,c2@epic.fr,commercial,secret\n",
+    ], dry_run=True)
+    assert (report.inserted, report.batches) == (1, 1)
+    assert [reason for _, reason, _ in report.rejected] == [
+        "email déjà utilisé"]
+    assert emails(session) == before
+
+
+def test_rejects_report_and_audit_never_show_passwords(data, session, payload,
+                                                      monkeypatch):
+    messages = []
+    monkeypatch.setattr(user_import_service, "capture_message",
+                        lambda message, level: messages.append(message))
+    service, report = run_import(session, payload, [
+        "Bon,bon@epic.fr,support,secret-1\n",
+        "Mauvais,mauvais@epic.fr,directeur,secret-2\n",
+    ])
+    output = io.StringIO()
+    report.write_rejects(output, service.report_fieldnames)
+    assert output.getvalue().splitlines() == [
+        "ligne,raison,nom,email,role",
+        "3,rôle invalide,Mauvais,mauvais@epic.fr,directeur",
+    ]
+    assert len(messages) == 1
+    assert messages[0].startswith(
+        f"[USERS_IMPORTED] by={payload('Gestion')['id']}, inserted=1, "
+        "rejected=1, roles={'support': 1}")
+    assert "secret" not in messages[0]
@@ -1,8 +1,19 @@
 import jwt
 import datetime
+import os
+import threading
+import time
 
 SECRET_KEY = "we8nfw8efnwefwen8fw9efne9fwenv38fwenv38f38"
 
+TOKEN_FILE = ".token"
+# A cached payload is re-verified when it expires within this many seconds
+EXPIRY_MARGIN = 30
+
+# Decoded payload of the token file, keyed on the file identity
+_token_cache = {"key": None, "payload": None}
+_token_lock = threading.Lock()
+
 
 def generate_token(user_id, email, role):
     """
@@ -19,14 +30,24 @@ def generate_token(user_id, email, role):
     return token
 
 
+def verify_token(token):
+    """
+    Decode a JWT token and return its payload, without printing anything.
+
+    Raises jwt.ExpiredSignatureError or jwt.InvalidTokenError, so that
+    callers other than the terminal (the HTTP API) report the failure
+    themselves.
+    """
+    return jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+
+
 def decode_token(token):
     """
     Decode JWT token,return user's info if valid
 
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return payload
+        return verify_token(token)
     except jwt.ExpiredSignatureError:
         print("Token expiré. Veuillez vous reconnecter.")
     except jwt.InvalidTokenError:
@@ -34,21 +55,68 @@ def decode_token(token):
     return None
 
 
+def _token_file_key():
+    """
+    Identify the current content of the token file without reading it.
+    """
+    path = os.path.abspath(TOKEN_FILE)
+    st = os.stat(path)
+    return (path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def invalidate_token_cache():
+    """
+    Forget the cached token payload.
+
+    Called on login and logout so that the next load_token() reads the
+    new .token file (or notices its removal) immediately.
+    """
+    with _token_lock:
+        _token_cache["key"] = None
+        _token_cache["payload"] = None
+
+
 def load_token():
     """
        Load the saved authentication token from the .token file.
 
+    The decoded payload is kept in memory: the file is only read and the
+    signature verified again when the file changes (inode, mtime, size)
+    or when the token is about to expire.
+
     Returns
     -------
     dict or None
-        The decoded token payload if the .token file exists and the token
-        can be decoded, otherwise None if no token file is found.
+        A copy of the decoded token payload if the .token file exists and
+        the token can be decoded, otherwise None if no token file is found.
 
     """
     try:
-        with open(".token", "r") as f:
+        key = _token_file_key()
+    except FileNotFoundError:
+        invalidate_token_cache()
+        print("Aucun utilisateur connecté.")
+        return None
+
+    with _token_lock:
+        if _token_cache["key"] == key:
+            payload = _token_cache["payload"]
+            if payload and payload.get("exp", 0) - EXPIRY_MARGIN > time.time():
+                return dict(payload)
+
+    try:
+        with open(TOKEN_FILE, "r") as f:
             token = f.read()
-            return decode_token(token)
     except FileNotFoundError:
+        invalidate_token_cache()
         print("Aucun utilisateur connecté.")
         return None
+
+    payload = decode_token(token)
+    with _token_lock:
+        # invalid or expired tokens are not cached, so the message
+        # printed by decode_token shows up on every call as before
+        _token_cache["key"] = key if payload else None
+        _token_cache["payload"] = payload
+    # callers get their own copy: changing it must not alter the cache
+    return dict(payload) if payload else payload
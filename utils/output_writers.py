@@ -0,0 +1,200 @@
+import csv
+import json
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+# Output formats accepted by the command line interface
+FORMATS = ("table", "json", "jsonl", "csv")
+
+
+def to_jsonable(value):
+    """
+    Convert a column value to a JSON/CSV friendly value.
+
+    Decimal amounts become floats and dates ISO 8601 strings.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+# Output columns of the entities, shared by the CLI and the API: column
+# name -> function reading it on an entity
+
+def _name(obj, attr):
+    return getattr(obj, attr) if obj is not None else None
+
+
+USER_COLUMNS = {
+    "id": lambda u: u.id,
+    "nom": lambda u: u.nom,
+    "email": lambda u: u.email,
+    "role": lambda u: u.role,
+}
+
+CLIENT_COLUMNS = {
+    "id": lambda c: c.id,
+    "nom_complet": lambda c: c.nom_complet,
+    "email": lambda c: c.email,
+    "telephone": lambda c: c.telephone,
+    "entreprise": lambda c: c.entreprise,
+    "date_creation": lambda c: c.date_creation,
+    "date_mise_a_jour": lambda c: c.date_mise_a_jour,
+    "commercial_id": lambda c: c.commercial_id,
+    "commercial": lambda c: _name(c.commercial, "nom"),
+}
+
+CONTRAT_COLUMNS = {
+    "id": lambda c: c.id,
+    "client_id": lambda c: c.client_id,
+    "client": lambda c: _name(c.client, "nom_complet"),
+    "commercial_id": lambda c: c.commercial_id,
+    "commercial": lambda c: _name(c.commercial, "nom"),
+    "montant_total": lambda c: c.montant_total,
+    "montant_restant": lambda c: c.montant_restant,
+    "date_creation": lambda c: c.date_creation,
+    "statut": lambda c: c.statut,
+}
+
+EVENEMENT_COLUMNS = {
+    "id": lambda e: e.id,
+    "contrat_id": lambda e: e.contrat_id,
+    "client": lambda e: e.nom_client or (
+        _name(e.contrat.client, "nom_complet") if e.contrat else None),
+    "contact_client": lambda e: e.contact_client,
+    "support_id": lambda e: e.support_id,
+    "support": lambda e: _name(e.support, "nom"),
+    "date_debut": lambda e: e.date_debut,
+    "date_fin": lambda e: e.date_fin,
+    "lieu": lambda e: e.lieu,
+    "participants": lambda e: e.participants,
+    "notes": lambda e: e.notes,
+}
+
+
+def write_rows(rows, columns, fmt="table", stream=None, title=None):
+    """
+    Write rows (dicts keyed by column name) in the requested format.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+        Rows to write. jsonl and csv consume the iterable lazily, so a
+        generator over a paginated query is streamed row by row.
+    columns : sequence of str
+        Column names, in output order.
+    fmt : str
+        One of FORMATS. "table" renders a rich table for humans.
+    stream : file-like or None
+        Destination, sys.stdout by default.
+    title : str or None
+        Table title (only used by the "table" format).
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    stream = stream or sys.stdout
+    if fmt not in FORMATS:
+        raise ValueError(f"Format de sortie inconnu : {fmt}")
+
+    count = 0
+    if fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps(
+                {c: to_jsonable(row.get(c)) for c in columns},
+                ensure_ascii=False) + "\n")
+            count += 1
+    elif fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([_csv_value(row.get(c)) for c in columns])
+            count += 1
+    elif fmt == "json":
+        data = [{c: to_jsonable(row.get(c)) for c in columns} for row in rows]
+        json.dump(data, stream, ensure_ascii=False, indent=2)
+        stream.write("\n")
+        count = len(data)
+    else:
+        # rich is only imported for human readable output
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=title)
+        for c in columns:
+            table.add_column(c)
+        for row in rows:
+            table.add_row(*(_table_value(row.get(c)) for c in columns))
+            count += 1
+        Console(file=stream).print(table)
+    stream.flush()
+    return count
+
+
+def _csv_value(value):
+    value = to_jsonable(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _table_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "oui" if value else "non"
+    if isinstance(value, (Decimal, float)):
+        return f"{float(value):.2f}"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    return str(to_jsonable(value))
+
+
+def write_parquet(rows, columns, path, schema, batch_size=10000):
+    """
+    Write rows (dicts keyed by column name) to a Parquet file.
+
+    Rows are buffered batch_size at a time and written as one record
+    batch, so memory does not grow with the number of rows.
+
+    Requires the optional pyarrow package.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+    columns : sequence of str
+    path : str
+        Destination file.
+    schema : pyarrow.Schema
+        Column types of the file, in the order of columns.
+    batch_size : int
+        Rows per record batch (and per Parquet row group at most).
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    count = 0
+    buffer = {c: [] for c in columns}
+    with pq.ParquetWriter(path, schema) as writer:
+        for row in rows:
+            for c in columns:
+                buffer[c].append(row.get(c))
+            count += 1
+            if count % batch_size == 0:
+                writer.write_batch(pa.RecordBatch.from_pydict(buffer, schema=schema))
+                buffer = {c: [] for c in columns}
+        if count % batch_size:
+            writer.write_batch(pa.RecordBatch.from_pydict(buffer, schema=schema))
+    return count
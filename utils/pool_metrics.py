@@ -0,0 +1,169 @@
+import json
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters describing how the connection pool is used.
+
+    The metrics are fed by SQLAlchemy pool/dialect events (see install)
+    and by InstrumentedQueuePool for the time spent waiting on a free
+    connection. They are meant to size DB_POOL_SIZE / DB_MAX_OVERFLOW
+    from real numbers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Reset every counter to zero.
+        """
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.connect_total = 0.0
+            self.connect_max = 0.0
+
+    def record_wait(self, seconds):
+        """
+        Record the time spent waiting for a connection from the pool.
+        """
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_connect(self, seconds):
+        """
+        Record the latency of opening a new DBAPI connection.
+        """
+        with self._lock:
+            self.connects += 1
+            self.connect_total += seconds
+            self.connect_max = max(self.connect_max, seconds)
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool=None):
+        """
+        Return the current metrics as a plain dict.
+
+        Parameters:
+            pool : sqlalchemy.pool.Pool or None
+                When given, the live pool state (size, checked out
+                connections, overflow) is included.
+        """
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_avg_ms": round(
+                    self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "connect_total_ms": round(self.connect_total * 1000, 3),
+                "connect_max_ms": round(self.connect_max * 1000, 3),
+                "connect_avg_ms": round(
+                    self.connect_total * 1000 / self.connects, 3) if self.connects else 0.0,
+            }
+        if pool is not None:
+            data["pool_class"] = type(pool).__name__
+            # Only QueuePool-like pools expose these accessors
+            for name in ("size", "checkedin", "checkedout", "overflow"):
+                accessor = getattr(pool, name, None)
+                if callable(accessor):
+                    data[name] = accessor()
+        return data
+
+    def dump(self, pool=None, stream=None):
+        """
+        Write the current metrics as a single JSON line.
+        """
+        stream = stream or sys.stderr
+        stream.write(json.dumps(self.snapshot(pool), sort_keys=True) + "\n")
+        stream.flush()
+
+
+# Process-wide metrics shared by every engine built in models.base
+metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool measuring how long callers wait to obtain a connection.
+
+    Only the wait for a free connection is recorded: when the pool opens
+    a new one instead, the time spent connecting is left out, since the
+    do_connect listener of install() already records it as connect
+    latency.
+    """
+
+    # seconds spent opening connections during the current _do_get, per
+    # thread
+    _connecting = threading.local()
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            self._connecting.seconds = (
+                getattr(self._connecting, "seconds", 0.0)
+                + time.perf_counter() - start)
+
+    def _do_get(self):
+        self._connecting.seconds = 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.record_wait(max(
+                0.0, time.perf_counter() - start - self._connecting.seconds))
+
+
+def install(engine):
+    """
+    Attach the metrics listeners to an engine and its pool.
+    """
+    @event.listens_for(engine, "do_connect")
+    def _timed_connect(dialect, conn_rec, cargs, cparams):
+        start = time.perf_counter()
+        connection = dialect.connect(*cargs, **cparams)
+        metrics.record_connect(time.perf_counter() - start)
+        return connection
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.record_checkin()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+
+    return engine
@@ -0,0 +1,120 @@
+"""
+Query budgets: assert an upper bound on the SQL issued by a block of code.
+
+    with query_budget(2):
+        run_list_contrats()
+
+    assert_query_budget(service.get_unpaid_contrats, max_statements=1,
+                        profile="list")
+
+Statements are the SQL statements sent through the engine (an
+executemany counts once). Round-trips add the COMMIT and ROLLBACK issued
+by the sessions, each of which is one more exchange with the server.
+A list view that starts lazy loading its relationships row by row
+exceeds its budget as soon as the fixture has a few rows.
+
+Under the test transaction of tests/conftest.py, where the sessions
+commit and roll back SAVEPOINTs, RELEASE and ROLLBACK TO SAVEPOINT count
+as the COMMIT and ROLLBACK they stand for, while BEGIN and SAVEPOINT are
+not counted, like the implicit BEGIN of the drivers.
+"""
+from contextlib import contextmanager
+import re
+
+_BEGIN = re.compile(r"\s*(BEGIN|SAVEPOINT)\b", re.IGNORECASE)
+_END = re.compile(r"\s*(RELEASE|ROLLBACK TO)\s+SAVEPOINT\b", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    More statements or round-trips than the budget allows.
+    """
+
+
+class QueryCount:
+    """
+    Statements and round-trips counted by count_queries().
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.transactions = 0
+
+    @property
+    def roundtrips(self):
+        return len(self.statements) + self.transactions
+
+    def __len__(self):
+        return len(self.statements)
+
+    def describe(self):
+        lines = [f"{len(self.statements)} requête(s), "
+                 f"{self.roundtrips} aller-retour(s) :"]
+        lines += [f"  {i}. {' '.join(statement.split())[:200]}"
+                  for i, statement in enumerate(self.statements, 1)]
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Count the statements and round-trips of the enclosed block.
+
+    Parameters
+    ----------
+    engine : Engine or None
+        The application engine (models.base.get_engine()) by default.
+    """
+    from sqlalchemy import event
+
+    if engine is None:
+        from models.base import get_engine
+        engine = get_engine()
+    counted = QueryCount()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if _END.match(statement):
+            counted.transactions += 1
+        elif not _BEGIN.match(statement):
+            counted.statements.append(statement)
+
+    def on_transaction_end(conn):
+        counted.transactions += 1
+
+    listeners = (("before_cursor_execute", on_execute),
+                 ("commit", on_transaction_end),
+                 ("rollback", on_transaction_end))
+    for name, listener in listeners:
+        event.listen(engine, name, listener)
+    try:
+        yield counted
+    finally:
+        for name, listener in listeners:
+            event.remove(engine, name, listener)
+
+
+@contextmanager
+def query_budget(max_statements, max_roundtrips=None, engine=None):
+    """
+    Run the enclosed block and raise QueryBudgetExceeded if it issued
+    more than max_statements statements (or max_roundtrips round-trips).
+    """
+    with count_queries(engine) as counted:
+        yield counted
+    if len(counted) > max_statements or (
+            max_roundtrips is not None and counted.roundtrips > max_roundtrips):
+        budget = f"{max_statements} requête(s)"
+        if max_roundtrips is not None:
+            budget += f", {max_roundtrips} aller-retour(s)"
+        raise QueryBudgetExceeded(
+            f"Budget dépassé ({budget}) : {counted.describe()}")
+
+
+def assert_query_budget(function, *args, max_statements, max_roundtrips=None,
+                        engine=None, **kwargs):
+    """
+    Call function(*args, **kwargs) within a query budget and return its
+    result.
+    """
+    with query_budget(max_statements, max_roundtrips, engine):
+        return function(*args, **kwargs)
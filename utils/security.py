@@ -1,7 +1,102 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+import os
+import threading
+
 import bcrypt
 
+# bcrypt cost factor of new hashes (2**rounds iterations). Hashes stored
+# with another cost are upgraded on the next successful login.
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+# Hashing threads of submit_hash / submit_verify, for the callers that do
+# not wait on each hash (async services, bulk hashing). The synchronous
+# functions hash on the calling thread: bcrypt releases the GIL, so the
+# threads of a threaded server already hash in parallel.
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _int_env(name, default):
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+
+
+def bcrypt_rounds() -> int:
+    """
+    Return the cost factor of new hashes, read from BCRYPT_ROUNDS.
+
+    :return: cost factor between 4 and 31 (12 by default).
+    :rtype: int
+    """
+    rounds = _int_env("BCRYPT_ROUNDS", DEFAULT_ROUNDS)
+    if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+        raise ValueError(
+            f"BCRYPT_ROUNDS must be between {MIN_ROUNDS} and {MAX_ROUNDS}, "
+            f"got {rounds}")
+    return rounds
+
+
+def _get_executor():
+    """
+    Return the shared hashing pool, created on first use with
+    EPIC_HASH_WORKERS threads.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = max(1, _int_env("EPIC_HASH_WORKERS", DEFAULT_WORKERS))
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="bcrypt")
+                atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+
+def _hash(plain_password, rounds):
+    salt = bcrypt.gensalt(rounds)
+    return bcrypt.hashpw(plain_password.encode('utf-8'), salt).decode('utf-8')
+
+
+def _check(plain_password, hashed_password):
+    return bcrypt.checkpw(
+        plain_password.encode('utf-8'),
+        hashed_password.encode('utf-8')
+    )
+
+
+def submit_hash(plain_password: str, rounds: int = None):
+    """
+    Hash a password on the hashing pool without waiting for the result.
+
+    :param plain_password: plain text password to hash.
+    :param rounds: cost factor, BCRYPT_ROUNDS by default.
+    :return: concurrent.futures.Future of the hashed password.
+    """
+    return _get_executor().submit(
+        _hash, plain_password, rounds or bcrypt_rounds())
+
+
+def submit_verify(plain_password: str, hashed_password: str):
+    """
+    Verify a password on the hashing pool without waiting for the result.
+
+    :return: concurrent.futures.Future of the boolean result.
+    """
+    return _get_executor().submit(_check, plain_password, hashed_password)
+
 
-def hash_password(plain_password: str) -> str:
+def hash_password(plain_password: str, rounds: int = None) -> str:
     """
     Hashes a plain text password using the bcrypt algorithm.
 
@@ -10,11 +105,12 @@ def hash_password(plain_password: str) -> str:
 
     :param plain_password: plain text password to hash.
     :type plain_password: str
+    :param rounds: cost factor, BCRYPT_ROUNDS by default.
+    :type rounds: int
     :return: Hashed password suitable for database storage
     :rtype: str
     """
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(plain_password.encode('utf-8'), salt).decode('utf-8')
+    return _hash(plain_password, rounds or bcrypt_rounds())
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -31,7 +127,63 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     :rtype: bool
 
     """
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    return _check(plain_password, hashed_password)
+
+
+def hashing_processes(workers: int = None):
+    """
+    Create a process pool for hash_many, one process per core by default.
+
+    Threads are enough for a few concurrent logins; provisioning hundreds
+    of accounts hashes on every core instead. Use it as a context manager
+    so the processes are stopped at the end.
+
+    :param workers: number of processes, os.cpu_count() by default.
+    :return: concurrent.futures.ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+
+
+def hash_many(passwords, rounds: int = None, executor=None) -> list:
+    """
+    Hash several plain text passwords, in parallel.
+
+    :param passwords: iterable of plain text passwords.
+    :param rounds: cost factor, BCRYPT_ROUNDS by default.
+    :param executor: pool to hash on (see hashing_processes), the shared
+        hashing threads by default.
+    :return: list of hashed passwords, in the order of passwords.
+    """
+    passwords = list(passwords)
+    rounds = rounds or bcrypt_rounds()
+    if executor is None:
+        futures = [submit_hash(password, rounds) for password in passwords]
+        return [future.result() for future in futures]
+    # a few chunks per core: fewer round trips to the processes, still balanced
+    chunksize = max(1, len(passwords) // ((os.cpu_count() or 1) * 4))
+    return list(executor.map(
+        _hash, passwords, repeat(rounds), chunksize=chunksize))
+
+
+def hash_rounds(hashed_password: str):
+    """
+    Read the cost factor of a stored bcrypt hash ("$2b$12$...").
+
+    :return: the cost factor, or None if the hash is not a bcrypt hash.
+    """
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: str, rounds: int = None) -> bool:
+    """
+    Tell whether a stored hash was made with another cost factor than the
+    configured one and should be replaced.
+
+    :param hashed_password: stored hashed password.
+    :param rounds: expected cost factor, BCRYPT_ROUNDS by default.
+    :return: True if the hash should be recomputed.
+    """
+    return hash_rounds(hashed_password) != (rounds or bcrypt_rounds())
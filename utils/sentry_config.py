@@ -1,17 +1,157 @@
+from contextlib import contextmanager
+import functools
+import inspect
 import os
-import sentry_sdk
 
+# sentry_sdk is only imported when a DSN is configured; without it the
+# helpers below are no-ops and the SDK import cost is never paid.
+_sentry = None
 
-def init_sentry():
+# Share of the transactions traced when no override applies
+DEFAULT_TRACES_SAMPLE_RATE = 0.1
+
+
+def _rate(name, value):
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = -1.0
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(
+            f"{name} doit être un nombre entre 0 et 1 (reçu : {value!r}).")
+    return rate
+
+
+def sample_rates():
+    """
+    Read the tracing sample rates from the environment.
+
+    SENTRY_TRACES_SAMPLE_RATE : float between 0 and 1 (default 0.1)
+        Share of the transactions that are traced.
+    SENTRY_TRACES_SAMPLES : comma-separated name=rate pairs
+        Per-operation overrides; name is a transaction name (menu action
+        "run_list_contrats", command "contrats_list", API route
+        "GET /clients") or an operation ("cli.action", "cli.command",
+        "http.server"), e.g. "http.server=0.01,contrats_update=1".
+
+    Returns (default rate, dict of overrides); raises ValueError on an
+    invalid value.
+    """
+    default = _rate("SENTRY_TRACES_SAMPLE_RATE",
+                    os.getenv("SENTRY_TRACES_SAMPLE_RATE",
+                              str(DEFAULT_TRACES_SAMPLE_RATE)))
+    overrides = {}
+    for item in os.getenv("SENTRY_TRACES_SAMPLES", "").split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.rpartition("=")
+        if not sep or not name.strip():
+            raise ValueError(
+                f"SENTRY_TRACES_SAMPLES : {item!r} (nom=taux attendu).")
+        overrides[name.strip()] = _rate(name.strip(), value.strip())
+    return default, overrides
+
+
+def make_traces_sampler(default, overrides):
+    """
+    Build the traces_sampler given to sentry_sdk.init().
+
+    A transaction continuing a sampled (or unsampled) trace keeps the
+    decision of its parent; otherwise the rate of its name, then of its
+    operation, then the default rate applies.
+    """
+    def traces_sampler(sampling_context):
+        parent = sampling_context.get("parent_sampled")
+        if parent is not None:
+            return float(parent)
+        context = sampling_context.get("transaction_context") or {}
+        for key in (context.get("name"), context.get("op")):
+            if key in overrides:
+                return overrides[key]
+        return default
+    return traces_sampler
+
+
+def init_sentry(transport=None):
     """
     Initialize Sentry error and performance monitoring for the application.
+
+    :param transport: optional sentry_sdk Transport replacing the HTTP one
+        (tests use a local stand-in recording the envelopes).
     """
+    global _sentry
     dsn = os.getenv("SENTRY_DSN")
     if not dsn:
         return
 
+    import sentry_sdk
+
+    default, overrides = sample_rates()
+    options = {}
+    if transport is not None:
+        options["transport"] = transport
     sentry_sdk.init(
         dsn=dsn,
-        traces_sample_rate=1.0,
+        traces_sampler=make_traces_sampler(default, overrides),
         environment=os.getenv("SENTRY_ENV", "dev"),
+        **options,
     )
+    _sentry = sentry_sdk
+
+
+def capture_message(message, level="info"):
+    """
+    Send a message to Sentry if it has been initialized.
+    """
+    if _sentry is not None:
+        _sentry.capture_message(message, level=level)
+
+
+def capture_exception(error=None):
+    """
+    Send the current (or given) exception to Sentry if it has been initialized.
+    """
+    if _sentry is not None:
+        _sentry.capture_exception(error)
+
+
+@contextmanager
+def transaction(name, op):
+    """
+    Trace the enclosed block as a Sentry transaction (a CLI action, a
+    command, an API request), subject to sampling.
+    """
+    if _sentry is None:
+        yield None
+        return
+    with _sentry.start_transaction(name=name, op=op) as current:
+        yield current
+
+
+def _span_method(function, op, name):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _sentry is None:
+            return function(*args, **kwargs)
+        with _sentry.start_span(op=op, name=name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def traced(op):
+    """
+    Class decorator giving each public method a span (op, "Class.method")
+    in the current transaction.
+
+    Generator methods are left as they are (their work happens after the
+    call returns). Without Sentry, the wrapper only checks that it is off.
+    """
+    def decorator(cls):
+        for name, attribute in list(vars(cls).items()):
+            if (name.startswith("_") or not inspect.isfunction(attribute)
+                    or inspect.isgeneratorfunction(attribute)):
+                continue
+            setattr(cls, name,
+                    _span_method(attribute, op, f"{cls.__name__}.{name}"))
+        return cls
+    return decorator
@@ -0,0 +1,324 @@
+"""
+Per-action SQL profiling: statement count, time, slowest statements and
+likely N+1 patterns.
+
+Enabled with EPIC_SQL_PROFILE=1 or `python main.py --profile`. Every
+statement executed through an instrumented engine is attributed to the
+current action (a CLI menu action, a non-interactive command or an API
+route, see action()) and to the outermost service method on the call
+stack. When a top-level action ends, a summary is printed on stderr and
+the records are appended as JSON lines to EPIC_SQL_PROFILE_FILE
+(default: sql_profile.jsonl):
+
+    {"type": "statement", "action": ..., "service": ..., "ms": ..., "shape": ...}
+    {"type": "action", "action": ..., "statements": ..., "failed": ...,
+     "total_ms": ..., "slowest": [...], "services": {...}, "n_plus_one": [...]}
+
+A statement raising an error is recorded too, with "failed": true and
+the time spent until the error.
+
+A single-object lookup (SELECT without ORDER BY nor IN list: lazy loads,
+get()) repeated with the same shape EPIC_SQL_N1_THRESHOLD times (default
+5) or more in one action is reported as a likely N+1. Pages of a keyset
+listing and chunks of get_many are not.
+
+Times are those of cursor.execute(): rows fetched afterwards by a lazy
+result are not included.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import heapq
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+# Number of slowest statements kept per action
+SLOWEST = 5
+DEFAULT_FILE = "sql_profile.jsonl"
+DEFAULT_THRESHOLD = 5
+
+# Placeholder lists of IN (...) clauses, whatever their length
+_PLACEHOLDERS = re.compile(
+    r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """
+    Normalize a SQL statement so that executions differing only by the
+    length of their IN lists share the same shape.
+    """
+    shape = _SPACES.sub(" ", statement).strip()
+    return _PLACEHOLDERS.sub("(?, ...)", shape)
+
+
+def _is_lookup(shape):
+    upper = shape.upper()
+    return (upper.startswith("SELECT") and " ORDER BY " not in upper
+            and "(?, ...)" not in shape)
+
+
+def _service_call():
+    """
+    Return "Class.method" of the outermost services.* frame on the stack.
+    """
+    found = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("services."):
+            owner = frame.f_locals.get("self")
+            found = (f"{type(owner).__name__}.{frame.f_code.co_name}"
+                     if owner is not None
+                     else f"{module}.{frame.f_code.co_name}")
+        frame = frame.f_back
+    return found
+
+
+class ActionStats:
+    """
+    Statements attributed to one action.
+    """
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.path = f"{parent.path} > {name}" if parent else name
+        self.statements = 0
+        self.failed = 0
+        self.total = 0.0
+        self.slowest = []
+        self.shapes = Counter()
+        self.services = Counter()
+
+    def record(self, shape, seconds, service, failed=False):
+        self.statements += 1
+        self.failed += failed
+        self.total += seconds
+        self.shapes[shape] += 1
+        if service:
+            self.services[service] += 1
+        entry = (seconds, shape)
+        if len(self.slowest) < SLOWEST:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def n_plus_one(self, threshold):
+        """
+        Return the (shape, count) of single-object lookups repeated
+        threshold times or more, most repeated first.
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common()
+                if count >= threshold and _is_lookup(shape)]
+
+    def to_record(self, threshold):
+        return {
+            "type": "action",
+            "action": self.path,
+            "statements": self.statements,
+            "failed": self.failed,
+            "total_ms": round(self.total * 1000, 3),
+            "slowest": [{"ms": round(seconds * 1000, 3), "shape": shape}
+                        for seconds, shape in sorted(self.slowest, reverse=True)],
+            "services": dict(self.services.most_common()),
+            "n_plus_one": [{"count": count, "shape": shape}
+                           for shape, count in self.n_plus_one(threshold)],
+        }
+
+
+class SqlProfiler:
+    """
+    Collects the statements of instrumented engines per action.
+
+    Parameters
+    ----------
+    enabled : bool or None
+        None follows EPIC_SQL_PROFILE.
+    path : str or None
+        JSON lines file, EPIC_SQL_PROFILE_FILE or sql_profile.jsonl by
+        default.
+    threshold : int or None
+        Repetitions of a shape reported as N+1, EPIC_SQL_N1_THRESHOLD or 5.
+    stream : file-like or None
+        Where summaries are printed, sys.stderr by default.
+    """
+
+    def __init__(self, enabled=None, path=None, threshold=None, stream=None):
+        self._enabled = enabled
+        self.path = path
+        self.threshold = threshold
+        self.stream = stream
+        self._current = ContextVar(f"sql_action_{id(self)}", default=None)
+        self._lock = threading.Lock()
+        self._file = None
+
+    @property
+    def enabled(self):
+        if self._enabled is None:
+            return os.getenv("EPIC_SQL_PROFILE", "").strip().lower() in (
+                "1", "true", "yes", "on", "oui")
+        return self._enabled
+
+    def enable(self, path=None):
+        self._enabled = True
+        if path:
+            self.path = path
+
+    def _threshold(self):
+        if self.threshold is None:
+            return int(os.getenv("EPIC_SQL_N1_THRESHOLD", DEFAULT_THRESHOLD))
+        return self.threshold
+
+    def install(self, engine):
+        """
+        Attach the timing listeners to an engine.
+        """
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("sql_profile_start", []).append(
+                time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            seconds = time.perf_counter() - conn.info["sql_profile_start"].pop()
+            self.record(statement, seconds, executemany)
+
+        @event.listens_for(engine, "handle_error")
+        def _error(context):
+            # after_cursor_execute is not called for a failing statement:
+            # pop its start time here, or the next statement of the
+            # connection would be timed from it
+            conn = context.connection
+            starts = conn.info.get("sql_profile_start") if conn else None
+            if not starts or context.statement is None:
+                return
+            seconds = time.perf_counter() - starts.pop()
+            self.record(context.statement, seconds,
+                        context.execution_context is not None
+                        and context.execution_context.executemany,
+                        failed=True)
+
+        return engine
+
+    def record(self, statement, seconds, executemany=False, failed=False):
+        """
+        Attribute one executed statement to the current action.
+        """
+        shape = statement_shape(statement)
+        service = _service_call()
+        stats = self._current.get()
+        node = stats
+        while node is not None:
+            node.record(shape, seconds, service, failed)
+            node = node.parent
+        record = {
+            "type": "statement",
+            "action": stats.path if stats else None,
+            "service": service,
+            "ms": round(seconds * 1000, 3),
+            "executemany": executemany,
+            "shape": shape,
+        }
+        if failed:
+            record["failed"] = True
+        self._write(record)
+
+    @contextmanager
+    def action(self, name):
+        """
+        Attribute the statements of the enclosed block to the action name
+        (nested actions are recorded as "outer > inner").
+
+        Does nothing when profiling is disabled.
+        """
+        if not self.enabled:
+            yield None
+            return
+        stats = ActionStats(name, self._current.get())
+        token = self._current.set(stats)
+        try:
+            yield stats
+        finally:
+            self._current.reset(token)
+            self._write(stats.to_record(self._threshold()))
+            if stats.parent is None:
+                self.report(stats)
+
+    def track_action(self, name=None):
+        """
+        Decorator running a function inside action(name or its name).
+        """
+        def decorator(function):
+            label = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.action(label):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def report(self, stats, stream=None):
+        """
+        Print the summary of an action.
+        """
+        stream = stream or self.stream or sys.stderr
+        stream.write(f"\n **** PROFIL SQL : {stats.path} ****\n")
+        failed = f" dont {stats.failed} en échec" if stats.failed else ""
+        stream.write(f"{stats.statements} requête(s){failed}, "
+                     f"{stats.total * 1000:.1f} ms\n")
+        for seconds, shape in sorted(stats.slowest, reverse=True):
+            stream.write(f"{seconds * 1000:>9.1f} ms  {shape[:100]}\n")
+        for shape, count in stats.n_plus_one(self._threshold()):
+            stream.write(f"N+1 probable : {count} x {shape[:100]}\n")
+        stream.flush()
+
+    def _write(self, record):
+        with self._lock:
+            if self._file is None:
+                self._file = open(
+                    self.path or os.getenv("EPIC_SQL_PROFILE_FILE", DEFAULT_FILE),
+                    "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Process-wide profiler used by models.base, main.py, cli.commands and the API
+profiler = SqlProfiler()
+
+
+def enabled():
+    return profiler.enabled
+
+
+def enable(path=None):
+    """
+    Turn profiling on (python main.py --profile).
+    """
+    profiler.enable(path)
+
+
+def install(engine):
+    return profiler.install(engine)
+
+
+def action(name):
+    return profiler.action(name)
+
+
+def track_action(name=None):
+    return profiler.track_action(name)
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+import sys
+import time
+
+
+class StartupProfile:
+    """
+    Records how long each startup phase (imports, initialisation, checks)
+    takes, for `python main.py --startup-profile`.
+
+    Phases are recorded whether or not the report is requested: timing a
+    phase only costs two perf_counter() calls.
+    """
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as a named phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                (name, start - self.origin, time.perf_counter() - start))
+
+    def mark(self, name):
+        """
+        Record a point in time (e.g. "menu affiché") as a zero-length phase.
+        """
+        self.phases.append((name, time.perf_counter() - self.origin, 0.0))
+
+    def report(self, stream=None):
+        """
+        Print the recorded phases with their start offset and duration.
+        """
+        stream = stream or sys.stderr
+        stream.write("\n **** PROFIL DE DÉMARRAGE ****\n")
+        stream.write(f"{'Phase':<40} | {'Début (ms)':>10} | {'Durée (ms)':>10}\n")
+        stream.write("-" * 67 + "\n")
+        for name, offset, duration in self.phases:
+            stream.write(
+                f"{name:<40} | {offset * 1000:>10.1f} | {duration * 1000:>10.1f}\n")
+        stream.flush()
+
+
+# Profile shared by main.py and the lazily imported command modules
+profile = StartupProfile()